@@ -1,9 +1,12 @@
 import os
 from django.conf import settings
 from django.utils import timezone
+from django.utils.html import format_html
 from contextlib import suppress
 
 from booking.emails import _send_html_email
+from notifications.digest import hold_admin_event
+from notifications.rendering import detail_html, link, message_html
 
 def get_activity_log_path():
     """Get the path to the activity log file."""
@@ -43,17 +46,16 @@ def signup_email_to_user(user, permissions, generated_password):
     role_text = "Administrator" if user.is_superuser else "Staff"
 
     greeting = f"Hello {user.full_name or 'there'}"
-    message = (
-        "Welcome to First Class Transfers! Your account has been created successfully."
-        "<br><br>Please visit the link below to log in:"
-        "<br><a href='https://firstclasstransfers.eu/admin/login'>https://firstclasstransfers.eu/admin/login</a>"
-    )
-    detail = (
-        f"<strong>Email:</strong> {user.email}<br>"
-        f"<strong>Password:</strong> {generated_password}<br>"
-        f"<strong>Role:</strong> {role_text}<br>"
-        f"<strong>Permissions:</strong> {permissions_text}"
+    message = message_html(
+        "Welcome to First Class Transfers! Your account has been created successfully.",
+        format_html("{}<br>{}", "Please visit the link below to log in:", link("https://firstclasstransfers.eu/admin/login")),
     )
+    detail = detail_html([
+        ("Email", user.email),
+        ("Password", generated_password),
+        ("Role", role_text),
+        ("Permissions", permissions_text),
+    ])
 
     with suppress(Exception):
         _send_html_email(subject, greeting, message, detail, user.email)
@@ -65,19 +67,20 @@ def signup_email_to_admin(user, permissions, admin):
     role_text = "Administrator" if user.is_superuser else "Staff"
 
     greeting = "Hello Admin"
-    message = (
-        "A new user account has been successfully created on the First Class Transfers platform."
-        "<br><br>The user has been provisioned with initial login credentials and instructed "
-        "to update their password upon first login."
-        "<br><br>No further action is required unless changes to roles or permissions are needed."
-    )
-    detail = (
-        f"<strong>Name:</strong> {user.full_name}<br>"
-        f"<strong>Email:</strong> {user.email}<br>"
-        f"<strong>Role:</strong> {role_text}<br>"
-        f"<strong>Permissions:</strong> {permissions_text}<br>"
-        f"<strong>Created By:</strong> {admin.full_name}"
+    message = message_html(
+        "A new user account has been successfully created on the First Class Transfers platform.",
+        "The user has been provisioned with initial login credentials and instructed "
+        "to update their password upon first login.",
+        "No further action is required unless changes to roles or permissions are needed.",
     )
+    detail = detail_html([
+        ("Name", user.full_name),
+        ("Email", user.email),
+        ("Role", role_text),
+        ("Permissions", permissions_text),
+        ("Created By", admin.full_name),
+    ])
 
     with suppress(Exception):
-        _send_html_email(subject, greeting, message, detail, settings.EMAIL_FROM)
\ No newline at end of file
+        if not hold_admin_event('user_created', subject, detail):
+            _send_html_email(subject, greeting, message, detail, settings.EMAIL_FROM)
\ No newline at end of file
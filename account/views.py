@@ -15,7 +15,9 @@ from rest_framework.validators import ValidationError
 from rest_framework.generics import RetrieveUpdateAPIView
 from contextlib import suppress
 from account.permissions import HasRoutesAPIKey
+from fct.query_plan import QueryPlanMixin
 from booking.emails import _send_html_email
+from notifications.rendering import detail_html, message_html
 
 from .models import UserProfile, PasswordResetCode
 from .serializers import (
@@ -175,12 +177,12 @@ class RequestPasswordResetView(APIView):
             # Send email with verification code
             subject = "Password Reset Verification Code"
             greeting = f"Hello {user.full_name or 'there'}"
-            msg = (
-                "You have requested to reset your password for your First Class Transfers account."
-                "<br><br>This code will expire in 15 minutes."
-                "<br><br>If you did not request this, please ignore this email."
+            msg = message_html(
+                "You have requested to reset your password for your First Class Transfers account.",
+                "This code will expire in 15 minutes.",
+                "If you did not request this, please ignore this email.",
             )
-            detail = f"<strong>Verification Code:</strong> {code}"
+            detail = detail_html([("Verification Code", code)])
 
             with suppress(Exception):
                 _send_html_email(subject, greeting, msg, detail, user.email)
@@ -243,11 +245,11 @@ class VerifyResetCodeView(APIView):
             # Send email with new password
             subject = "Your New Password - First Class Transfer"
             greeting = f"Hello {user.full_name or 'there'}"
-            msg = (
-                "Your password has been reset successfully."
-                "<br><br>Please log in with this new password and consider changing it for security."
+            msg = message_html(
+                "Your password has been reset successfully.",
+                "Please log in with this new password and consider changing it for security.",
             )
-            detail = f"<strong>New Password:</strong> {new_password}"
+            detail = detail_html([("New Password", new_password)])
 
             with suppress(Exception):
                 _send_html_email(subject, greeting, msg, detail, user.email)
@@ -259,7 +261,7 @@ class VerifyResetCodeView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserListView(generics.ListAPIView):
+class UserListView(QueryPlanMixin, generics.ListAPIView):
     """List all users. Admin only."""
     queryset = UserProfile.objects.filter(is_driver=False).order_by('-date_joined')
     serializer_class = UserProfileSerializer
@@ -270,7 +272,7 @@ class UserListView(generics.ListAPIView):
         return super().get(request, *args, **kwargs)
 
 
-class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
+class UserDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, or delete a user. Admin only."""
     queryset = UserProfile.objects.all()
     serializer_class = UserProfileSerializer
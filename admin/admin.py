@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Leads
+from .models import ContactMessage, Leads
 
 
 @admin.register(Leads)
@@ -7,3 +7,11 @@ class LeadsAdmin(admin.ModelAdmin):
     list_display = ("id", "name", "email", "created_at")
     search_fields = ("name", "email")
     ordering = ("-created_at",)
+
+
+@admin.register(ContactMessage)
+class ContactMessageAdmin(admin.ModelAdmin):
+    list_display = ("id", "subject", "name", "email", "created_at")
+    search_fields = ("name", "email", "subject")
+    readonly_fields = ("content_hash", "created_at")
+    ordering = ("-created_at",)
@@ -0,0 +1,87 @@
+"""
+Public contact form and lead intake.
+
+A submission is saved, and its admin email queued in the outbox, in one
+transaction, so the request never waits on SMTP. Each row stores a hash of
+the email address and the submitted content. A submission whose hash
+matches a row from the last INTAKE_DEDUPE_WINDOW seconds is not stored or
+emailed again. The earlier row is returned instead, so a double-click or a
+retried request gets the same answer as the first one.
+
+The newest row for a hash also holds it in its unique dedupe_key column.
+Parallel duplicates that all pass the check above then race on that
+constraint: one is inserted and the others get its row. A key older than
+the window is released in the same transaction as the insert that
+replaces it.
+"""
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import ContactMessage, Leads
+from .utils import contact_email_to_admin
+
+DEFAULT_DEDUPE_WINDOW = 10 * 60
+
+
+def content_hash(*parts):
+    """SHA-256 of the parts, ignoring case and runs of whitespace."""
+    normalized = '\x1f'.join(' '.join(str(part or '').split()).casefold() for part in parts)
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def dedupe_window_start():
+    window = getattr(settings, 'INTAKE_DEDUPE_WINDOW', DEFAULT_DEDUPE_WINDOW)
+    return timezone.now() - timedelta(seconds=window)
+
+
+def find_recent_duplicate(model, digest):
+    since = dedupe_window_start()
+    return model.objects.filter(content_hash=digest, created_at__gte=since).order_by('-created_at').first()
+
+
+def _submit_once(model, digest, create):
+    """
+    Run create() unless a recent row has this digest. Returns (row, created).
+
+    create() must store digest as the row's dedupe_key; a parallel duplicate
+    that got there first makes it raise IntegrityError.
+    """
+    duplicate = find_recent_duplicate(model, digest)
+    if duplicate:
+        return duplicate, False
+
+    try:
+        with transaction.atomic():
+            model.objects.filter(dedupe_key=digest, created_at__lt=dedupe_window_start()).update(dedupe_key=None)
+            return create(), True
+    except IntegrityError:
+        duplicate = model.objects.filter(dedupe_key=digest).first()
+        if duplicate is None:
+            raise
+        return duplicate, False
+
+
+def submit_contact_message(data):
+    """Store validated contact form data and queue the admin email. Returns (message, created)."""
+    digest = content_hash(
+        data['email'], data['name'], data.get('whatsapp_number'),
+        data.get('about'), data['subject'], data['message'],
+    )
+
+    def create():
+        message = ContactMessage.objects.create(content_hash=digest, dedupe_key=digest, **data)
+        contact_email_to_admin(message)
+        return message
+
+    return _submit_once(ContactMessage, digest, create)
+
+
+def submit_lead(serializer):
+    """Save a validated LeadSerializer unless the same lead was just submitted. Returns (lead, created)."""
+    data = serializer.validated_data
+    digest = content_hash(data['email'], data['name'])
+    return _submit_once(Leads, digest, lambda: serializer.save(content_hash=digest, dedupe_key=digest))
@@ -4,10 +4,40 @@ from django.db import models
 class Leads(models.Model):
     name = models.CharField(max_length=255)
     email = models.EmailField()
+    content_hash = models.CharField(max_length=64, blank=True, default='')
+    # content_hash while this is the newest lead with it; unique, so parallel
+    # duplicates cannot both be inserted (admin.intake).
+    dedupe_key = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["content_hash", "created_at"], name="lead_dedupe_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} <{self.email}>"
+
+
+class ContactMessage(models.Model):
+    """A contact form submission, stored before the admin email is queued."""
+    name = models.CharField(max_length=100)
+    whatsapp_number = models.CharField(max_length=20, blank=True, default='')
+    about = models.TextField(blank=True, default='')
+    email = models.EmailField()
+    subject = models.CharField(max_length=200)
+    message = models.TextField()
+    content_hash = models.CharField(max_length=64)
+    # content_hash while this is the newest message with it (see Leads.dedupe_key).
+    dedupe_key = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["content_hash", "created_at"], name="contact_dedupe_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} – {self.name} <{self.email}>"
@@ -1,9 +1,16 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
 from django.test import TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from account.models import UserProfile
+from fct.testing import QueryCountAssertions
+from routes.models import Route, RouteFAQ, Vehicle as RouteVehicle
 from .models import Leads
 
 
@@ -17,6 +24,7 @@ class LeadEndpointsTest(TestCase):
         )
         self.api_key_headers = {"HTTP_API_KEY": "test-api-key"}
         self.lead = Leads.objects.create(name="Jane Doe", email="jane@example.com")
+        cache.clear()
 
     def test_create_lead_with_api_key(self):
         response = self.client.post(
@@ -30,6 +38,41 @@ class LeadEndpointsTest(TestCase):
         self.assertEqual(response.json()["message"], "Lead created successfully")
         self.assertTrue(Leads.objects.filter(email="john@example.com").exists())
 
+    def test_duplicate_lead_is_not_created_twice(self):
+        payload = {"name": "John Doe", "email": "john@example.com"}
+
+        first = self.client.post(reverse("admin-lead-create"), payload, format="json", **self.api_key_headers)
+        second = self.client.post(reverse("admin-lead-create"), payload, format="json", **self.api_key_headers)
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.json()["message"], "Lead already received")
+        self.assertEqual(second.json()["lead"]["id"], first.json()["lead"]["id"])
+        self.assertEqual(Leads.objects.filter(email="john@example.com").count(), 1)
+
+    def test_parallel_duplicate_lead_is_not_created_twice(self):
+        payload = {"name": "John Doe", "email": "john@example.com"}
+        first = self.client.post(reverse("admin-lead-create"), payload, format="json", **self.api_key_headers)
+
+        # A parallel duplicate checks before the first insert commits, so the check finds nothing.
+        with patch("admin.intake.find_recent_duplicate", return_value=None):
+            second = self.client.post(reverse("admin-lead-create"), payload, format="json", **self.api_key_headers)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.json()["lead"]["id"], first.json()["lead"]["id"])
+        self.assertEqual(Leads.objects.filter(email="john@example.com").count(), 1)
+
+    def test_lead_repeated_after_the_dedupe_window_is_stored(self):
+        payload = {"name": "John Doe", "email": "john@example.com"}
+        first = self.client.post(reverse("admin-lead-create"), payload, format="json", **self.api_key_headers)
+        Leads.objects.filter(pk=first.json()["lead"]["id"]).update(created_at=timezone.now() - timedelta(hours=1))
+
+        second = self.client.post(reverse("admin-lead-create"), payload, format="json", **self.api_key_headers)
+
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Leads.objects.filter(email="john@example.com").count(), 2)
+        self.assertIsNone(Leads.objects.get(pk=first.json()["lead"]["id"]).dedupe_key)
+
     def test_list_leads_requires_admin_user(self):
         self.client.force_authenticate(user=self.admin_user)
 
@@ -64,3 +107,31 @@ class LeadEndpointsTest(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Leads.objects.filter(pk=self.lead.pk).exists())
+
+
+@override_settings(API_KEY="test-api-key")
+class AdminListQueryCountTest(QueryCountAssertions, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=UserProfile.objects.create_superuser(email="admin@example.com", password="password123")
+        )
+
+    def _create_lead(self, index):
+        Leads.objects.create(name=f"Lead {index}", email=f"lead{index}@example.com")
+
+    def _create_route(self, index):
+        route = Route.objects.create(
+            from_location=f"Town {index}", to_location="Limassol", meta_title="Title",
+            meta_description="Description", hero_title="Hero", sub_headline="Sub", body="Body",
+            distance="70 km", time="50 mins", duration_minutes=50, sedan_price=70, van_price=100,
+            image="routes/test.jpg", book_cta_label="Book", book_cta_support="Support",
+        )
+        RouteVehicle.objects.create(route=route, vehicle_type="sedan", max_passengers=3, ideal_for="Couples", fixed_price=70)
+        RouteFAQ.objects.create(route=route, question="Question?", answer="Answer.")
+
+    def test_lead_list(self):
+        self.assertListQueriesConstant(reverse("admin-lead-list"), self._create_lead, HTTP_API_KEY="test-api-key")
+
+    def test_route_list(self):
+        self.assertListQueriesConstant(reverse("admin-route-list"), self._create_route, HTTP_API_KEY="test-api-key")
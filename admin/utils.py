@@ -2,6 +2,9 @@ from django.conf import settings
 from contextlib import suppress
 
 from booking.emails import _send_html_email
+from notifications.digest import hold_admin_event
+from notifications.outbox import enqueue_email
+from notifications.rendering import detail_html, link, message_html
 
 
 ADMIN_DASHBOARD_URL = "https://firstclasstransfers.eu/admin/login"
@@ -10,34 +13,50 @@ ADMIN_DASHBOARD_URL = "https://firstclasstransfers.eu/admin/login"
 def route_created_email_to_admin(user, route):
     subject = f"{route.from_location} to {route.to_location} Created on the Platform"
     greeting = "Hello Admin"
-    message = (
-        "A new route has been successfully created on the First Class Transfers platform."
-        "<br><br>The route is now live in the system."
-        f"<br><br><a href='{ADMIN_DASHBOARD_URL}'>{ADMIN_DASHBOARD_URL}</a>"
-    )
-    detail = (
-        f"<strong>From:</strong> {route.from_location}<br>"
-        f"<strong>To:</strong> {route.to_location}<br>"
-        f"<strong>Created By:</strong> {user.full_name}"
+    message = message_html(
+        "A new route has been successfully created on the First Class Transfers platform.",
+        "The route is now live in the system.",
+        link(ADMIN_DASHBOARD_URL),
     )
+    detail = detail_html([
+        ("From", route.from_location),
+        ("To", route.to_location),
+        ("Created By", user.full_name),
+    ])
 
     with suppress(Exception):
-        _send_html_email(subject, greeting, message, detail, settings.EMAIL_FROM)
+        if not hold_admin_event('route_created', subject, detail):
+            _send_html_email(subject, greeting, message, detail, settings.EMAIL_FROM)
 
 
 def update_created_email_to_admin(user, route):
     subject = f"{route.from_location} to {route.to_location} Updated"
     greeting = "Hello Admin"
-    message = (
-        "A route has been updated on the First Class Transfers platform."
-        "<br><br>The updated route is now live in the system."
-        f"<br><br><a href='{ADMIN_DASHBOARD_URL}'>{ADMIN_DASHBOARD_URL}</a>"
-    )
-    detail = (
-        f"<strong>From:</strong> {route.from_location}<br>"
-        f"<strong>To:</strong> {route.to_location}<br>"
-        f"<strong>Updated By:</strong> {user.full_name}"
+    message = message_html(
+        "A route has been updated on the First Class Transfers platform.",
+        "The updated route is now live in the system.",
+        link(ADMIN_DASHBOARD_URL),
     )
+    detail = detail_html([
+        ("From", route.from_location),
+        ("To", route.to_location),
+        ("Updated By", user.full_name),
+    ])
 
     with suppress(Exception):
-        _send_html_email(subject, greeting, message, detail, settings.EMAIL_FROM)
+        if not hold_admin_event('route_updated', subject, detail):
+            _send_html_email(subject, greeting, message, detail, settings.EMAIL_FROM)
+
+
+def contact_email_to_admin(contact):
+    """Queue the plain-text contact form notification for the admin mailbox."""
+    body = (
+        "New contact form submission:\n\n"
+        f"Name: {contact.name}\n"
+        f"WhatsApp Number: {contact.whatsapp_number}\n"
+        f"About: {contact.about}\n"
+        f"Email: {contact.email}\n\n"
+        f"Message:\n{contact.message}"
+    )
+    return enqueue_email(f"Contact Us: {contact.subject}", [settings.EMAIL_FROM], body=body)
+
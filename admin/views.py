@@ -17,6 +17,7 @@ from .utils import route_created_email_to_admin, update_created_email_to_admin
 from django.http import FileResponse, Http404
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAdminUser
+from rest_framework.throttling import ScopedRateThrottle
 from account.permissions import HasRoutePermission, HasRoutesAPIKey
 from rest_framework.parsers import MultiPartParser, FormParser
 from routes.models import Vehicle as RouteVehicle, RouteFAQ, Route
@@ -24,10 +25,12 @@ from vehicle.models import Vehicle
 from booking.models import Booking
 from account.models import UserProfile
 from notifications.models import DriverNotification
+from .intake import submit_lead
 from .models import Leads
 from .serializers import CreateRouteSerializer, LeadSerializer
 from account.utils import log_user_activity, get_activity_log_path
-from fct.parsers import recursive_underscoreize
+from fct.casing import underscoreize_keys
+from fct.query_plan import QueryPlanMixin
 
 
 class JSONFieldParserMixin:
@@ -53,7 +56,7 @@ class JSONFieldParserMixin:
                     try:
                         parsed = json.loads(data[field])
                         # Convert camelCase keys to snake_case in parsed JSON
-                        data[field] = recursive_underscoreize(parsed)
+                        data[field] = underscoreize_keys(parsed)
                     except (json.JSONDecodeError, TypeError):
                         pass
 
@@ -62,13 +65,13 @@ class JSONFieldParserMixin:
         return super().get_serializer(*args, **kwargs)
 
 
-class LeadListView(ListAPIView):
+class LeadListView(QueryPlanMixin, ListAPIView):
     queryset = Leads.objects.all()
     serializer_class = LeadSerializer
     permission_classes = [HasRoutesAPIKey, IsAdminUser]
 
 
-class LeadRetrieveView(RetrieveAPIView):
+class LeadRetrieveView(QueryPlanMixin, RetrieveAPIView):
     queryset = Leads.objects.all()
     serializer_class = LeadSerializer
     permission_classes = [HasRoutesAPIKey, IsAdminUser]
@@ -77,6 +80,8 @@ class LeadRetrieveView(RetrieveAPIView):
 class LeadCreateView(CreateAPIView):
     queryset = Leads.objects.all()
     serializer_class = LeadSerializer
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'leads'
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -87,14 +92,14 @@ class LeadCreateView(CreateAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        lead = serializer.save()
+        lead, created = submit_lead(serializer)
 
         return Response(
             {
-                "message": "Lead created successfully",
+                "message": "Lead created successfully" if created else "Lead already received",
                 "lead": self.get_serializer(lead).data,
             },
-            status=status.HTTP_201_CREATED
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
         )
 
 
@@ -116,7 +121,7 @@ class LeadDeleteView(DestroyAPIView):
         return super().destroy(request, *args, **kwargs)
 
 
-class RouteListView(ListAPIView):
+class RouteListView(QueryPlanMixin, ListAPIView):
     """List all routes."""
     queryset = Route.objects.all()
     serializer_class = CreateRouteSerializer
@@ -184,7 +189,7 @@ class CreateRouteView(JSONFieldParserMixin, CreateAPIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-class RetrieveUpdateDestroyRouteView(JSONFieldParserMixin, RetrieveUpdateDestroyAPIView):
+class RetrieveUpdateDestroyRouteView(JSONFieldParserMixin, QueryPlanMixin, RetrieveUpdateDestroyAPIView):
     """Retrieve, update or delete an existing route with nested vehicle options and FAQs."""
     queryset = Route.objects.all()
     serializer_class = CreateRouteSerializer
@@ -0,0 +1,46 @@
+"""
+Standalone performance benchmarks.
+
+Each module runs against a throwaway test database created from the
+configured DATABASES setting, so the real data is never touched:
+
+    python -m benchmarks.availability 1000 10000 100000
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    """Configure Django so benchmark modules can import models."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fct.settings')
+
+    import django
+    django.setup()
+
+
+@contextmanager
+def benchmark_database():
+    """Create a disposable test database for the duration of the benchmark."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def timed(func, repeat=20):
+    """Run `func` `repeat` times and return the median duration in milliseconds."""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - started) * 1000)
+    return statistics.median(durations)
@@ -0,0 +1,62 @@
+"""
+Benchmark the auto-assignment solver on a synthetic day of pending bookings.
+
+    python -m benchmarks.auto_assign [bookings per day...]
+
+The solver runs on plain data, so no database is needed. Each size gets a
+fleet scaled to roughly one driver per eight bookings, with every vehicle
+type and a spread of capacities.
+"""
+import random
+import sys
+import time
+
+from benchmarks import setup_django
+
+DEFAULT_SIZES = [500, 2_000, 5_000]
+DAY_SECONDS = 24 * 60 * 60
+LONGEST_WINDOW = 3 * 60 * 60
+VEHICLE_TYPES = [("sedan", [3, 4]), ("van", [6, 8]), ("minibus", [12, 16])]
+
+
+def _build_problem(size, rng):
+    from booking.auto_assign import ResourceSchedule
+
+    jobs = []
+    for index in range(size):
+        start = rng.randrange(0, DAY_SECONDS, 15 * 60)
+        duration = rng.choice([40, 50, 60, 90, 120, 150]) * 60
+        vehicle_type, capacities = rng.choice(VEHICLE_TYPES)
+        jobs.append({
+            'key': index,
+            'windows': [(start, start + duration)],
+            'vehicle_type': vehicle_type,
+            'passengers': rng.randint(1, max(capacities)),
+        })
+
+    fleet_size = max(size // 8, 1)
+    drivers = {driver_id: ResourceSchedule(LONGEST_WINDOW) for driver_id in range(fleet_size)}
+    vehicles = []
+    for vehicle_id in range(fleet_size):
+        vehicle_type, capacities = VEHICLE_TYPES[vehicle_id % len(VEHICLE_TYPES)]
+        vehicles.append((vehicle_id, vehicle_type, rng.choice(capacities), ResourceSchedule(LONGEST_WINDOW)))
+    return jobs, drivers, vehicles
+
+
+def run(sizes):
+    from booking.auto_assign import solve_assignments
+
+    rng = random.Random(0)
+
+    print(f"{'bookings':>10} {'fleet':>8} {'assigned':>10} {'solve (ms)':>12}")
+    for size in sizes:
+        jobs, drivers, vehicles = _build_problem(size, rng)
+        started = time.perf_counter()
+        assignments, _ = solve_assignments(jobs, drivers, vehicles)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"{size:>10} {len(drivers):>8} {len(assignments):>10} {elapsed:>12.1f}")
+
+
+if __name__ == '__main__':
+    setup_django()
+    run([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,129 @@
+"""
+Benchmark get_available_drivers / get_available_vehicles against booking history size.
+
+    python -m benchmarks.availability [history sizes...]
+
+Historical bookings are spread over the years before the target booking, so a
+scan-everything implementation grows linearly with history while the indexed
+lookup stays flat.
+"""
+import random
+import sys
+from datetime import date, time, timedelta
+
+from benchmarks import benchmark_database, setup_django, timed
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DRIVER_COUNT = 40
+VEHICLE_COUNT = 40
+BATCH_SIZE = 5_000
+
+
+def _create_fixtures():
+    from account.models import UserProfile
+    from booking.models import Booking, PassengerDetail, TransferInformation
+    from routes.models import Route
+    from vehicle.models import Vehicle
+
+    route = Route.objects.create(
+        from_location="Larnaca Airport",
+        to_location="Limassol",
+        meta_title="Larnaca Airport to Limassol",
+        meta_description="Benchmark route",
+        hero_title="Larnaca Airport to Limassol",
+        sub_headline="Benchmark",
+        body="Benchmark",
+        distance="70 km",
+        time="50 mins",
+        duration_minutes=50,
+        sedan_price=70,
+        van_price=100,
+        image="routes/benchmark.jpg",
+        book_cta_label="Book",
+        book_cta_support="Support",
+    )
+    drivers = UserProfile.objects.bulk_create(
+        UserProfile(email=f"driver{i}@example.com", full_name=f"Driver {i}", is_driver=True)
+        for i in range(DRIVER_COUNT)
+    )
+    vehicles = Vehicle.objects.bulk_create(
+        Vehicle(license_plate=f"BNC{i:03}", make="Mercedes", model="E", type="sedan", max_passengers=3)
+        for i in range(VEHICLE_COUNT)
+    )
+    transfer = TransferInformation.objects.create(adults=1, luggage="Hand")
+    passenger = PassengerDetail.objects.create(
+        full_name="Benchmark Passenger",
+        phone_number="+35700000000",
+        email_address="bench@example.com",
+    )
+
+    today = date.today()
+    target = Booking.objects.create(
+        booking_id="FCTtarget",
+        route=route,
+        vehicle_type="sedan",
+        payment_type="card",
+        trip_type="Return",
+        pickup_date=today + timedelta(days=3),
+        pickup_time=time(10, 0),
+        return_date=today + timedelta(days=10),
+        return_time=time(18, 0),
+        time_period="Day Tariff",
+        transfer_information=transfer,
+        passenger_information=passenger,
+    )
+    return target, drivers, vehicles
+
+
+def _grow_history(target, drivers, vehicles, current_size, history_size, rng):
+    """Add historical bookings until the history holds `history_size` rows."""
+    from booking.models import Booking
+
+    today = date.today()
+    created = current_size
+    while created < history_size:
+        batch = []
+        for _ in range(min(BATCH_SIZE, history_size - created)):
+            pickup_date = today - timedelta(days=rng.randint(1, 3650))
+            booking = Booking(
+                booking_id=f"FCThist{created}",
+                route=target.route,
+                booking_status=rng.choice(["Assigned", "Completed", "Cancelled"]),
+                vehicle_type="sedan",
+                payment_type="card",
+                trip_type="One Way",
+                pickup_date=pickup_date,
+                pickup_time=time(rng.randint(0, 23), rng.choice([0, 15, 30, 45])),
+                time_period="Day Tariff",
+                driver=rng.choice(drivers),
+                vehicle=rng.choice(vehicles),
+                transfer_information=target.transfer_information,
+                passenger_information=target.passenger_information,
+            )
+            booking.set_schedule_windows()
+            batch.append(booking)
+            created += 1
+        Booking.objects.bulk_create(batch)
+
+
+def run(sizes):
+    from booking.utils import get_available_drivers, get_available_vehicles
+
+    rng = random.Random(0)
+    target, drivers, vehicles = _create_fixtures()
+    current_size = 0
+
+    print(f"{'history':>10} {'drivers (ms)':>14} {'vehicles (ms)':>14}")
+    for size in sorted(sizes):
+        _grow_history(target, drivers, vehicles, current_size, size, rng)
+        current_size = size
+
+        drivers_ms = timed(lambda: list(get_available_drivers(target, target.booking_id)))
+        vehicles_ms = timed(lambda: list(get_available_vehicles(target, target.booking_id)))
+        print(f"{size:>10} {drivers_ms:>14.2f} {vehicles_ms:>14.2f}")
+
+
+if __name__ == '__main__':
+    setup_django()
+    with benchmark_database():
+        run([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,104 @@
+"""
+Benchmark camelCase <-> snake_case conversion of API payloads.
+
+    python -m benchmarks.casing [bookings]
+
+Renders the booking list (BookingDetailSerializer over `bookings` rows)
+with djangorestframework_camel_case's renderer and with
+fct.renderers.CamelCaseJSONRenderer, then parses a nested route payload
+with the previous recursive_underscoreize and with fct.casing.
+"""
+import json
+import sys
+from datetime import date, time, timedelta
+
+from benchmarks import benchmark_database, setup_django, timed
+
+DEFAULT_BOOKINGS = 1_000
+PARSE_REPEAT = 1_000
+
+ROUTE_PAYLOAD = {
+    'fromLocation': "Larnaca Airport", 'toLocation': "Limassol",
+    'metaTitle': "Larnaca Airport to Limassol", 'metaDescription': "Benchmark",
+    'heroTitle': "Larnaca Airport to Limassol", 'subHeadline': "Benchmark", 'body': "Benchmark",
+    'distance': "70 km", 'time': "50 mins", 'durationMinutes': 50,
+    'sedanPrice': "70.00", 'vanPrice': "100.00",
+    'bookCtaLabel': "Book", 'bookCtaSupport': "Support",
+    'vehicleOptions': [
+        {'vehicleType': kind, 'maxPassengers': passengers, 'idealFor': "Families", 'fixedPrice': "70.00"}
+        for kind, passengers in (('sedan', 3), ('van', 8), ('minibus', 14))
+    ],
+    'faqs': [{'question': f"Question {i}?", 'answer': f"Answer {i}.", 'sortOrder': i} for i in range(10)],
+}
+
+
+def previous_recursive_underscoreize(data):
+    """fct.parsers.recursive_underscoreize before fct.casing."""
+    from djangorestframework_camel_case.util import underscoreize
+
+    if isinstance(data, dict):
+        return {key: previous_recursive_underscoreize(value) for key, value in underscoreize(data).items()}
+    if isinstance(data, list):
+        return [previous_recursive_underscoreize(item) for item in data]
+    return data
+
+
+def create_bookings(count):
+    from booking.models import Booking, PassengerDetail, TransferInformation
+    from routes.models import Route
+
+    route = Route.objects.create(
+        from_location="Larnaca Airport", to_location="Limassol", meta_title="Benchmark",
+        meta_description="Benchmark", hero_title="Benchmark", sub_headline="Benchmark", body="Benchmark",
+        distance="70 km", time="50 mins", duration_minutes=50, sedan_price=70, van_price=100,
+        image="routes/benchmark.jpg", book_cta_label="Book", book_cta_support="Support",
+    )
+    transfer = TransferInformation.objects.create(adults=2, children=1, luggage="Large", flight_number="CY123")
+    passenger = PassengerDetail.objects.create(
+        full_name="Benchmark Passenger", phone_number="+35700000000", email_address="bench@example.com",
+    )
+    today = date.today()
+    bookings = []
+    for i in range(count):
+        booking = Booking(
+            booking_id=f"FCTcase{i}", route=route, vehicle_type="sedan", payment_type="card",
+            trip_type="One Way", pickup_date=today + timedelta(days=i % 365), pickup_time=time(10, 30),
+            time_period="Day Tariff", amount_paid=50, outstanding_amount=20, total_amount=70,
+            transfer_information=transfer, passenger_information=passenger,
+        )
+        booking.set_schedule_windows()
+        bookings.append(booking)
+    Booking.objects.bulk_create(bookings)
+
+
+def run(count):
+    from djangorestframework_camel_case.render import CamelCaseJSONRenderer as LibraryCamelCaseJSONRenderer
+    from booking.serializers import BookingDetailSerializer
+    from booking.views import BookingListView
+    from fct.casing import underscoreize_keys
+    from fct.query_plan import serializer_query_plan
+    from fct.renderers import CamelCaseJSONRenderer
+
+    create_bookings(count)
+    data = BookingDetailSerializer(
+        serializer_query_plan(BookingDetailSerializer).apply(BookingListView.queryset.all()), many=True
+    ).data
+    library, renderer = LibraryCamelCaseJSONRenderer(), CamelCaseJSONRenderer()
+    assert library.render(data) == renderer.render(data)
+
+    print(f"{'':>22} {'before (ms)':>12} {'after (ms)':>11} {'speedup':>8}")
+    before = timed(lambda: library.render(data), repeat=10)
+    after = timed(lambda: renderer.render(data), repeat=10)
+    print(f"{f'render {count} bookings':>22} {before:>12.1f} {after:>11.1f} {before / after:>7.1f}x")
+
+    body = json.loads(json.dumps(ROUTE_PAYLOAD))
+    assert previous_recursive_underscoreize(body) == underscoreize_keys(body)
+    before = timed(lambda: [previous_recursive_underscoreize(body) for _ in range(PARSE_REPEAT)], repeat=10)
+    after = timed(lambda: [underscoreize_keys(body) for _ in range(PARSE_REPEAT)], repeat=10)
+    print(f"{f'parse {PARSE_REPEAT} routes':>22} {before:>12.1f} {after:>11.1f} {before / after:>7.1f}x")
+
+
+if __name__ == '__main__':
+    setup_django()
+    with benchmark_database():
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BOOKINGS)
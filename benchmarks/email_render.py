@@ -0,0 +1,115 @@
+"""
+Microbenchmark per-email render cost.
+
+    python -m benchmarks.email_render [emails]
+
+Compares render_to_string('email.html', ...) with the compiled template from
+notifications.rendering, and builds the three assignment emails (passenger,
+driver, admin) for one booking the old way (one render_to_string per email)
+and inside email_batch() (shared summary rows, one render pass).
+Uses unsaved model instances, so no database is needed except for the final
+outbox INSERT, which is excluded here.
+"""
+import sys
+from datetime import date, time
+from unittest.mock import patch
+
+from benchmarks import setup_django, timed
+
+DEFAULT_EMAILS = 1000
+
+
+def _booking():
+    from account.models import UserProfile
+    from booking.models import Booking, PassengerDetail, TransferInformation
+    from routes.models import Route
+    from vehicle.models import Vehicle
+
+    return Booking(
+        pk=1,
+        booking_id="FCTbench0001",
+        route=Route(pk=1, from_location="Larnaca Airport", to_location="Limassol", duration_minutes=50),
+        trip_type="Return",
+        pickup_date=date(2026, 6, 1),
+        pickup_time=time(10, 0),
+        return_date=date(2026, 6, 8),
+        return_time=time(18, 0),
+        payment_type="card",
+        payment_status="paid",
+        booking_status="Assigned",
+        driver=UserProfile(full_name="Bench Driver", email="driver@example.com", phone_number="+35700000001"),
+        vehicle=Vehicle(license_plate="CY001", make="Mercedes", model="V-Class", type="van", max_passengers=7),
+        transfer_information=TransferInformation(adults=2, children=1, luggage="Large", flight_number="CY123"),
+        passenger_information=PassengerDetail(
+            full_name="Bench Passenger",
+            phone_number="+35700000000",
+            email_address="passenger@example.com",
+            additional_information="Child seat <please> & booster",
+        ),
+    )
+
+
+def run(count):
+    from django.template.loader import render_to_string
+    from django.utils.safestring import mark_safe
+
+    from account.models import UserProfile
+    from booking.admin_emails import send_assignment_to_admin
+    from booking.emails import send_assignment_to_driver, send_assignment_to_passenger
+    from notifications import rendering
+
+    booking = _booking()
+    admin = UserProfile(full_name="Bench Admin", email="admin@example.com")
+    context = {
+        'title': "Your Booking #FCTbench0001 is Confirmed",
+        'greeting': "Hello Bench Passenger",
+        'message': mark_safe("Great news!<br><br>Your driver will arrive on time."),
+        'detail': mark_safe("<strong>Booking ID:</strong> FCTbench0001<br><strong>Route:</strong> A → B"),
+    }
+
+    def django_render():
+        for _ in range(count):
+            render_to_string('email.html', context)
+
+    def compiled_render():
+        for _ in range(count):
+            rendering.render_email(context['title'], context['greeting'], context['message'], context['detail'])
+
+    def send_three():
+        send_assignment_to_passenger(booking)
+        send_assignment_to_admin(booking, admin)
+        send_assignment_to_driver(booking)
+
+    def old_assignment():
+        # The previous path: every email rendered on its own with render_to_string.
+        def queue(subject, greeting, message, detail, recipient):
+            render_to_string('email.html', {
+                'title': subject, 'greeting': greeting,
+                'message': mark_safe(message), 'detail': mark_safe(detail),
+            })
+        with patch.object(rendering, 'queue_html_email', queue):
+            for _ in range(count // 3):
+                send_three()
+
+    def batched_assignment():
+        with patch('notifications.outbox.enqueue_emails', lambda emails: list(emails)):
+            for _ in range(count // 3):
+                with rendering.email_batch():
+                    send_three()
+
+    with patch('booking.emails.queue_html_email', lambda *args: rendering.queue_html_email(*args)):
+        results = [
+            ("render_to_string", timed(django_render, repeat=5), count),
+            ("compiled template", timed(compiled_render, repeat=5), count),
+            ("assignment emails, per email", timed(old_assignment, repeat=5), count // 3 * 3),
+            ("assignment emails, batched", timed(batched_assignment, repeat=5), count // 3 * 3),
+        ]
+
+    print(f"{'':>30} {'total (ms)':>12} {'per email (us)':>16}")
+    for name, total_ms, emails in results:
+        print(f"{name:>30} {total_ms:>12.1f} {total_ms * 1000 / emails:>16.1f}")
+
+
+if __name__ == '__main__':
+    setup_django()
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_EMAILS)
@@ -0,0 +1,135 @@
+"""
+Microbenchmark booking payload normalization.
+
+    python -m benchmarks.normalize [requests]
+
+Each accepted payload shape (nested JSON after the camel-case parser,
+multipart bracket keys, dot keys and flat aliases) is normalized `requests`
+times, the way normalize_booking_request_data used to and the way it does
+now. The route column compares Route.objects.get(route_id=...) on every
+request with the cached route_id -> pk lookup.
+"""
+import json
+import re
+import sys
+from contextlib import suppress
+
+from benchmarks import benchmark_database, setup_django, timed
+from benchmarks.casing import previous_recursive_underscoreize
+
+DEFAULT_REQUESTS = 2000
+
+SHAPES = {
+    'json': {
+        'route': 'fctbench001',
+        'amountPaid': '50.00', 'outstandingAmount': '100.00', 'totalAmount': '150',
+        'vehicleType': 'sedan', 'paymentType': 'card', 'tripType': 'One Way',
+        'pickupDate': '2026-06-01', 'pickupTime': '10:30:00', 'timePeriod': 'Day Tariff',
+        'transferInformation': {'flightNumber': 'CY123', 'adults': 2, 'children': 1, 'luggage': 'Large'},
+        'passengerInformation': {
+            'fullName': 'Jane Doe', 'phoneNumber': '+35700000000',
+            'emailAddress': 'jane@example.com', 'additionalInformation': 'Child seat',
+        },
+    },
+    'bracket': {
+        'route': 'fctbench001', 'amountPaid': '50.00', 'tripType': 'One Way',
+        'transferInformation[flightNumber]': 'CY123', 'transferInformation[adults]': '2',
+        'transferInformation[luggage]': 'Large', 'passengerInformation[fullName]': 'Jane Doe',
+        'passengerInformation[phoneNumber]': '+35700000000',
+        'passengerInformation[emailAddress]': 'jane@example.com',
+    },
+    'dot': {
+        'route': 'fctbench001', 'amountPaid': '50.00', 'tripType': 'One Way',
+        'transferInformation.flightNumber': 'CY123', 'transferInformation.adults': '2',
+        'transferInformation.luggage': 'Large', 'passengerInformation.fullName': 'Jane Doe',
+        'passengerInformation.phoneNumber': '+35700000000',
+        'passengerInformation.emailAddress': 'jane@example.com',
+    },
+    'flat': {
+        'route': 'fctbench001', 'amountPaid': '50.00', 'tripType': 'One Way',
+        'flightNumber': 'CY123', 'adults': '2', 'luggage': 'Large', 'fullName': 'Jane Doe',
+        'phoneNumber': '+35700000000', 'emailAddress': 'jane@example.com',
+    },
+}
+
+
+def previous_normalize(raw_data, resolve_route=True):
+    """normalize_booking_request_data before the single-pass rewrite."""
+    from booking.normalizers import BOOKING_NESTED_FIELDS, _assign_nested_value, _coerce_request_data
+    from routes.models import Route
+
+    def extract(key, prefix):
+        if key.startswith(f"{prefix}."):
+            return [segment for segment in key[len(prefix) + 1:].split('.') if segment]
+        bracket_pattern = re.compile(r'\[([^\[\]]+)\]')
+        if key.startswith(f"{prefix}["):
+            suffix = key[len(prefix):]
+            path = bracket_pattern.findall(suffix)
+            if path and suffix == ''.join(f'[{segment}]' for segment in path):
+                return path
+        return None
+
+    data = previous_recursive_underscoreize(_coerce_request_data(raw_data))
+    for field_name in BOOKING_NESTED_FIELDS:
+        if field_name in data and isinstance(data[field_name], str):
+            with suppress(Exception):
+                data[field_name] = previous_recursive_underscoreize(json.loads(data[field_name]))
+
+    for field_name, nested_fields in BOOKING_NESTED_FIELDS.items():
+        nested_payload = data.get(field_name)
+        if not isinstance(nested_payload, dict):
+            nested_payload = {}
+        consumed_keys = []
+        for key, value in list(data.items()):
+            if key == field_name:
+                continue
+            key_path = extract(key, field_name)
+            if key_path:
+                _assign_nested_value(nested_payload, key_path, value)
+                consumed_keys.append(key)
+                continue
+            if key in nested_fields and key not in nested_payload:
+                nested_payload[key] = value
+                consumed_keys.append(key)
+        if nested_payload:
+            data[field_name] = nested_payload
+        for key in consumed_keys:
+            data.pop(key, None)
+
+    if resolve_route and 'route' in data and isinstance(data['route'], str):
+        with suppress(Exception):
+            data['route'] = Route.objects.get(route_id=data['route']).pk
+    return data
+
+
+def run(count):
+    from booking.normalizers import normalize_booking_request_data
+    from routes.models import Route
+
+    Route.objects.create(
+        route_id='fctbench001', from_location="Larnaca Airport", to_location="Limassol",
+        meta_title="Benchmark", meta_description="Benchmark", hero_title="Benchmark",
+        sub_headline="Benchmark", body="Benchmark", distance="70 km", time="50 mins",
+        duration_minutes=50, sedan_price=70, van_price=100, image="routes/benchmark.jpg",
+        book_cta_label="Book", book_cta_support="Support",
+    )
+    # Requests reach the view already underscoreized by the RecursiveCamelCase* parsers.
+    parsed = {name: previous_recursive_underscoreize(payload) for name, payload in SHAPES.items()}
+
+    print(f"{count} requests per shape")
+    print(f"{'shape':>8} {'before (ms)':>12} {'after (ms)':>11} {'speedup':>8}")
+    for name, payload in parsed.items():
+        before = timed(lambda: [previous_normalize(payload, resolve_route=False) for _ in range(count)], repeat=5)
+        after = timed(lambda: [normalize_booking_request_data(payload, resolve_route=False) for _ in range(count)], repeat=5)
+        print(f"{name:>8} {before:>12.1f} {after:>11.1f} {before / after:>7.1f}x")
+
+    payload = parsed['json']
+    before = timed(lambda: [previous_normalize(payload) for _ in range(count)], repeat=5)
+    after = timed(lambda: [normalize_booking_request_data(payload) for _ in range(count)], repeat=5)
+    print(f"{'route':>8} {before:>12.1f} {after:>11.1f} {before / after:>7.1f}x")
+
+
+if __name__ == '__main__':
+    setup_django()
+    with benchmark_database():
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_REQUESTS)
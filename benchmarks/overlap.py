@@ -0,0 +1,66 @@
+"""
+Microbenchmark the sorted-sweep overlap kernel against the pairwise loop.
+
+    python -m benchmarks.overlap [windows:busy ...]
+
+Each case times answering "which resources are busy during each window" for
+`windows` new windows against `busy` existing resource intervals spread over
+a month. The loop compares every pair with check_time_overlap on datetimes,
+as get_availability_matrix used to. The sweep converts to epoch seconds
+and runs find_resource_conflicts.
+"""
+import random
+import sys
+from datetime import datetime, timedelta
+
+from benchmarks import setup_django, timed
+
+DEFAULT_CASES = [(100, 1_000), (1_000, 5_000), (2_000, 20_000)]
+RESOURCE_COUNT = 200
+MONTH_MINUTES = 30 * 24 * 60
+
+
+def _random_windows(count, rng):
+    origin = datetime(2026, 6, 1)
+    windows = []
+    for _ in range(count):
+        start = origin + timedelta(minutes=rng.randrange(0, MONTH_MINUTES, 15))
+        windows.append((start, start + timedelta(minutes=rng.choice([80, 90, 120, 180]))))
+    return windows
+
+
+def run(cases):
+    from booking.overlap import find_resource_conflicts
+    from booking.utils import check_time_overlap, to_epoch
+
+    rng = random.Random(0)
+
+    print(f"{'windows':>8} {'busy':>8} {'loop (ms)':>12} {'sweep (ms)':>12} {'speedup':>9}")
+    for window_count, busy_count in cases:
+        windows = _random_windows(window_count, rng)
+        busy = [(rng.randrange(RESOURCE_COUNT), start, end) for start, end in _random_windows(busy_count, rng)]
+
+        def loop():
+            conflicts = {}
+            for index, (new_start, new_end) in enumerate(windows):
+                for resource_id, start, end in busy:
+                    if check_time_overlap(new_start, new_end, start, end):
+                        conflicts.setdefault(index, set()).add(resource_id)
+            return conflicts
+
+        def sweep():
+            return find_resource_conflicts(
+                [(to_epoch(start), to_epoch(end), index) for index, (start, end) in enumerate(windows)],
+                [(to_epoch(start), to_epoch(end), resource_id) for resource_id, start, end in busy],
+            )
+
+        assert loop() == sweep()
+        loop_ms = timed(loop, repeat=3)
+        sweep_ms = timed(sweep, repeat=3)
+        print(f"{window_count:>8} {busy_count:>8} {loop_ms:>12.1f} {sweep_ms:>12.1f} {loop_ms / sweep_ms:>8.0f}x")
+
+
+if __name__ == '__main__':
+    setup_django()
+    cases = [tuple(int(part) for part in arg.split(':')) for arg in sys.argv[1:]]
+    run(cases or DEFAULT_CASES)
@@ -0,0 +1,61 @@
+"""
+Benchmark booking list pages at increasing depth.
+
+    python -m benchmarks.pagination [bookings]
+
+Compares CustomPagination (OFFSET + COUNT, as UserBookingsView used) with
+the keyset cursor of BookingListPagination. Every page is 30 rows; only the
+pagination queries are timed, not serialization.
+"""
+import sys
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks import benchmark_database, setup_django, timed
+from benchmarks.casing import create_bookings
+
+DEFAULT_BOOKINGS = 100_000
+PAGE_SIZE = 30
+
+
+def run(count):
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from booking.models import Booking
+    from booking.pagination import BookingListPagination
+    from fct.utils import CustomPagination
+
+    factory = APIRequestFactory()
+    create_bookings(count)
+    queryset = Booking.objects.order_by('-pk')
+
+    def offset_page(number):
+        paginator = CustomPagination()
+        return paginator.paginate_queryset(queryset, Request(factory.get('/', {'page': number})))
+
+    def cursor_after(row):
+        paginator = BookingListPagination()
+        paginator.paginate_queryset(queryset, Request(factory.get('/', {'page_size': 1})))
+        paginator.page, paginator.has_next = [row], True
+        return parse_qs(urlparse(paginator.get_next_link()).query)['cursor'][0]
+
+    def keyset_page(cursor):
+        params = {'cursor': cursor} if cursor else {}
+        return BookingListPagination().paginate_queryset(queryset, Request(factory.get('/', params)))
+
+    print(f"{count} bookings, {PAGE_SIZE} per page")
+    print(f"{'page':>8} {'offset (ms)':>12} {'keyset (ms)':>12}")
+    last_page = count // PAGE_SIZE
+    for number in sorted({1, 10, 100, last_page // 2, last_page}):
+        boundary = queryset[(number - 1) * PAGE_SIZE - 1] if number > 1 else None
+        cursor = cursor_after(boundary) if boundary else None
+        assert [b.pk for b in offset_page(number)] == [b.pk for b in keyset_page(cursor)]
+
+        offset_ms = timed(lambda: offset_page(number))
+        keyset_ms = timed(lambda: keyset_page(cursor))
+        print(f"{number:>8} {offset_ms:>12.2f} {keyset_ms:>12.2f}")
+
+
+if __name__ == '__main__':
+    setup_django()
+    with benchmark_database():
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BOOKINGS)
@@ -0,0 +1,81 @@
+"""
+Benchmark JSON rendering of the large list endpoints.
+
+    python -m benchmarks.render [bookings] [routes]
+
+Serializes the booking list (BookingDetailSerializer) and the public route
+list (RouteListSerializer, full body text) once, then renders each with
+djangorestframework_camel_case's renderer, fct.renderers.CamelCaseJSONRenderer
+and fct.renderers.FastCamelCaseJSONRenderer. Every renderer must produce
+the same bytes.
+"""
+import sys
+
+from benchmarks import benchmark_database, setup_django, timed
+from benchmarks.casing import create_bookings
+
+DEFAULT_BOOKINGS = 1_000
+DEFAULT_ROUTES = 200
+ROUTE_BODY = "Private transfers from Larnaca Airport – door to door, fixed prices, no hidden fees. " * 60
+
+
+def create_routes(count):
+    from routes.models import Route, RouteFAQ, Vehicle
+
+    for i in range(count):
+        route = Route.objects.create(
+            from_location=f"Larnaca Airport {i}", to_location=f"Limassol {i}", meta_title="Benchmark",
+            meta_description="Benchmark", hero_title="Benchmark", sub_headline="Benchmark", body=ROUTE_BODY,
+            distance="70 km", time="50 mins", duration_minutes=50, sedan_price=70, van_price=100,
+            image="routes/benchmark.jpg", book_cta_label="Book", book_cta_support="Support",
+            what_makes_better=["Meet & greet", "Free waiting time"], whats_included=["Child seats", "Wi-Fi"],
+        )
+        Vehicle.objects.bulk_create(
+            Vehicle(route=route, vehicle_type=kind, max_passengers=passengers, ideal_for="Families", fixed_price=70)
+            for kind, passengers in (('sedan', 3), ('vclass', 7))
+        )
+        RouteFAQ.objects.bulk_create(
+            RouteFAQ(route=route, question=f"Question {n}?", answer="An answer. " * 10) for n in range(5)
+        )
+
+
+def run(bookings, routes):
+    from djangorestframework_camel_case.render import CamelCaseJSONRenderer as LibraryCamelCaseJSONRenderer
+    from booking.serializers import BookingDetailSerializer
+    from booking.views import BookingListView
+    from fct.query_plan import serializer_query_plan
+    from fct.renderers import CamelCaseJSONRenderer, FastCamelCaseJSONRenderer, orjson
+    from routes.serializers import RouteListSerializer
+    from routes.views import RouteListView
+
+    create_bookings(bookings)
+    create_routes(routes)
+    payloads = {
+        f"{bookings} bookings": BookingDetailSerializer(
+            serializer_query_plan(BookingDetailSerializer).apply(BookingListView.queryset.all()), many=True
+        ).data,
+        f"{routes} routes": RouteListSerializer(
+            serializer_query_plan(RouteListSerializer).apply(RouteListView.queryset.all()), many=True
+        ).data,
+    }
+    renderers = [LibraryCamelCaseJSONRenderer(), CamelCaseJSONRenderer(), FastCamelCaseJSONRenderer()]
+
+    print(f"orjson: {orjson.__version__ if orjson else 'not installed'}")
+    print(f"{'payload':>14} {'size (kB)':>10} {'library (ms)':>13} {'cached (ms)':>12} {'fast (ms)':>10} {'speedup':>8}")
+    for name, data in payloads.items():
+        rendered = [renderer.render(data) for renderer in renderers]
+        assert rendered[0] == rendered[1] == rendered[2]
+        library, cached, fast = (timed(lambda: renderer.render(data), repeat=10) for renderer in renderers)
+        print(
+            f"{name:>14} {len(rendered[0]) / 1024:>10.0f} {library:>13.1f} {cached:>12.1f} {fast:>10.1f}"
+            f" {library / fast:>7.1f}x"
+        )
+
+
+if __name__ == '__main__':
+    setup_django()
+    with benchmark_database():
+        run(
+            int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BOOKINGS,
+            int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_ROUTES,
+        )
@@ -0,0 +1,70 @@
+"""
+Benchmark SMTP delivery strategies against a local debugging SMTP server.
+
+    python -m benchmarks.smtp [emails] [handshake delay ms]
+
+The stand-in server (notifications.testing.LocalSMTPServer) holds back its
+greeting by the handshake delay, to model the TCP/TLS/AUTH round trips to a
+remote relay. Three ways of delivering the same emails are compared:
+
+  per-call:  send_mail() with Django's SMTP backend, one session per email
+  pooled:    send_mail() with PooledSMTPEmailBackend, one session per thread
+  outbox:    queued emails drained by send_due_emails(), one session per batch
+"""
+import sys
+import time
+
+from benchmarks import benchmark_database, setup_django
+
+DEFAULT_EMAILS = 50
+DEFAULT_DELAY_MS = 20
+
+
+def _measure(server, func):
+    connections = server.connections
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1000, server.connections - connections
+
+
+def run(count, delay_ms):
+    from django.core.mail import send_mail
+    from django.test import override_settings
+
+    from notifications.backends import close_pooled_connections
+    from notifications.outbox import enqueue_email, send_due_emails
+    from notifications.testing import LocalSMTPServer
+
+    def send_each():
+        for i in range(count):
+            send_mail(f"Email {i}", "Body", "admin@example.com", ["passenger@example.com"])
+
+    def drain_outbox():
+        for i in range(count):
+            enqueue_email(f"Email {i}", ["passenger@example.com"], body="Body", from_email="admin@example.com")
+        send_due_emails(limit=count)
+
+    with LocalSMTPServer(handshake_delay=delay_ms / 1000) as server:
+        smtp_backend = 'django.core.mail.backends.smtp.EmailBackend'
+        pooled_backend = 'notifications.backends.PooledSMTPEmailBackend'
+        results = []
+
+        with override_settings(**server.email_settings(EMAIL_BACKEND=smtp_backend)):
+            results.append(('per-call', *_measure(server, send_each)))
+        with override_settings(**server.email_settings(EMAIL_BACKEND=pooled_backend)):
+            results.append(('pooled', *_measure(server, send_each)))
+            close_pooled_connections()
+        with override_settings(**server.email_settings(EMAIL_BACKEND=smtp_backend)):
+            results.append(('outbox', *_measure(server, drain_outbox)))
+
+    print(f"{count} emails, {delay_ms} ms handshake")
+    print(f"{'strategy':>10} {'total (ms)':>12} {'per email (ms)':>15} {'connections':>12}")
+    for name, total_ms, connections in results:
+        print(f"{name:>10} {total_ms:>12.1f} {total_ms / count:>15.2f} {connections:>12}")
+
+
+if __name__ == '__main__':
+    setup_django()
+    args = [int(arg) for arg in sys.argv[1:]]
+    with benchmark_database():
+        run(args[0] if args else DEFAULT_EMAILS, args[1] if len(args) > 1 else DEFAULT_DELAY_MS)
@@ -0,0 +1,61 @@
+"""
+Benchmark the driver timeline, cold (cache cleared) and warm.
+
+    python -m benchmarks.timeline [history sizes...]
+
+Uses the history fixtures from benchmarks.availability and reads a 7-day
+timeline for one driver through the full API view.
+"""
+import random
+import sys
+from datetime import date, timedelta
+
+from benchmarks import benchmark_database, setup_django, timed
+from benchmarks.availability import _create_fixtures, _grow_history
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+
+def run(sizes):
+    from django.core.cache import cache
+    from django.test import override_settings
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from account.models import UserProfile
+
+    rng = random.Random(0)
+    target, drivers, vehicles = _create_fixtures()
+    admin = UserProfile.objects.create_superuser(email="bench-admin@example.com", password="password123")
+    client = APIClient()
+    client.force_authenticate(user=admin)
+
+    date_from = date.today() - timedelta(days=30)
+    url = reverse("driver-timeline", kwargs={"pk": drivers[0].pk})
+    params = {"date_from": date_from.isoformat(), "date_to": (date_from + timedelta(days=6)).isoformat()}
+
+    def fetch():
+        response = client.get(url, params, HTTP_API_KEY="bench-key")
+        assert response.status_code == 200, response.content
+
+    def fetch_cold():
+        cache.clear()
+        fetch()
+
+    current_size = 0
+    print(f"{'history':>10} {'cold (ms)':>12} {'warm (ms)':>12}")
+    with override_settings(API_KEY="bench-key"):
+        for size in sorted(sizes):
+            _grow_history(target, drivers, vehicles, current_size, size, rng)
+            current_size = size
+
+            cold_ms = timed(fetch_cold)
+            fetch()
+            warm_ms = timed(fetch)
+            print(f"{size:>10} {cold_ms:>12.2f} {warm_ms:>12.2f}")
+
+
+if __name__ == '__main__':
+    setup_django()
+    with benchmark_database():
+        run([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class BookingConfig(AppConfig):
     name = 'booking'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
@@ -0,0 +1,308 @@
+"""
+Automatic driver/vehicle assignment for pending bookings.
+
+The solver works on plain data so it can be benchmarked without a database:
+bookings become jobs with epoch-second windows, and every driver and vehicle
+gets a ResourceSchedule holding the intervals it is already busy for. Jobs are
+placed greedily in pickup order (interval partitioning), each one on the free
+driver and the smallest compatible free vehicle that became available most
+recently, which keeps long idle gaps open for later jobs.
+"""
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timezone
+
+from django.db import transaction
+from django.db.models import Q
+
+from .timeline import get_stored_timeline_cache_keys, invalidate_timeline_cache
+from .utils import (
+    get_booking_time_windows,
+    get_longest_window,
+    get_window_overlap_filter,
+    to_epoch,
+)
+
+NEVER = float('-inf')
+
+
+def from_epoch(value):
+    return datetime.fromtimestamp(value, tz=timezone.utc)
+
+
+class ResourceSchedule:
+    """Busy intervals of one driver or vehicle, kept sorted by start."""
+
+    def __init__(self, longest_window):
+        self.longest_window = longest_window
+        self.starts = []
+        self.ends = []
+        self.latest_end = NEVER
+
+    @property
+    def last_start(self):
+        return self.starts[-1] if self.starts else NEVER
+
+    def add(self, start, end):
+        index = bisect_left(self.starts, start)
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+        self.latest_end = max(self.latest_end, end)
+
+    def is_free(self, start, end):
+        """Return True if nothing in the schedule overlaps [start, end)."""
+        index = bisect_left(self.starts, end) - 1
+        # No stored interval is longer than longest_window, so only intervals
+        # starting after start - longest_window can still be running at start.
+        earliest_start = start - self.longest_window
+        while index >= 0 and self.starts[index] > earliest_start:
+            if self.ends[index] > start:
+                return False
+            index -= 1
+        return True
+
+    def is_free_for(self, windows):
+        return all(self.is_free(start, end) for start, end in windows)
+
+    def idle_since(self, start):
+        """Return the end of the last interval starting before `start`, or NEVER."""
+        index = bisect_left(self.starts, start)
+        return self.ends[index - 1] if index else NEVER
+
+
+class ResourcePool:
+    """
+    Interchangeable resources (all drivers, or one vehicle type and capacity).
+
+    pick() must be called with non-decreasing start times. Resources whose
+    every interval ends by the pickup time are kept sorted by latest_end, so
+    the best fit among them is a bisect away; only resources that still have
+    intervals starting after the pickup time are checked one by one.
+    """
+
+    def __init__(self, schedules):
+        self.schedules = schedules
+        self.by_latest_end = sorted((schedule.latest_end, resource_id) for resource_id, schedule in schedules.items())
+        self.upcoming = set()
+        self.upcoming_heap = []
+        self.now = NEVER
+        for resource_id, schedule in schedules.items():
+            self._track_upcoming(resource_id, schedule)
+
+    def _track_upcoming(self, resource_id, schedule):
+        if schedule.last_start > self.now:
+            self.upcoming.add(resource_id)
+            heapq.heappush(self.upcoming_heap, (schedule.last_start, resource_id))
+
+    def add(self, resource_id, start, end):
+        schedule = self.schedules[resource_id]
+        del self.by_latest_end[bisect_left(self.by_latest_end, (schedule.latest_end, resource_id))]
+        schedule.add(start, end)
+        insort(self.by_latest_end, (schedule.latest_end, resource_id))
+        self._track_upcoming(resource_id, schedule)
+
+    def pick(self, windows):
+        """Return the free resource whose previous job ended closest to the pickup, or None."""
+        start = windows[0][0]
+        self.now = start
+        while self.upcoming_heap and self.upcoming_heap[0][0] <= start:
+            _, resource_id = heapq.heappop(self.upcoming_heap)
+            if self.schedules[resource_id].last_start <= start:
+                self.upcoming.discard(resource_id)
+
+        best, best_idle = None, NEVER
+        # Idle resources are free for the first window; only later windows need checking.
+        index = bisect_right(self.by_latest_end, (start, float('inf'))) - 1
+        while index >= 0:
+            latest_end, resource_id = self.by_latest_end[index]
+            if self.schedules[resource_id].is_free_for(windows[1:]):
+                best, best_idle = resource_id, latest_end
+                break
+            index -= 1
+
+        for resource_id in self.upcoming:
+            schedule = self.schedules[resource_id]
+            if schedule.is_free_for(windows):
+                idle = schedule.idle_since(start)
+                if best is None or idle > best_idle:
+                    best, best_idle = resource_id, idle
+
+        return best
+
+
+def solve_assignments(jobs, drivers, vehicles):
+    """
+    Greedily assign a driver and a vehicle to every job.
+
+    jobs:     [{'key', 'windows': [(start, end), ...], 'vehicle_type', 'passengers'}]
+    drivers:  {driver_id: ResourceSchedule}
+    vehicles: [(vehicle_id, vehicle_type, max_passengers, ResourceSchedule)]
+
+    Returns (assignments, unassigned) where assignments maps job key to
+    (driver_id, vehicle_id) and unassigned maps job key to a reason.
+    """
+    assignments = {}
+    unassigned = {}
+
+    driver_pool = ResourcePool(drivers)
+
+    tiers = {}
+    for vehicle_id, vehicle_type, max_passengers, schedule in vehicles:
+        tiers.setdefault((vehicle_type.lower(), max_passengers), {})[vehicle_id] = schedule
+    vehicle_pools = {}
+    for (vehicle_type, max_passengers), schedules in sorted(tiers.items()):
+        vehicle_pools.setdefault(vehicle_type, []).append((max_passengers, ResourcePool(schedules)))
+
+    for job in sorted(jobs, key=lambda item: (item['windows'][0][0], str(item['key']))):
+        windows = job['windows']
+
+        driver_id = driver_pool.pick(windows)
+        if driver_id is None:
+            unassigned[job['key']] = "No driver is free for this time slot."
+            continue
+
+        compatible = [
+            (max_passengers, pool) for max_passengers, pool in vehicle_pools.get(job['vehicle_type'].lower(), [])
+            if max_passengers >= job['passengers']
+        ]
+        if not compatible:
+            unassigned[job['key']] = "No vehicle matches the requested type and passenger count."
+            continue
+
+        # Tiers are sorted by capacity, so take the smallest one that has a free vehicle.
+        vehicle_id = vehicle_pool = None
+        for _, pool in compatible:
+            vehicle_id = pool.pick(windows)
+            if vehicle_id is not None:
+                vehicle_pool = pool
+                break
+
+        if vehicle_pool is None:
+            unassigned[job['key']] = "No matching vehicle is free for this time slot."
+            continue
+
+        for window_start, window_end in windows:
+            driver_pool.add(driver_id, window_start, window_end)
+            vehicle_pool.add(vehicle_id, window_start, window_end)
+
+        assignments[job['key']] = (driver_id, vehicle_id)
+
+    return assignments, unassigned
+
+
+def plan_auto_assignment(date_from, date_to, lock=False):
+    """
+    Build an assignment plan for Pending bookings picked up between the two dates.
+
+    Returns (bookings, assignments, unassigned); bookings maps pk to Booking
+    and the other two are keyed by booking pk as in solve_assignments.
+    Existing driver/vehicle commitments follow the same rules as
+    get_available_drivers / get_available_vehicles.
+
+    With lock=True, which must run inside transaction.atomic(), the pending
+    bookings, drivers and vehicles are row-locked in the same order as
+    lock_schedule_rows before anything is read. Manual assignments then wait
+    for the plan to be written instead of racing it.
+    """
+    from account.models import UserProfile
+    from vehicle.models import Vehicle
+    from .models import Booking
+
+    pending = Booking.objects.filter(
+        booking_status="Pending",
+        pickup_date__range=(date_from, date_to),
+    )
+    active_drivers = UserProfile.objects.filter(is_driver=True, is_active=True, disabled=False)
+    vehicle_rows = Vehicle.objects.all()
+
+    if lock:
+        list(pending.select_for_update().order_by('pk').values_list('pk', flat=True))
+        active_drivers = active_drivers.select_for_update()
+        vehicle_rows = vehicle_rows.select_for_update()
+
+    pending = pending.select_related('route', 'transfer_information', 'passenger_information')
+
+    bookings = {}
+    jobs = []
+    for booking in pending:
+        windows = [(to_epoch(start), to_epoch(end)) for start, end in get_booking_time_windows(booking)]
+        if not windows:
+            continue
+
+        transfer = booking.transfer_information
+        bookings[booking.pk] = booking
+        jobs.append({
+            'key': booking.pk,
+            'windows': windows,
+            'vehicle_type': booking.vehicle_type,
+            'passengers': (transfer.adults or 0) + (transfer.children or 0),
+        })
+
+    if not jobs:
+        return bookings, {}, {}
+
+    longest_window = get_longest_window()
+    longest_seconds = int(longest_window.total_seconds())
+
+    drivers = {
+        driver_id: ResourceSchedule(longest_seconds)
+        for driver_id in active_drivers.order_by('pk').values_list('pk', flat=True)
+    }
+    vehicles = {
+        vehicle_id: (vehicle_id, vehicle_type or "", max_passengers, ResourceSchedule(longest_seconds))
+        for vehicle_id, vehicle_type, max_passengers in vehicle_rows.order_by('pk').values_list(
+            'pk', 'type', 'max_passengers'
+        )
+    }
+
+    # One read of every commitment that can touch the planning horizon.
+    horizon_start = min(window[0] for job in jobs for window in job['windows'])
+    horizon_end = max(window[1] for job in jobs for window in job['windows'])
+    horizon = [(from_epoch(horizon_start), from_epoch(horizon_end))]
+    commitments = Booking.objects.filter(
+        Q(driver__isnull=False) | Q(vehicle__isnull=False)
+    ).exclude(
+        pk__in=bookings.keys()
+    ).exclude(
+        booking_status="Cancelled"
+    ).filter(
+        get_window_overlap_filter(horizon, longest_window=longest_window)
+    ).values_list(
+        'driver_id', 'vehicle_id', 'booking_status',
+        'outbound_start', 'outbound_end', 'return_start', 'return_end',
+    )
+
+    for driver_id, vehicle_id, booking_status, *window_bounds in commitments:
+        for start, end in (window_bounds[:2], window_bounds[2:]):
+            if start is None:
+                continue
+            if driver_id in drivers:
+                drivers[driver_id].add(to_epoch(start), to_epoch(end))
+            # Completed bookings keep their driver busy but free the vehicle.
+            if vehicle_id in vehicles and booking_status != "Completed":
+                vehicles[vehicle_id][3].add(to_epoch(start), to_epoch(end))
+
+    assignments, unassigned = solve_assignments(jobs, drivers, list(vehicles.values()))
+    return bookings, assignments, unassigned
+
+
+def apply_auto_assignment(bookings, assignments):
+    """Write a plan back in one transaction and return the updated bookings."""
+    from .models import Booking
+
+    updated = []
+    for booking_pk, (driver_id, vehicle_id) in assignments.items():
+        booking = bookings[booking_pk]
+        booking.driver_id = driver_id
+        booking.vehicle_id = vehicle_id
+        booking.booking_status = "Assigned"
+        updated.append(booking)
+
+    with transaction.atomic():
+        Booking.objects.bulk_update(updated, ['driver', 'vehicle', 'booking_status'], batch_size=500)
+        # bulk_update skips the model signals that keep the schedule timeline cache fresh
+        invalidate_timeline_cache(
+            key for booking in updated for key in get_stored_timeline_cache_keys(booking)
+        )
+
+    return updated
@@ -0,0 +1,324 @@
+"""
+Bulk booking import for partner and agency feeds.
+
+Rows are validated together before anything is written: every route is
+resolved with one query and duplicate transaction IDs are found with another.
+Rows may come with a driver and vehicle already chosen. Those are loaded in
+one query each, and clashes with existing bookings or with other rows of the
+feed are found in one sweep over the whole feed (overlap.find_resource_conflicts).
+Valid feeds are then inserted in batches, with bulk_create for
+TransferInformation, PassengerDetail and Booking, all in one transaction.
+On backends that can't return pks from a bulk INSERT, the detail rows are
+found again by their import_key.
+Either the whole feed is imported or nothing is.
+"""
+import csv
+import io
+import json
+import uuid
+
+from django.db import connections, router, transaction
+from django.db.models import Q
+from rest_framework import serializers
+
+from fct.utils import generate_public_id
+
+BATCH_SIZE = 1000
+MAX_ROWS = 10000
+FEED_FORMATS = ('csv', 'json')
+NESTED_FIELDS = ('transfer_information', 'passenger_information')
+
+
+class FeedError(ValueError):
+    """The feed could not be read as a list of bookings."""
+
+
+def parse_booking_feed(content, feed_format):
+    """
+    Return the raw rows of a CSV or JSON feed.
+
+    CSV feeds use one column per field, with the nested fields flat
+    (adults, full_name, ...) or dotted (transfer_information.adults).
+    Empty cells count as not provided. JSON feeds are a list of booking
+    payloads, optionally wrapped as {"bookings": [...]}.
+    """
+    if feed_format == 'json':
+        try:
+            rows = json.loads(content)
+        except ValueError as exc:
+            raise FeedError(f"Invalid JSON: {exc}") from exc
+        if isinstance(rows, dict):
+            rows = rows.get('bookings')
+        if not isinstance(rows, list):
+            raise FeedError("A JSON feed must be a list of bookings or {\"bookings\": [...]}.")
+        return rows
+
+    if feed_format == 'csv':
+        reader = csv.DictReader(io.StringIO(content))
+        return [
+            {key.strip(): value for key, value in row.items() if key and value not in ('', None)}
+            for row in reader
+        ]
+
+    raise FeedError(f"Unsupported feed format '{feed_format}'. Use one of: {', '.join(FEED_FORMATS)}.")
+
+
+def _load_by_pk(queryset, rows, field):
+    """Objects referenced by pk in any row's field, keyed by str(pk), in one query."""
+    references = {str(row[field]) for row in rows if row and row.get(field) not in (None, '')}
+    numeric = [int(reference) for reference in references if reference.isdigit()]
+    return {str(obj.pk): obj for obj in queryset.filter(pk__in=numeric)} if numeric else {}
+
+
+def find_schedule_conflicts(rows):
+    """
+    Map row numbers to errors for drivers and vehicles the rows double-book.
+
+    rows is [(row_number, validated_data)]. Each row's windows are checked in
+    one sweep against the assigned bookings they overlap (fetched in one
+    query) and against every other row of the feed.
+    """
+    from .models import Booking
+    from .overlap import find_resource_conflicts
+    from .utils import (
+        get_booking_time_windows,
+        get_window_overlap_filter,
+        to_epoch,
+        to_stored_datetime,
+    )
+
+    assigned = {row_number: data for row_number, data in rows if data.get('driver')}
+    if not assigned:
+        return {}
+
+    windows = {
+        row_number: [
+            (to_stored_datetime(start), to_stored_datetime(end))
+            for start, end in get_booking_time_windows(Booking(
+                route=data['route'],
+                trip_type=data.get('trip_type'),
+                pickup_date=data.get('pickup_date'),
+                pickup_time=data.get('pickup_time'),
+                return_date=data.get('return_date'),
+                return_time=data.get('return_time'),
+            ))
+        ]
+        for row_number, data in assigned.items()
+    }
+    all_windows = [window for spans in windows.values() for window in spans]
+    existing = list(Booking.objects.filter(
+        Q(driver__isnull=False) | Q(vehicle__isnull=False)
+    ).exclude(
+        booking_status="Cancelled"
+    ).filter(
+        get_window_overlap_filter(all_windows)
+    ).values_list(
+        'booking_id', 'driver_id', 'vehicle_id', 'booking_status',
+        'outbound_start', 'outbound_end', 'return_start', 'return_end',
+    )) if all_windows else []
+
+    errors = {}
+    for field, label in (('driver', 'Driver'), ('vehicle', 'Vehicle')):
+        # Busy intervals are keyed (resource id, holder); a holder is (0, booking_id) or (1, row_number).
+        busy = []
+        for booking_id, driver_id, vehicle_id, booking_status, *stored in existing:
+            resource_id = driver_id if field == 'driver' else vehicle_id
+            # Completed bookings keep their driver busy but free the vehicle.
+            if not resource_id or (field == 'vehicle' and booking_status == "Completed"):
+                continue
+            for start, end in (stored[:2], stored[2:]):
+                if start is not None:
+                    busy.append((to_epoch(start), to_epoch(end), (resource_id, (0, booking_id))))
+        busy += [
+            (to_epoch(start), to_epoch(end), (data[field].pk, (1, row_number)))
+            for row_number, data in assigned.items()
+            for start, end in windows[row_number]
+        ]
+        row_windows = [
+            (to_epoch(start), to_epoch(end), row_number)
+            for row_number, spans in windows.items()
+            for start, end in spans
+        ]
+
+        for row_number, holders in find_resource_conflicts(row_windows, busy).items():
+            resource = assigned[row_number][field]
+            clashes = sorted(
+                holder for resource_id, holder in holders
+                if resource_id == resource.pk and holder != (1, row_number)
+            )
+            if clashes:
+                described = ", ".join(
+                    f"booking #{ident}" if kind == 0 else f"row {ident} of this feed" for kind, ident in clashes
+                )
+                name = resource.full_name if field == 'driver' else resource
+                errors.setdefault(row_number, {}).setdefault(field, []).append(
+                    f"{label} '{name}' is unavailable. Already assigned to {described}."
+                )
+    return errors
+
+
+def validate_booking_rows(rows):
+    """
+    Validate feed rows in bulk.
+
+    Returns (validated_rows, errors). errors is a list of
+    {'row': <1-based row number>, 'errors': {...}} and is empty when the
+    whole feed is valid.
+    """
+    from account.models import UserProfile
+    from routes.models import Route
+    from vehicle.models import Vehicle
+    from .models import Booking
+    from .normalizers import normalize_booking_request_data
+    from .serializers import BookingImportSerializer
+
+    if len(rows) > MAX_ROWS:
+        return [], [{'row': None, 'errors': {'non_field_errors': [f"A feed can hold at most {MAX_ROWS} bookings."]}}]
+
+    row_errors = {}
+    normalized = []
+    for row_number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            row_errors[row_number] = {'non_field_errors': ["Each booking must be an object."]}
+            normalized.append(None)
+            continue
+        normalized.append(normalize_booking_request_data(row, resolve_route=False))
+
+    # One query for every route the feed mentions, by public route_id or pk.
+    references = {str(row['route']) for row in normalized if row and row.get('route') not in (None, '')}
+    routes = {}
+    if references:
+        numeric = [int(reference) for reference in references if reference.isdigit()]
+        for route in Route.objects.filter(Q(route_id__in=references) | Q(pk__in=numeric)):
+            routes[route.route_id] = route
+            routes[str(route.pk)] = route
+    context = {
+        'routes': routes,
+        'drivers': _load_by_pk(
+            UserProfile.objects.filter(is_driver=True, is_active=True, disabled=False), normalized, 'driver'
+        ),
+        'vehicles': _load_by_pk(Vehicle.objects.all(), normalized, 'vehicle'),
+    }
+
+    # One query for transaction IDs already imported, plus repeats within the feed.
+    transaction_ids = [row.get('transaction_id') for row in normalized if row and row.get('transaction_id')]
+    taken = set(
+        Booking.objects.filter(transaction_id__in=set(transaction_ids)).values_list('transaction_id', flat=True)
+    ) if transaction_ids else set()
+    seen = set()
+
+    # One serializer checks every row, as ListSerializer does with its child.
+    row_serializer = BookingImportSerializer(context=context)
+    valid = []
+    for row_number, row in enumerate(normalized, start=1):
+        if row is None:
+            continue
+
+        try:
+            valid.append((row_number, row_serializer.run_validation(row)))
+        except serializers.ValidationError as exc:
+            row_errors[row_number] = dict(exc.detail)
+
+        transaction_id = row.get('transaction_id')
+        if transaction_id:
+            if transaction_id in taken:
+                message = "A booking with this transaction ID already exists."
+            elif transaction_id in seen:
+                message = "This transaction ID appears more than once in the feed."
+            else:
+                message = None
+            if message:
+                row_errors.setdefault(row_number, {}).setdefault('transaction_id', []).append(message)
+            seen.add(transaction_id)
+
+    for row_number, conflicts in find_schedule_conflicts(valid).items():
+        for field, messages in conflicts.items():
+            row_errors.setdefault(row_number, {}).setdefault(field, []).extend(messages)
+
+    errors = [{'row': row_number, 'errors': row_errors[row_number]} for row_number in sorted(row_errors)]
+    validated_rows = [data for row_number, data in valid if row_number not in row_errors]
+    return validated_rows, errors
+
+
+def _insert_details(model, objects):
+    """
+    bulk_create rows whose pks the bookings need.
+
+    Where the backend can't return pks from a bulk INSERT (MySQL), each row
+    gets a unique import_key and the pks are read back in one query.
+    """
+    connection = connections[router.db_for_write(model)]
+    if connection.features.can_return_rows_from_bulk_insert:
+        return model.objects.bulk_create(objects)
+
+    batch_token = uuid.uuid4().hex
+    for index, obj in enumerate(objects):
+        obj.import_key = f"{batch_token}-{index}"
+    model.objects.bulk_create(objects)
+
+    pks = dict(
+        model.objects.filter(import_key__in=[obj.import_key for obj in objects]).values_list('import_key', 'pk')
+    )
+    for obj in objects:
+        obj.pk = pks[obj.import_key]
+    return objects
+
+
+def _assign_booking_ids(bookings):
+    """Give each booking a public ID that no existing booking uses."""
+    from .models import Booking
+
+    pending = list(bookings)
+    used = set()
+    while pending:
+        for booking in pending:
+            booking.booking_id = generate_public_id('FCT')
+        candidate_ids = {booking.booking_id for booking in pending}
+        used |= set(Booking.objects.filter(booking_id__in=candidate_ids).values_list('booking_id', flat=True))
+
+        retry = []
+        for booking in pending:
+            if booking.booking_id in used:
+                retry.append(booking)
+            else:
+                used.add(booking.booking_id)
+        pending = retry
+
+
+def create_bookings(validated_rows, batch_size=BATCH_SIZE):
+    """Insert validated rows in one transaction and return the created bookings."""
+    from .models import Booking, PassengerDetail, TransferInformation
+    from .timeline import get_stored_timeline_cache_keys, invalidate_timeline_cache
+
+    created = []
+    with transaction.atomic():
+        for offset in range(0, len(validated_rows), batch_size):
+            batch = validated_rows[offset:offset + batch_size]
+
+            transfers = _insert_details(
+                TransferInformation, [TransferInformation(**row['transfer_information']) for row in batch]
+            )
+            passengers = _insert_details(
+                PassengerDetail, [PassengerDetail(**row['passenger_information']) for row in batch]
+            )
+
+            bookings = []
+            for row, transfer, passenger in zip(batch, transfers, passengers):
+                booking = Booking(
+                    transfer_information=transfer,
+                    passenger_information=passenger,
+                    **{field: value for field, value in row.items() if field not in NESTED_FIELDS}
+                )
+                if booking.driver_id and booking.vehicle_id:
+                    booking.booking_status = 'Assigned'
+                # bulk_create skips save(), so apply what it would have done.
+                booking.round_amounts()
+                booking.set_schedule_windows()
+                bookings.append(booking)
+
+            _assign_booking_ids(bookings)
+            created.extend(Booking.objects.bulk_create(bookings))
+            # ...and the booking signals, for the drivers' and vehicles' timelines.
+            invalidate_timeline_cache(set().union(*(get_stored_timeline_cache_keys(booking) for booking in bookings)))
+
+    return created
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core import checks
+
+# Backends whose entries live in one process's memory.
+PROCESS_LOCAL_CACHE_BACKENDS = {'django.core.cache.backends.locmem.LocMemCache'}
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Cache invalidation runs in whichever process made the write: web workers,
+    auto_assign_bookings, import_bookings. With a per-process cache the other
+    processes never see it and keep serving stale entries until they expire.
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_CACHE_BACKENDS:
+        return []
+    return [
+        checks.Error(
+            f"The default cache ({backend}) is local to each process, so invalidations made by "
+            "one worker or management command never reach the others.",
+            hint="Set CACHE_BACKEND to a shared backend, e.g. django.core.cache.backends.redis.RedisCache "
+                 "or django.core.cache.backends.db.DatabaseCache.",
+            id='booking.E001',
+        )
+    ]
@@ -1,47 +1,83 @@
-from django.core.mail import send_mail
 from django.conf import settings
-from django.template.loader import render_to_string
-from django.utils.safestring import mark_safe
 from contextlib import suppress
 
+from django.utils.safestring import mark_safe
+
+from notifications.rendering import (
+    batch_memo,
+    changes_list,
+    detail_html,
+    heading,
+    link,
+    message_html,
+    queue_html_email,
+)
+
 
 def _send_html_email(subject, greeting, message, detail, recipient_email):
     """
-    Render email.html and send as HTML email.
+    Render email.html and queue it in the outbox.
+
+    message and detail are HTML; build them with message_html()/detail_html().
+    Delivery happens in the send_outbox_emails worker; inside a transaction
+    the email is only queued if the transaction commits.
     """
-    context = {
-        'title': subject,
-        'greeting': greeting,
-        'message': mark_safe(message),
-        'detail': mark_safe(detail),
-    }
-    html_message = render_to_string('email.html', context)
-
-    send_mail(
-        subject,
-        '',
-        settings.EMAIL_FROM,
-        [recipient_email],
-        html_message=html_message,
-        fail_silently=False,
-    )
+    queue_html_email(subject, greeting, message, detail, recipient_email)
 
 
-def _booking_detail_lines(booking, route, extra_lines=None):
-    """Build common booking detail HTML lines."""
-    lines = [
-        f"<strong>Booking ID:</strong> {booking.booking_id}",
-        f"<strong>Route:</strong> {route.from_location} → {route.to_location}",
-        f"<strong>Pickup Date:</strong> {booking.pickup_date.strftime('%B %d, %Y')}",
-        f"<strong>Pickup Time:</strong> {booking.pickup_time.strftime('%I:%M %p')}",
-        f"<strong>Trip Type:</strong> {booking.trip_type}",
+def _booking_summary_rows(booking, route):
+    rows = [
+        ("Booking ID", booking.booking_id),
+        ("Route", f"{route.from_location} → {route.to_location}"),
+        ("Pickup Date", booking.pickup_date.strftime('%B %d, %Y')),
+        ("Pickup Time", booking.pickup_time.strftime('%I:%M %p')),
+        ("Trip Type", booking.trip_type),
     ]
-    if extra_lines:
-        lines.extend(extra_lines)
     if booking.trip_type == "Return" and booking.return_date:
-        lines.append(f"<strong>Return Date:</strong> {booking.return_date.strftime('%B %d, %Y')}")
-        lines.append(f"<strong>Return Time:</strong> {booking.return_time.strftime('%I:%M %p') if booking.return_time else 'TBC'}")
-    return "<br>".join(lines)
+        rows.append(("Return Date", booking.return_date.strftime('%B %d, %Y')))
+        rows.append(("Return Time", booking.return_time.strftime('%I:%M %p') if booking.return_time else 'TBC'))
+    return rows
+
+
+def _booking_detail_lines(booking, route, *sections, summary=()):
+    """
+    Booking detail HTML: the trip summary (plus `summary` rows), then each
+    section of (label, value) rows as its own block.
+    """
+    # Shared by every email for this booking in an email_batch()
+    trip = batch_memo(('booking-summary', booking.pk), lambda: _booking_summary_rows(booking, route))
+    return detail_html([*trip, *summary], *sections)
+
+
+def _driver_rows(driver):
+    return [
+        ("Driver", driver.full_name),
+        ("Driver Phone", driver.phone_number or 'Will be provided'),
+    ]
+
+
+def _passenger_rows(booking, passenger, with_email=False):
+    """Passenger and party details for driver emails."""
+    transfer = booking.transfer_information
+    rows = [
+        ("Passenger", passenger.full_name),
+        ("Phone", passenger.phone_number),
+    ]
+    if with_email:
+        rows.append(("Email", passenger.email_address))
+    rows += [
+        ("Adults", transfer.adults),
+        ("Children", transfer.children or 0),
+        ("Luggage", transfer.luggage),
+    ]
+    if passenger.additional_information:
+        rows.append(("Additional Info", passenger.additional_information))
+    return rows
+
+
+def _driver_dashboard_link():
+    dashboard_url = f"{settings.FRONTEND_URL}/driver/bookings"
+    return mark_safe(f"View your dashboard: {link(dashboard_url)}")
 
 
 def send_reservation_to_passenger(booking):
@@ -54,14 +90,14 @@ def send_reservation_to_passenger(booking):
 
     subject = "New Booking Reservation (Pending Order)"
     greeting = f"Hello {passenger.full_name}"
-    message = (
+    message = message_html(
         f"Thank you for your booking. We have received your reservation "
         f"for {booking.pickup_date.strftime('%B %d, %Y')} at "
         f"{booking.pickup_time.strftime('%I:%M %p')} from {route.from_location} "
-        f"to {route.to_location}."
-        f"<br><br>Our team is now reviewing the details of your reservation."
-        f"<br><br>We will confirm your booking shortly and assign your driver "
-        f"as soon as everything is finalized."
+        f"to {route.to_location}.",
+        "Our team is now reviewing the details of your reservation.",
+        "We will confirm your booking shortly and assign your driver "
+        "as soon as everything is finalized.",
     )
     detail = _booking_detail_lines(booking, route)
 
@@ -82,15 +118,19 @@ def send_booking_confirmation_to_passenger(booking):
 
     subject = f"Booking Received - #{booking.booking_id}"
     greeting = f"Hello {passenger.full_name}"
-    message = (
+    message = message_html(
         "Thank you for booking with First Class Transfers! We have received your "
-        "booking and it is currently being processed."
-        "<br><br><strong>What happens next?</strong><br>"
-        "We will assign a driver and a vehicle to your booking shortly and will "
-        "keep you updated every step of the way."
-        "<br><br><strong>Need to make changes?</strong><br>"
-        "If your plans change and you need to reschedule or make any adjustments "
-        "to your booking, please don't hesitate to reach out to us."
+        "booking and it is currently being processed.",
+        heading(
+            "What happens next?",
+            "We will assign a driver and a vehicle to your booking shortly and will "
+            "keep you updated every step of the way.",
+        ),
+        heading(
+            "Need to make changes?",
+            "If your plans change and you need to reschedule or make any adjustments "
+            "to your booking, please don't hesitate to reach out to us.",
+        ),
     )
     detail = _booking_detail_lines(booking, route)
 
@@ -112,16 +152,15 @@ def send_driver_assigned_to_passenger(booking):
 
     subject = f"Driver Assigned to Your Booking #{booking.booking_id}"
     greeting = f"Hello {passenger.full_name}"
-    message = (
-        "Great news! A driver has been assigned to your booking."
-        "<br><br>Your driver will be at the pickup location on time. "
-        "Please ensure you are ready at the scheduled time."
+    message = message_html(
+        "Great news! A driver has been assigned to your booking.",
+        "Your driver will be at the pickup location on time. "
+        "Please ensure you are ready at the scheduled time.",
     )
-    extra = [
-        f"<br><strong>Driver Name:</strong> {driver.full_name}",
-        f"<strong>Driver Phone:</strong> {driver.phone_number or 'Will be provided'}",
-    ]
-    detail = _booking_detail_lines(booking, route, extra_lines=extra)
+    detail = _booking_detail_lines(booking, route, [
+        ("Driver Name", driver.full_name),
+        ("Driver Phone", driver.phone_number or 'Will be provided'),
+    ])
 
     with suppress(Exception):
         _send_html_email(subject, greeting, message, detail, passenger.email_address)
@@ -141,28 +180,23 @@ def send_booking_assigned_to_driver(booking):
         return False
 
     subject = f"New Booking Assignment - #{booking.booking_id}"
-    dashboard_url = f"{settings.FRONTEND_URL}/driver/bookings"
     greeting = f"Hello {driver.full_name}"
-    message = (
-        "You have been assigned to a new booking."
-        "<br><br>Please ensure you arrive at the pickup location on time."
-        f"<br><br>View your dashboard: <a href='{dashboard_url}'>{dashboard_url}</a>"
+    message = message_html(
+        "You have been assigned to a new booking.",
+        "Please ensure you arrive at the pickup location on time.",
+        _driver_dashboard_link(),
+    )
+    vehicle_rows = [
+        ("Vehicle", f"{vehicle.make} {vehicle.model}"),
+        ("License Plate", vehicle.license_plate),
+        ("Type", vehicle.type),
+    ] if vehicle else []
+    detail = _booking_detail_lines(
+        booking, route,
+        _passenger_rows(booking, passenger),
+        vehicle_rows,
+        summary=[("Estimated Duration", f"{route.duration_minutes} minutes")],
     )
-    extra = [
-        f"<strong>Estimated Duration:</strong> {route.duration_minutes} minutes",
-        f"<br><strong>Passenger:</strong> {passenger.full_name}",
-        f"<strong>Phone:</strong> {passenger.phone_number}",
-        f"<strong>Adults:</strong> {booking.transfer_information.adults}",
-        f"<strong>Children:</strong> {booking.transfer_information.children or 0}",
-        f"<strong>Luggage:</strong> {booking.transfer_information.luggage}",
-    ]
-    if passenger.additional_information:
-        extra.append(f"<strong>Additional Info:</strong> {passenger.additional_information}")
-    if vehicle:
-        extra.append(f"<br><strong>Vehicle:</strong> {vehicle.make} {vehicle.model}")
-        extra.append(f"<strong>License Plate:</strong> {vehicle.license_plate}")
-        extra.append(f"<strong>Type:</strong> {vehicle.type}")
-    detail = _booking_detail_lines(booking, route, extra_lines=extra)
 
     with suppress(Exception):
         _send_html_email(subject, greeting, message, detail, driver.email)
@@ -182,13 +216,12 @@ def send_vehicle_assigned_to_passenger(booking):
 
     subject = f"Vehicle Assigned to Your Booking #{booking.booking_id}"
     greeting = f"Hello {passenger.full_name}"
-    message = "A vehicle has been assigned to your booking."
-    extra = [
-        f"<br><strong>Vehicle Type:</strong> {vehicle.type}",
-        f"<strong>Make/Model:</strong> {vehicle.make} {vehicle.model}",
-        f"<strong>Max Passengers:</strong> {vehicle.max_passengers}",
-    ]
-    detail = _booking_detail_lines(booking, route, extra_lines=extra)
+    message = message_html("A vehicle has been assigned to your booking.")
+    detail = _booking_detail_lines(booking, route, [
+        ("Vehicle Type", vehicle.type),
+        ("Make/Model", f"{vehicle.make} {vehicle.model}"),
+        ("Max Passengers", vehicle.max_passengers),
+    ])
 
     with suppress(Exception):
         _send_html_email(subject, greeting, message, detail, passenger.email_address)
@@ -209,22 +242,25 @@ def send_assignment_to_passenger(booking):
 
     subject = f"Your Booking #{booking.booking_id} is Confirmed - Driver & Vehicle Assigned"
     greeting = f"Hello {passenger.full_name}"
-    message = (
-        "Great news! Your booking has been confirmed. A driver and vehicle have been assigned."
-        "<br><br>Your driver will arrive at the pickup location on time. "
-        "Please ensure you are ready at the scheduled time."
+    message = message_html(
+        "Great news! Your booking has been confirmed. A driver and vehicle have been assigned.",
+        "Your driver will arrive at the pickup location on time. "
+        "Please ensure you are ready at the scheduled time.",
+    )
+    detail = _booking_detail_lines(
+        booking, route,
+        _driver_rows(driver),
+        [
+            ("Vehicle Type", vehicle.type),
+            ("Make/Model", f"{vehicle.make} {vehicle.model}"),
+            ("License Plate", vehicle.license_plate),
+            ("Max Passengers", vehicle.max_passengers),
+        ],
+        [
+            ("Payment Method", booking.payment_type),
+            ("Payment Status", booking.payment_status),
+        ],
     )
-    extra = [
-        f"<br><strong>Driver:</strong> {driver.full_name}",
-        f"<strong>Driver Phone:</strong> {driver.phone_number or 'Will be provided'}",
-        f"<br><strong>Vehicle Type:</strong> {vehicle.type}",
-        f"<strong>Make/Model:</strong> {vehicle.make} {vehicle.model}",
-        f"<strong>License Plate:</strong> {vehicle.license_plate}",
-        f"<strong>Max Passengers:</strong> {vehicle.max_passengers}",
-        f"<br><strong>Payment Method:</strong> {booking.payment_type}",
-        f"<strong>Payment Status:</strong> {booking.payment_status}",
-    ]
-    detail = _booking_detail_lines(booking, route, extra_lines=extra)
 
     with suppress(Exception):
         _send_html_email(subject, greeting, message, detail, passenger.email_address)
@@ -244,30 +280,22 @@ def send_assignment_to_driver(booking):
         return False
 
     subject = f"New Booking Assignment - #{booking.booking_id}"
-    dashboard_url = f"{settings.FRONTEND_URL}/driver/bookings"
     greeting = f"Hello {driver.full_name}"
-    message = (
-        "You have been assigned to a new booking."
-        "<br><br>Please ensure you arrive at the pickup location on time with the assigned vehicle."
-        f"<br><br>View your dashboard: <a href='{dashboard_url}'>{dashboard_url}</a>"
+    message = message_html(
+        "You have been assigned to a new booking.",
+        "Please ensure you arrive at the pickup location on time with the assigned vehicle.",
+        _driver_dashboard_link(),
+    )
+    detail = _booking_detail_lines(
+        booking, route,
+        _passenger_rows(booking, passenger, with_email=True),
+        [
+            ("Vehicle Type", vehicle.type),
+            ("Make/Model", f"{vehicle.make} {vehicle.model}"),
+            ("License Plate", vehicle.license_plate),
+        ],
+        summary=[("Estimated Duration", f"{route.duration_minutes} minutes")],
     )
-    extra = [
-        f"<strong>Estimated Duration:</strong> {route.duration_minutes} minutes",
-        f"<br><strong>Passenger:</strong> {passenger.full_name}",
-        f"<strong>Phone:</strong> {passenger.phone_number}",
-        f"<strong>Email:</strong> {passenger.email_address}",
-        f"<strong>Adults:</strong> {booking.transfer_information.adults}",
-        f"<strong>Children:</strong> {booking.transfer_information.children or 0}",
-        f"<strong>Luggage:</strong> {booking.transfer_information.luggage}",
-    ]
-    if passenger.additional_information:
-        extra.append(f"<strong>Additional Info:</strong> {passenger.additional_information}")
-    extra.extend([
-        f"<br><strong>Vehicle Type:</strong> {vehicle.type}",
-        f"<strong>Make/Model:</strong> {vehicle.make} {vehicle.model}",
-        f"<strong>License Plate:</strong> {vehicle.license_plate}",
-    ])
-    detail = _booking_detail_lines(booking, route, extra_lines=extra)
 
     with suppress(Exception):
         _send_html_email(subject, greeting, message, detail, driver.email)
@@ -288,21 +316,19 @@ def send_booking_updated_to_passenger(booking, changes=None):
 
     subject = f"Booking Updated - #{booking.booking_id}"
     greeting = f"Hello {passenger.full_name}"
-
-    changes_html = ""
-    if changes:
-        changes_html = "<br><br><strong>Changes made:</strong><br>" + "<br>".join(f"• {c}" for c in changes)
-
-    message = f"Your booking has been updated. Please review the new details below.{changes_html}"
-
-    extra = [f"<strong>Status:</strong> {booking.booking_status}"]
-    if driver:
-        extra.append(f"<br><strong>Driver:</strong> {driver.full_name}")
-        extra.append(f"<strong>Driver Phone:</strong> {driver.phone_number or 'Will be provided'}")
-    if vehicle:
-        extra.append(f"<br><strong>Vehicle Type:</strong> {vehicle.type}")
-        extra.append(f"<strong>Make/Model:</strong> {vehicle.make} {vehicle.model}")
-    detail = _booking_detail_lines(booking, route, extra_lines=extra)
+    message = message_html(
+        "Your booking has been updated. Please review the new details below.",
+        changes_list(changes),
+    )
+    detail = _booking_detail_lines(
+        booking, route,
+        _driver_rows(driver) if driver else [],
+        [
+            ("Vehicle Type", vehicle.type),
+            ("Make/Model", f"{vehicle.make} {vehicle.model}"),
+        ] if vehicle else [],
+        summary=[("Status", booking.booking_status)],
+    )
 
     with suppress(Exception):
         _send_html_email(subject, greeting, message, detail, passenger.email_address)
@@ -322,34 +348,25 @@ def send_booking_updated_to_driver(booking, changes=None):
         return False
 
     subject = f"Booking Updated - #{booking.booking_id}"
-    dashboard_url = f"{settings.FRONTEND_URL}/driver/bookings"
     greeting = f"Hello {driver.full_name}"
-
-    changes_html = ""
-    if changes:
-        changes_html = "<br><br><strong>Changes made:</strong><br>" + "<br>".join(f"• {c}" for c in changes)
-
-    message = (
-        f"A booking you are assigned to has been updated. Please review the new details below.{changes_html}"
-        f"<br><br>View your dashboard: <a href='{dashboard_url}'>{dashboard_url}</a>"
+    message = message_html(
+        "A booking you are assigned to has been updated. Please review the new details below.",
+        changes_list(changes),
+        _driver_dashboard_link(),
+    )
+    detail = _booking_detail_lines(
+        booking, route,
+        _passenger_rows(booking, passenger),
+        [
+            ("Vehicle", f"{vehicle.make} {vehicle.model}"),
+            ("License Plate", vehicle.license_plate),
+            ("Type", vehicle.type),
+        ] if vehicle else [],
+        summary=[
+            ("Estimated Duration", f"{route.duration_minutes} minutes"),
+            ("Status", booking.booking_status),
+        ],
     )
-
-    extra = [
-        f"<strong>Estimated Duration:</strong> {route.duration_minutes} minutes",
-        f"<strong>Status:</strong> {booking.booking_status}",
-        f"<br><strong>Passenger:</strong> {passenger.full_name}",
-        f"<strong>Phone:</strong> {passenger.phone_number}",
-        f"<strong>Adults:</strong> {booking.transfer_information.adults}",
-        f"<strong>Children:</strong> {booking.transfer_information.children or 0}",
-        f"<strong>Luggage:</strong> {booking.transfer_information.luggage}",
-    ]
-    if passenger.additional_information:
-        extra.append(f"<strong>Additional Info:</strong> {passenger.additional_information}")
-    if vehicle:
-        extra.append(f"<br><strong>Vehicle:</strong> {vehicle.make} {vehicle.model}")
-        extra.append(f"<strong>License Plate:</strong> {vehicle.license_plate}")
-        extra.append(f"<strong>Type:</strong> {vehicle.type}")
-    detail = _booking_detail_lines(booking, route, extra_lines=extra)
 
     with suppress(Exception):
         _send_html_email(subject, greeting, message, detail, driver.email)
@@ -373,12 +390,11 @@ def send_status_change_to_passenger(booking, old_status, new_status):
 
     subject = f"Booking {new_status} - #{booking.booking_id}"
     greeting = f"Hello {passenger.full_name}"
-    message = status_messages.get(new_status, f'Your booking status has been updated to {new_status}.')
-    extra = [
-        f"<strong>Previous Status:</strong> {old_status}",
-        f"<strong>New Status:</strong> {new_status}",
-    ]
-    detail = _booking_detail_lines(booking, route, extra_lines=extra)
+    message = message_html(status_messages.get(new_status, f'Your booking status has been updated to {new_status}.'))
+    detail = _booking_detail_lines(booking, route, summary=[
+        ("Previous Status", old_status),
+        ("New Status", new_status),
+    ])
 
     with suppress(Exception):
         _send_html_email(subject, greeting, message, detail, passenger.email_address)
@@ -402,18 +418,16 @@ def send_status_change_to_driver(booking, old_status, new_status):
     }
 
     subject = f"Booking {new_status} - #{booking.booking_id}"
-    dashboard_url = f"{settings.FRONTEND_URL}/driver/bookings"
     greeting = f"Hello {driver.full_name}"
-    message = (
-        f"{status_messages.get(new_status, f'A booking you were assigned to has been updated to {new_status}.')}"
-        f"<br><br>View your dashboard: <a href='{dashboard_url}'>{dashboard_url}</a>"
+    message = message_html(
+        status_messages.get(new_status, f'A booking you were assigned to has been updated to {new_status}.'),
+        _driver_dashboard_link(),
     )
-    extra = [
-        f"<strong>Passenger:</strong> {passenger.full_name}",
-        f"<strong>Previous Status:</strong> {old_status}",
-        f"<strong>New Status:</strong> {new_status}",
-    ]
-    detail = _booking_detail_lines(booking, route, extra_lines=extra)
+    detail = _booking_detail_lines(booking, route, summary=[
+        ("Passenger", passenger.full_name),
+        ("Previous Status", old_status),
+        ("New Status", new_status),
+    ])
 
     with suppress(Exception):
         _send_html_email(subject, greeting, message, detail, driver.email)
@@ -441,13 +455,12 @@ def send_payment_status_update_to_passenger(booking, old_status, new_status):
 
     subject = f"Payment Update - Booking #{booking.booking_id}"
     greeting = f"Hello {passenger.full_name}"
-    message = status_messages.get(new_status, f'Your payment status has been updated to {new_status}.')
-    extra = [
-        f"<br><strong>Payment Method:</strong> {booking.payment_type}",
-        f"<strong>Previous Status:</strong> {old_status}",
-        f"<strong>New Status:</strong> {new_status}",
-    ]
-    detail = _booking_detail_lines(booking, route, extra_lines=extra)
+    message = message_html(status_messages.get(new_status, f'Your payment status has been updated to {new_status}.'))
+    detail = _booking_detail_lines(booking, route, [
+        ("Payment Method", booking.payment_type),
+        ("Previous Status", old_status),
+        ("New Status", new_status),
+    ])
 
     with suppress(Exception):
         _send_html_email(subject, greeting, message, detail, passenger.email_address)
@@ -0,0 +1,156 @@
+"""
+Idempotency-Key support for create endpoints.
+
+A client that retries a POST after a slow or lost response sends the same
+Idempotency-Key header. The first request claims the key by inserting an
+IdempotencyKey row. The view then runs, and its successful response is
+stored in the same transaction as the work it did. The outcome of a repeat
+depends on the state of the key:
+
+- finished: the stored response is returned as-is, with an
+  Idempotent-Replayed header, without running validation, inserts or emails
+- still running: 409
+- used with a different request body: 422
+
+Unsuccessful responses release the key, so the client can fix the request
+and retry with the same key. Keys expire after IDEMPOTENCY_KEY_TTL seconds.
+A claim still unfinished after IN_PROGRESS_TIMEOUT is treated as abandoned,
+for example when a worker died mid-request.
+"""
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http.request import RawPostDataException
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+DEFAULT_TTL = 24 * 60 * 60
+IN_PROGRESS_TIMEOUT = timedelta(minutes=5)
+
+
+class IdempotencyError(Exception):
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def request_fingerprint(request):
+    """SHA-256 of the method, path and raw body, to catch a key reused for a different request."""
+    try:
+        body = request.body
+    except RawPostDataException:
+        # The stream was already parsed; fall back to the parsed data.
+        body = json.dumps(request.data, sort_keys=True, default=str).encode()
+    digest = hashlib.sha256(f"{request.method} {request.path}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def claim_idempotency_key(scope, key, fingerprint):
+    """
+    Claim `key` for this request. Returns (record, claimed): claimed is False
+    when record holds a finished response to replay. Raises IdempotencyError
+    for a key in use by another request.
+    """
+    ttl = getattr(settings, 'IDEMPOTENCY_KEY_TTL', DEFAULT_TTL)
+
+    # Two rounds: the second runs after clearing an expired or abandoned claim.
+    for _ in range(2):
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    scope=scope,
+                    key=key,
+                    fingerprint=fingerprint,
+                    expires_at=now + timedelta(seconds=ttl),
+                )
+            return record, True
+        except IntegrityError:
+            pass
+
+        existing = IdempotencyKey.objects.filter(scope=scope, key=key).first()
+        if existing is None:
+            continue
+        if existing.expires_at <= now:
+            IdempotencyKey.objects.filter(pk=existing.pk, expires_at__lte=now).delete()
+            continue
+        if not existing.is_complete and existing.created_at <= now - IN_PROGRESS_TIMEOUT:
+            IdempotencyKey.objects.filter(pk=existing.pk, response_status__isnull=True).delete()
+            continue
+        if existing.fingerprint != fingerprint:
+            raise IdempotencyError(
+                "Idempotency key was already used for a different request",
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        if not existing.is_complete:
+            raise IdempotencyError(
+                "A request with this idempotency key is still being processed",
+                status.HTTP_409_CONFLICT,
+            )
+        return existing, False
+
+    raise IdempotencyError(
+        "A request with this idempotency key is still being processed",
+        status.HTTP_409_CONFLICT,
+    )
+
+
+def idempotent(scope):
+    """
+    Make a DRF view method honour the Idempotency-Key header.
+
+    Apply it outside the method's own @transaction.atomic: the claim must
+    commit before the work starts, so parallel duplicates can see it.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key:
+                return view_method(self, request, *args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return Response(
+                    {'error': 'Validation failed', 'details': {IDEMPOTENCY_HEADER: [f"Ensure this value has at most {MAX_KEY_LENGTH} characters."]}},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            try:
+                record, claimed = claim_idempotency_key(scope, key, request_fingerprint(request))
+            except IdempotencyError as exc:
+                return Response({'error': exc.message}, status=exc.status_code)
+
+            if not claimed:
+                return Response(
+                    record.response_body,
+                    status=record.response_status,
+                    headers={REPLAYED_HEADER: 'true'},
+                )
+
+            try:
+                with transaction.atomic():
+                    response = view_method(self, request, *args, **kwargs)
+                    if status.is_success(response.status_code):
+                        record.response_status = response.status_code
+                        record.response_body = response.data
+                        record.save(update_fields=['response_status', 'response_body'])
+            except Exception:
+                record.delete()
+                raise
+
+            if not status.is_success(response.status_code):
+                record.delete()
+            return response
+        return wrapper
+    return decorator
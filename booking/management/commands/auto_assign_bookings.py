@@ -0,0 +1,42 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from booking.auto_assign import apply_auto_assignment, plan_auto_assignment
+
+
+class Command(BaseCommand):
+    help = "Assign drivers and vehicles to Pending bookings picked up in a date range."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date-from', type=date.fromisoformat, default=None, help="YYYY-MM-DD (default: today)")
+        parser.add_argument('--date-to', type=date.fromisoformat, default=None, help="YYYY-MM-DD (default: --date-from)")
+        parser.add_argument('--dry-run', action='store_true', help="Print the plan without saving it.")
+
+    def handle(self, *args, **options):
+        date_from = options['date_from'] or date.today()
+        date_to = options['date_to'] or date_from
+
+        if date_to < date_from:
+            raise CommandError("--date-to must be on or after --date-from.")
+
+        with transaction.atomic():
+            bookings, assignments, unassigned = plan_auto_assignment(
+                date_from, date_to, lock=not options['dry_run']
+            )
+            if not options['dry_run']:
+                apply_auto_assignment(bookings, assignments)
+
+        for booking_pk, (driver_id, vehicle_id) in assignments.items():
+            self.stdout.write(f"{bookings[booking_pk].booking_id}: driver {driver_id}, vehicle {vehicle_id}")
+        for booking_pk, reason in unassigned.items():
+            self.stdout.write(self.style.WARNING(f"{bookings[booking_pk].booking_id}: {reason}"))
+
+        if options['dry_run']:
+            self.stdout.write(f"Dry run: {len(assignments)} booking(s) can be assigned, {len(unassigned)} cannot.")
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Assigned {len(assignments)} booking(s); {len(unassigned)} left Pending."
+        ))
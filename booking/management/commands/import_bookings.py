@@ -0,0 +1,46 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from booking.bulk_import import (
+    BATCH_SIZE,
+    FEED_FORMATS,
+    FeedError,
+    create_bookings,
+    parse_booking_feed,
+    validate_booking_rows,
+)
+
+
+class Command(BaseCommand):
+    help = "Import bookings from a partner/agency CSV or JSON feed. Nothing is imported if any row is invalid."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Path to the feed file.")
+        parser.add_argument('--format', choices=FEED_FORMATS, default=None, help="Feed format (default: from the file extension)")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help=f"Rows per INSERT (default: {BATCH_SIZE})")
+        parser.add_argument('--dry-run', action='store_true', help="Validate the feed without importing it.")
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        feed_format = options['format'] or path.suffix.lstrip('.').lower()
+
+        try:
+            rows = parse_booking_feed(path.read_text(encoding='utf-8-sig'), feed_format)
+        except OSError as exc:
+            raise CommandError(f"Could not read {path}: {exc}") from exc
+        except FeedError as exc:
+            raise CommandError(str(exc)) from exc
+
+        validated_rows, errors = validate_booking_rows(rows)
+        for error in errors:
+            self.stderr.write(self.style.ERROR(f"Row {error['row']}: {error['errors']}"))
+        if errors:
+            raise CommandError(f"{len(errors)} invalid row(s); nothing was imported.")
+
+        if options['dry_run']:
+            self.stdout.write(f"Dry run: {len(validated_rows)} booking(s) are valid.")
+            return
+
+        bookings = create_bookings(validated_rows, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Imported {len(bookings)} booking(s)."))
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-17 09:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0017_remove_booking_cash_deposit_percent'),
+        ('routes', '0010_route_cash_deposit_percent'),
+        ('vehicle', '0007_alter_vehicle_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['pickup_date'], name='booking_pickup_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['return_date'], name='booking_return_date_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 6.0.1 on 2026-10-17 09:41
+
+from datetime import datetime, timedelta, timezone
+
+from django.db import migrations
+
+# Mirrors booking.utils.BUFFER_MINUTES at the time of this migration.
+BUFFER_MINUTES = 30
+BATCH_SIZE = 1000
+
+
+def _window(day, at, duration):
+    start = datetime.combine(day, at).replace(tzinfo=timezone.utc)
+    return start, start + duration
+
+
+def backfill_schedule_windows(apps, schema_editor):
+    Booking = apps.get_model('booking', 'Booking')
+
+    batch = []
+    bookings = Booking.objects.select_related('route').order_by('pk')
+    for booking in bookings.iterator(chunk_size=BATCH_SIZE):
+        duration = timedelta(minutes=(booking.route.duration_minutes if booking.route else 0) + BUFFER_MINUTES)
+
+        if booking.pickup_date and booking.pickup_time:
+            booking.outbound_start, booking.outbound_end = _window(booking.pickup_date, booking.pickup_time, duration)
+        if booking.trip_type == "Return" and booking.return_date and booking.return_time:
+            booking.return_start, booking.return_end = _window(booking.return_date, booking.return_time, duration)
+
+        batch.append(booking)
+        if len(batch) >= BATCH_SIZE:
+            Booking.objects.bulk_update(batch, ['outbound_start', 'outbound_end', 'return_start', 'return_end'])
+            batch = []
+
+    if batch:
+        Booking.objects.bulk_update(batch, ['outbound_start', 'outbound_end', 'return_start', 'return_end'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0019_booking_schedule_windows'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_schedule_windows, migrations.RunPython.noop),
+    ]
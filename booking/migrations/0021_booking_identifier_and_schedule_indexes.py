@@ -0,0 +1,40 @@
+# Generated by Django 6.0.1 on 2026-10-17 17:52
+
+from django.db import migrations, models
+
+
+def blank_booking_ids_to_null(apps, schema_editor):
+    # The unique constraint allows many NULLs but only one blank string.
+    Booking = apps.get_model('booking', 'Booking')
+    Booking.objects.filter(booking_id='').update(booking_id=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0020_backfill_booking_schedule_windows'),
+    ]
+
+    operations = [
+        migrations.RunPython(blank_booking_ids_to_null, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.UniqueConstraint(fields=('booking_id',), name='booking_booking_id_uniq'),
+        ),
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='booking_pickup_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['pickup_date', 'booking_status'], name='booking_date_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['driver', 'booking_status', 'pickup_date'], name='booking_driver_sched_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['vehicle', 'booking_status', 'pickup_date'], name='booking_vehicle_sched_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.1 on 2026-10-17 20:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0022_idempotencykey'),
+        ('routes', '0011_route_route_id_unique'),
+        ('vehicle', '0007_alter_vehicle_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['driver', 'pickup_date', 'pickup_time', 'id'], name='booking_driver_pickup_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-17 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0023_booking_driver_pickup_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='passengerdetail',
+            name='import_key',
+            field=models.CharField(blank=True, editable=False, max_length=40, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='transferinformation',
+            name='import_key',
+            field=models.CharField(blank=True, editable=False, max_length=40, null=True, unique=True),
+        ),
+    ]
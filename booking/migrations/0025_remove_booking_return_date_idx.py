@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-17 21:25
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0024_detail_import_key'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='booking_return_date_idx',
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.1 on 2026-10-17 21:40
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_tables(apps, schema_editor):
+    # The default cache falls back to the database (fct.settings CACHES); its
+    # table must exist wherever migrate has run. Existing tables are skipped.
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0025_remove_booking_return_date_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_tables, migrations.RunPython.noop),
+    ]
@@ -2,12 +2,12 @@ from django.db import models
 from routes.models import Route
 from vehicle.models import Vehicle
 from django.contrib.auth import get_user_model
+from fct.utils import save_with_public_id
+from .utils import get_booking_time_windows, to_stored_datetime
 
 user = get_user_model()
 
 import math
-import secrets
-import string
 
 from django.db import models
 from django.utils.text import slugify
@@ -24,12 +24,16 @@ class TransferInformation(models.Model):
   adults = models.IntegerField(default=1) 
   children = models.IntegerField(null=True, blank=True) 
   luggage = models.CharField(choices=LUGGAGE_CHOICES, max_length=80)
+  # Set by feed imports to find bulk-inserted rows again (see booking.bulk_import).
+  import_key = models.CharField(max_length=40, unique=True, null=True, blank=True, editable=False)
 
 class PassengerDetail(models.Model):
   full_name = models.CharField(max_length=50)
   phone_number = models.CharField(max_length=50) 
   email_address = models.EmailField(max_length=30) 
   additional_information = models.TextField(null=True, blank=True)
+  # Set by feed imports to find bulk-inserted rows again (see booking.bulk_import).
+  import_key = models.CharField(max_length=40, unique=True, null=True, blank=True, editable=False)
 
 
 class  Booking(models.Model):
@@ -92,22 +96,94 @@ class  Booking(models.Model):
   created_time = models.DateTimeField(auto_now_add=True, null=True, blank=True)
   updated_time = models.DateTimeField(auto_now=True)
 
+  # Denormalized unavailability windows (see booking.utils.get_booking_time_windows),
+  # kept in sync on save so overlap checks can run as indexed queries.
+  outbound_start = models.DateTimeField(null=True, blank=True, editable=False)
+  outbound_end = models.DateTimeField(null=True, blank=True, editable=False)
+  return_start = models.DateTimeField(null=True, blank=True, editable=False)
+  return_end = models.DateTimeField(null=True, blank=True, editable=False)
+
+  # Changing any of these moves the booking's time windows.
+  SCHEDULE_FIELDS = {'route', 'route_id', 'trip_type', 'pickup_date', 'pickup_time', 'return_date', 'return_time'}
+  WINDOW_FIELDS = ['outbound_start', 'outbound_end', 'return_start', 'return_end']
+
   class Meta:
         verbose_name = 'Booking Detail'
         verbose_name_plural = 'Booking Details'
-
-  def save(self, *args, **kwargs):
-      generate_booking_id = not self.booking_id
-      
+        constraints = [
+            models.UniqueConstraint(fields=['booking_id'], name='booking_booking_id_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['pickup_date', 'booking_status'], name='booking_date_status_idx'),
+            models.Index(fields=['driver', 'booking_status', 'pickup_date'], name='booking_driver_sched_idx'),
+            models.Index(fields=['vehicle', 'booking_status', 'pickup_date'], name='booking_vehicle_sched_idx'),
+            models.Index(fields=['driver', 'pickup_date', 'pickup_time', 'id'], name='booking_driver_pickup_idx'),
+            models.Index(fields=['outbound_start', 'outbound_end'], name='booking_outbound_window_idx'),
+            models.Index(fields=['return_start', 'return_end'], name='booking_return_window_idx'),
+        ]
+
+  def set_schedule_windows(self):
+      """Copy the booking's pickup/return windows into the stored window columns."""
+      windows = [
+          (to_stored_datetime(start), to_stored_datetime(end))
+          for start, end in get_booking_time_windows(self)
+      ]
+      outbound = windows[0] if windows else (None, None)
+      inbound = windows[1] if len(windows) > 1 else (None, None)
+
+      self.outbound_start, self.outbound_end = outbound
+      self.return_start, self.return_end = inbound
+
+  def round_amounts(self):
+      """Round amounts up to whole cents, as they are stored."""
       self.amount_paid = math.ceil(float(self.amount_paid) * 100) / 100
       self.outstanding_amount = math.ceil(float(self.outstanding_amount) * 100) / 100
 
-      super().save(*args, **kwargs)
+  def save(self, *args, **kwargs):
+      self.round_amounts()
+
+      update_fields = kwargs.get('update_fields')
+      if update_fields is None or self.SCHEDULE_FIELDS.intersection(update_fields):
+          self.set_schedule_windows()
+          if update_fields is not None:
+              kwargs['update_fields'] = set(update_fields).union(self.WINDOW_FIELDS)
 
-      if generate_booking_id:
-          random_str = ''.join(secrets.choice(string.ascii_lowercase + string.digits) for _ in range(5))
-          self.booking_id = f"FCT{random_str}{self.pk}"
-          super().save(update_fields=['booking_id'])
+      if self.booking_id:
+          super().save(*args, **kwargs)
+      else:
+          save_with_public_id(self, 'booking_id', 'FCT', super().save, *args, **kwargs)
 
   def __str__(self):
       return f"{self.booking_id}"
+
+
+class IdempotencyKey(models.Model):
+  """
+  A client-supplied Idempotency-Key and the response it produced.
+
+  The row is inserted, unfinished, before the request runs. The unique
+  (scope, key) constraint lets only one of several parallel duplicates
+  through. The response is stored in the same transaction as the work, so
+  replays return exactly what the first request committed.
+  """
+  scope = models.CharField(max_length=50)
+  key = models.CharField(max_length=255)
+  fingerprint = models.CharField(max_length=64)
+  response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+  response_body = models.JSONField(null=True, blank=True)
+  created_at = models.DateTimeField(auto_now_add=True)
+  expires_at = models.DateTimeField(db_index=True)
+
+  class Meta:
+        verbose_name = 'Idempotency Key'
+        verbose_name_plural = 'Idempotency Keys'
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'key'], name='idempotency_scope_key_uniq'),
+        ]
+
+  @property
+  def is_complete(self):
+      return self.response_status is not None
+
+  def __str__(self):
+      return f"{self.scope}:{self.key}"
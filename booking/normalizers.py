@@ -0,0 +1,167 @@
+"""
+Normalization of booking create payloads (JSON, multipart and flat feeds).
+
+Requests reach normalize_booking_request_data() already underscoreized by the
+RecursiveCamelCase* parsers; feed rows arrive as written. Keys are converted
+in one pass either way with fct.casing.underscoreize_keys, for which a key
+that is already snake_case is a cache hit.
+"""
+import json
+import re
+from contextlib import suppress
+
+from django.core.cache import cache
+from django.db import transaction
+
+from fct.casing import underscoreize_keys
+from routes.models import Route
+
+
+BOOKING_NESTED_FIELDS = {
+    'transfer_information': {'flight_number', 'adults', 'children', 'luggage'},
+    'passenger_information': {
+        'full_name',
+        'phone_number',
+        'email_address',
+        'additional_information',
+    },
+}
+
+# Flat alias -> the nested field it belongs to.
+NESTED_FIELD_ALIASES = {
+    alias: field_name
+    for field_name, aliases in BOOKING_NESTED_FIELDS.items()
+    for alias in aliases
+}
+
+BRACKET_SEGMENT = re.compile(r'\[([^\[\]]+)\]')
+BRACKET_PATH = re.compile(r'(?:\[[^\[\]]+\])+')
+NESTED_KEY_PREFIX = re.compile(
+    '^(' + '|'.join(re.escape(field_name) for field_name in BOOKING_NESTED_FIELDS) + r')[.\[]'
+)
+CACHEABLE_ROUTE_ID = re.compile(r'[\w-]{1,100}')
+
+# Route IDs never change in practice; the signals drop an entry when they do.
+ROUTE_PK_CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def _coerce_request_data(raw_data):
+    """Convert request data into a plain dict while preserving scalar values."""
+    if hasattr(raw_data, 'lists'):
+        return {
+            key: values if len(values) > 1 else values[-1]
+            for key, values in raw_data.lists()
+        }
+    return dict(raw_data)
+
+
+def _extract_nested_key_path(key, prefix):
+    """Support nested multipart keys like field[subfield] and field.subfield."""
+    if key.startswith(f"{prefix}."):
+        path = key[len(prefix) + 1:].split('.')
+        return [segment for segment in path if segment]
+
+    if key.startswith(f"{prefix}["):
+        suffix = key[len(prefix):]
+        if BRACKET_PATH.fullmatch(suffix):
+            return BRACKET_SEGMENT.findall(suffix)
+
+    return None
+
+
+def _assign_nested_value(payload, path, value):
+    current = payload
+    for segment in path[:-1]:
+        next_value = current.get(segment)
+        if not isinstance(next_value, dict):
+            next_value = {}
+            current[segment] = next_value
+        current = next_value
+
+    current[path[-1]] = value
+
+
+def route_pk_cache_key(route_id):
+    return f"booking:route-pk:{route_id}"
+
+
+def resolve_route_pk(route_id):
+    """Return the pk of the route with this public ID, or None."""
+    if not CACHEABLE_ROUTE_ID.fullmatch(route_id):
+        return Route.objects.filter(route_id=route_id).values_list('pk', flat=True).first()
+
+    key = route_pk_cache_key(route_id)
+    pk = cache.get(key)
+    if pk is None:
+        pk = Route.objects.filter(route_id=route_id).values_list('pk', flat=True).first()
+        if pk is not None:
+            cache.set(key, pk, ROUTE_PK_CACHE_TIMEOUT)
+    return pk
+
+
+def forget_route_pk(route_id):
+    """Drop a cached route_id -> pk entry once the current transaction commits."""
+    if route_id and CACHEABLE_ROUTE_ID.fullmatch(route_id):
+        key = route_pk_cache_key(route_id)
+        transaction.on_commit(lambda: cache.delete(key))
+
+
+def normalize_booking_request_data(raw_data, resolve_route=True):
+    """
+    Accept JSON strings, bracket notation, dot notation, and flat aliases.
+
+    With resolve_route a public route ID is swapped for the route pk; bulk
+    callers pass False and resolve every row's route in one query.
+    """
+    data = underscoreize_keys(_coerce_request_data(raw_data))
+
+    for field_name in BOOKING_NESTED_FIELDS:
+        if field_name in data and isinstance(data[field_name], str):
+            with suppress(Exception):
+                parsed = json.loads(data[field_name])
+                data[field_name] = underscoreize_keys(parsed)
+
+    # One scan sorts every key that belongs to a nested field into its group,
+    # in payload order. Each field is then folded in turn, with the same
+    # first-wins rule for aliases and the same key order as folding one field
+    # at a time over the whole payload.
+    grouped = {field_name: [] for field_name in BOOKING_NESTED_FIELDS}
+    for key in data:
+        if not isinstance(key, str):
+            continue
+        field_name = NESTED_FIELD_ALIASES.get(key)
+        if field_name is not None:
+            grouped[field_name].append((key, None))
+            continue
+        match = NESTED_KEY_PREFIX.match(key)
+        if match:
+            path = _extract_nested_key_path(key, match.group(1))
+            if path:
+                grouped[match.group(1)].append((key, path))
+
+    for field_name, members in grouped.items():
+        nested_payload = data.get(field_name)
+        if not isinstance(nested_payload, dict):
+            nested_payload = {}
+
+        consumed_keys = []
+        for key, path in members:
+            if path:
+                _assign_nested_value(nested_payload, path, data[key])
+                consumed_keys.append(key)
+            elif key not in nested_payload:
+                nested_payload[key] = data[key]
+                consumed_keys.append(key)
+
+        if nested_payload:
+            data[field_name] = nested_payload
+
+        for key in consumed_keys:
+            data.pop(key, None)
+
+    if resolve_route and 'route' in data and isinstance(data['route'], str):
+        route_pk = resolve_route_pk(data['route'])
+        if route_pk is not None:
+            data['route'] = route_pk
+
+    return data
@@ -0,0 +1,58 @@
+"""
+Sorted-sweep overlap kernel for bulk conflict detection.
+
+Works on plain (start, end, key) tuples with integer epoch seconds, as built by
+utils.to_epoch. Both inputs are sorted by start once and swept together,
+keeping the intervals still running in a heap ordered by end. Each new
+interval overlaps exactly the other side's intervals that are still running,
+so the cost is O((n + m) log(n + m) + overlaps) instead of the
+O(n * m) of comparing every pair with check_time_overlap.
+
+Intervals are half-open [start, end), matching check_time_overlap; empty
+intervals overlap nothing and are skipped.
+"""
+import heapq
+
+
+def iter_overlaps(windows, intervals):
+    """
+    Yield (window_key, interval_key) for every overlapping pair.
+
+    windows and intervals are iterables of (start, end, key). Each pair is
+    yielded once per overlapping (window, interval) combination, in no
+    particular order.
+    """
+    events = [(start, 0, end, key) for start, end, key in windows if start < end]
+    events += [(start, 1, end, key) for start, end, key in intervals if start < end]
+    events.sort(key=lambda event: event[0])
+
+    # running[side] holds (end, sequence, key); the sequence keeps keys out of comparisons.
+    running = ([], [])
+    for sequence, (start, side, end, key) in enumerate(events):
+        other = running[1 - side]
+        while other and other[0][0] <= start:
+            heapq.heappop(other)
+
+        # Everything left on the other side started no later than `start` and ends after it.
+        if side == 0:
+            for _, _, interval_key in other:
+                yield key, interval_key
+        else:
+            for _, _, window_key in other:
+                yield window_key, key
+
+        heapq.heappush(running[side], (end, sequence, key))
+
+
+def find_resource_conflicts(windows, busy):
+    """
+    Map each window key to the set of resource ids busy during that window.
+
+    windows: [(start, end, window_key)]
+    busy:    [(start, end, resource_id)]
+    Windows without conflicts are left out of the result.
+    """
+    conflicts = {}
+    for window_key, resource_id in iter_overlaps(windows, busy):
+        conflicts.setdefault(window_key, set()).add(resource_id)
+    return conflicts
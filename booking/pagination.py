@@ -0,0 +1,11 @@
+from fct.utils import KeysetPagination
+
+
+class BookingListPagination(KeysetPagination):
+    # Newest first on the primary key.
+    ordering = ('-pk',)
+
+
+class DriverBookingsPagination(KeysetPagination):
+    # Served by booking_driver_pickup_idx; pk breaks ties within a pickup time.
+    ordering = ('-pickup_date', '-pickup_time', '-pk')
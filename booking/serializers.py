@@ -1,6 +1,9 @@
+from django.db import transaction
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
 from .models import Booking, TransferInformation, PassengerDetail
+from .timeline import get_stored_timeline_cache_keys, invalidate_timeline_cache
 from routes.models import Route
 from vehicle.models import Vehicle
 from account.models import UserProfile
@@ -65,6 +68,65 @@ class AvailableVehicleSerializer(serializers.ModelSerializer):
         return ' '.join(parts)
 
 
+class AvailabilityMatrixQuerySerializer(serializers.Serializer):
+    """Query params for the availability matrix: booking ids or a pickup date range."""
+    MAX_BOOKINGS = 200
+    MAX_DAYS = 31
+
+    booking_ids = serializers.CharField(required=False, help_text="Comma-separated booking IDs.")
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    vehicle_type = serializers.ChoiceField(choices=Vehicle.VEHICLE_TYPE_CHOICES, required=False)
+
+    def validate_booking_ids(self, value):
+        booking_ids = [booking_id.strip() for booking_id in value.split(',') if booking_id.strip()]
+        if len(booking_ids) > self.MAX_BOOKINGS:
+            raise serializers.ValidationError(f"At most {self.MAX_BOOKINGS} bookings can be requested at once.")
+        return booking_ids
+
+    def validate(self, data):
+        has_ids = bool(data.get('booking_ids'))
+        has_range = 'date_from' in data or 'date_to' in data
+
+        if has_ids == has_range:
+            raise serializers.ValidationError("Provide either booking_ids or date_from/date_to.")
+
+        if has_range:
+            date_from = data.get('date_from')
+            date_to = data.get('date_to', date_from)
+            if not date_from:
+                raise serializers.ValidationError("date_from is required with date_to.")
+            if date_to < date_from:
+                raise serializers.ValidationError("date_to must be on or after date_from.")
+            if (date_to - date_from).days >= self.MAX_DAYS:
+                raise serializers.ValidationError(f"Date range cannot exceed {self.MAX_DAYS} days.")
+            data['date_to'] = date_to
+
+        return data
+
+
+class DateRangeSerializer(serializers.Serializer):
+    """A date_from/date_to range of at most MAX_DAYS days; date_to defaults to date_from."""
+    MAX_DAYS = 31
+
+    date_from = serializers.DateField()
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, data):
+        data['date_to'] = data.get('date_to') or data['date_from']
+        if data['date_to'] < data['date_from']:
+            raise serializers.ValidationError("date_to must be on or after date_from.")
+        if (data['date_to'] - data['date_from']).days >= self.MAX_DAYS:
+            raise serializers.ValidationError(f"Date range cannot exceed {self.MAX_DAYS} days.")
+        return data
+
+
+class AutoAssignSerializer(DateRangeSerializer):
+    """Input for automatically assigning drivers and vehicles to Pending bookings."""
+    dry_run = serializers.BooleanField(default=False)
+    notify = serializers.BooleanField(default=True)
+
+
 class BookingListSerializer(serializers.ModelSerializer):
     passenger_information = PassengerListSerializer(read_only=True)
     route = RouteListSerializer(read_only=True)
@@ -171,10 +233,12 @@ class BookingCreateSerializer(serializers.ModelSerializer):
             'total_amount': {'required': True},
         }
 
+    @transaction.atomic
     def create(self, validated_data):
         transfer_data = validated_data.pop('transfer_information')
         passenger_data = validated_data.pop('passenger_information')
 
+        # One transaction, so a failed booking insert leaves no orphaned details
         transfer_info = TransferInformation.objects.create(**transfer_data)
         passenger_info = PassengerDetail.objects.create(**passenger_data)
         
@@ -196,6 +260,159 @@ class BookingCreateSerializer(serializers.ModelSerializer):
         return data
 
 
+class ImportRelatedField(serializers.RelatedField):
+    """Resolve a related object by pk from the ones bulk-loaded into context[context_key]."""
+
+    default_error_messages = {
+        'does_not_exist': "'{value}' does not exist.",
+    }
+
+    def __init__(self, context_key, **kwargs):
+        self.context_key = context_key
+        kwargs.setdefault('read_only', False)
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        instance = self.context.get(self.context_key, {}).get(str(data))
+        if instance is None:
+            self.fail('does_not_exist', value=data)
+        return instance
+
+    def to_representation(self, value):
+        return value.pk
+
+
+class ImportRouteField(ImportRelatedField):
+    """Resolve a route by route_id or pk from the routes bulk-loaded into the context."""
+
+    default_error_messages = {
+        'does_not_exist': "Route '{value}' does not exist.",
+    }
+
+    def __init__(self, **kwargs):
+        super().__init__('routes', queryset=Route.objects.all(), **kwargs)
+
+    def to_representation(self, value):
+        return value.route_id
+
+
+class BookingImportListSerializer(serializers.ListSerializer):
+    def create(self, validated_data):
+        from .bulk_import import create_bookings
+        return create_bookings(validated_data)
+
+
+class BookingImportSerializer(BookingCreateSerializer):
+    """
+    Validates one row of a bulk import feed.
+
+    A row may come with its driver and vehicle already chosen; they must be
+    given together and are checked for clashes by bulk_import across the
+    whole feed. Saving goes through bulk_import.create_bookings.
+    """
+
+    route = ImportRouteField()
+    driver = ImportRelatedField(
+        'drivers',
+        queryset=UserProfile.objects.filter(is_driver=True, is_active=True, disabled=False),
+        required=False,
+        error_messages={'does_not_exist': "Driver '{value}' does not exist or is not an active driver."},
+    )
+    vehicle = ImportRelatedField(
+        'vehicles',
+        queryset=Vehicle.objects.all(),
+        required=False,
+        error_messages={'does_not_exist': "Vehicle '{value}' does not exist."},
+    )
+
+    class Meta(BookingCreateSerializer.Meta):
+        fields = BookingCreateSerializer.Meta.fields + ['driver', 'vehicle']
+        list_serializer_class = BookingImportListSerializer
+
+    def validate(self, data):
+        data = super().validate(data)
+        if ('driver' in data) != ('vehicle' in data):
+            raise serializers.ValidationError("Driver and vehicle must be assigned together.")
+        return data
+
+    def create(self, validated_data):
+        from .bulk_import import create_bookings
+        return create_bookings([validated_data])[0]
+
+
+class ScheduleLockMixin:
+    """
+    Save under driver/vehicle row locks after re-checking for conflicts.
+
+    Field validation runs without locks, so two dispatchers can both pass it
+    for the same driver at the same moment. save() locks the booking, driver
+    and vehicle rows, re-runs the overlap check against committed data and
+    writes, all in one transaction.
+    """
+    driver_error_field = api_settings.NON_FIELD_ERRORS_KEY
+    vehicle_error_field = api_settings.NON_FIELD_ERRORS_KEY
+
+    def schedule_needs_check(self):
+        return True
+
+    def get_scheduled_booking(self):
+        """Return an unsaved copy of the booking with the validated times applied."""
+        instance = self.instance
+        data = self.validated_data
+        return Booking(
+            id=instance.id,
+            booking_id=instance.booking_id,
+            route=instance.route,
+            pickup_date=data.get('pickup_date', instance.pickup_date),
+            pickup_time=data.get('pickup_time', instance.pickup_time),
+            return_date=data.get('return_date', instance.return_date),
+            return_time=data.get('return_time', instance.return_time),
+            trip_type=data.get('trip_type', instance.trip_type),
+        )
+
+    def check_schedule_conflicts(self, driver_id, vehicle_id):
+        from .utils import (
+            get_conflicting_booking_for_driver,
+            get_conflicting_booking_for_vehicle,
+            get_booking_time_windows,
+            format_time_window,
+        )
+
+        booking = self.get_scheduled_booking()
+        errors = {}
+
+        for resource, resource_id, lookup, field in (
+            ('Driver', driver_id, get_conflicting_booking_for_driver, self.driver_error_field),
+            ('Vehicle', vehicle_id, get_conflicting_booking_for_vehicle, self.vehicle_error_field),
+        ):
+            conflicting = lookup(resource_id, booking, exclude_booking_id=booking.booking_id)
+            if conflicting:
+                windows = get_booking_time_windows(conflicting)
+                window_str = ", ".join([format_time_window(s, e) for s, e in windows])
+                errors.setdefault(field, []).append(
+                    f"{resource} is no longer available. It was just assigned to booking "
+                    f"#{conflicting.booking_id} ({window_str})."
+                )
+
+        if errors:
+            raise serializers.ValidationError(errors)
+
+    def save(self, **kwargs):
+        if self.instance is None or not self.schedule_needs_check():
+            return super().save(**kwargs)
+
+        from .utils import lock_schedule_rows
+
+        with transaction.atomic():
+            driver_id, vehicle_id = lock_schedule_rows(
+                self.instance,
+                driver=self.validated_data.get('driver'),
+                vehicle=self.validated_data.get('vehicle'),
+            )
+            self.check_schedule_conflicts(driver_id, vehicle_id)
+            return super().save(**kwargs)
+
+
 class AssignDriverSerializer(serializers.ModelSerializer):
     class Meta:
         model = Booking
@@ -268,7 +485,7 @@ class AssignVehicleSerializer(serializers.ModelSerializer):
         return value
 
 
-class AssignDriverVehicleSerializer(serializers.ModelSerializer):
+class AssignDriverVehicleSerializer(ScheduleLockMixin, serializers.ModelSerializer):
     """Serializer for assigning both driver and vehicle to a booking."""
     driver_id = serializers.PrimaryKeyRelatedField(
         queryset=UserProfile.objects.filter(is_driver=True),
@@ -283,6 +500,9 @@ class AssignDriverVehicleSerializer(serializers.ModelSerializer):
         allow_null=False
     )
 
+    driver_error_field = 'driver_id'
+    vehicle_error_field = 'vehicle_id'
+
     class Meta:
         model = Booking
         fields = ['driver_id', 'vehicle_id']
@@ -348,7 +568,9 @@ class AssignDriverVehicleSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         instance.driver = validated_data.get('driver', instance.driver)
         instance.vehicle = validated_data.get('vehicle', instance.vehicle)
-        instance.save(update_fields=['driver', 'vehicle'])
+        # Both driver and vehicle are required, so the booking is now Assigned
+        instance.booking_status = 'Assigned'
+        instance.save(update_fields=['driver', 'vehicle', 'booking_status'])
         return instance
 
 
@@ -375,6 +597,8 @@ class BookingStatusSerializer(serializers.ModelSerializer):
 
         # Use direct database update to ensure it's saved
         Booking.objects.filter(pk=instance.pk).update(booking_status=new_status)
+        # update() skips the model signals that keep the schedule timeline cache fresh
+        invalidate_timeline_cache(get_stored_timeline_cache_keys(instance))
 
         # Update the instance in memory
         instance.booking_status = new_status
@@ -408,7 +632,7 @@ class PaymentStatusSerializer(serializers.ModelSerializer):
         return instance
 
 
-class RescheduleBookingSerializer(serializers.ModelSerializer):
+class RescheduleBookingSerializer(ScheduleLockMixin, serializers.ModelSerializer):
     """
     Serializer for rescheduling a booking's pickup and return dates/times.
     Validates driver and vehicle availability for new times.
@@ -543,7 +767,7 @@ class RescheduleBookingSerializer(serializers.ModelSerializer):
         return instance
 
 
-class BookingUpdateSerializer(serializers.ModelSerializer):
+class BookingUpdateSerializer(ScheduleLockMixin, serializers.ModelSerializer):
     """
     Serializer for updating booking details.
     Tracks changes for email notifications.
@@ -634,6 +858,8 @@ class BookingUpdateSerializer(serializers.ModelSerializer):
             'return_time' in data and data['return_time'] != self._original_values.get('return_time')
         )
 
+        self.time_changed = time_changed
+
         if time_changed and self.instance:
             # Create a temporary booking-like object with new values to check availability
             temp_booking = Booking(
@@ -691,6 +917,9 @@ class BookingUpdateSerializer(serializers.ModelSerializer):
 
         return data
 
+    def schedule_needs_check(self):
+        return getattr(self, 'time_changed', False)
+
     def update(self, instance, validated_data):
         # Store changes before update
         self.changes = self.get_changes(validated_data)
@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+from django.db.models import DateTimeField, ExpressionWrapper, F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from routes.models import Route
+from .models import Booking
+from .normalizers import forget_route_pk
+from .timeline import (
+    get_stored_timeline_cache_keys,
+    get_timeline_cache_keys,
+    invalidate_timeline_cache,
+)
+from .utils import BUFFER_MINUTES
+
+# Saves that touch none of these fields cannot change a timeline.
+TIMELINE_FIELDS = Booking.SCHEDULE_FIELDS.union(
+    Booking.WINDOW_FIELDS,
+    {'booking_id', 'booking_status', 'driver', 'driver_id', 'vehicle', 'vehicle_id'},
+)
+
+
+def _affects_timeline(update_fields):
+    return update_fields is None or bool(TIMELINE_FIELDS.intersection(update_fields))
+
+
+@receiver(pre_save, sender=Booking)
+def remember_booking_timeline_keys(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Note which timeline days the booking occupied before this save."""
+    instance._previous_timeline_keys = set()
+    if raw or not instance.pk or not _affects_timeline(update_fields):
+        return
+
+    previous = Booking.objects.filter(pk=instance.pk).only(
+        'driver_id', 'vehicle_id', *Booking.WINDOW_FIELDS
+    ).first()
+    if previous:
+        instance._previous_timeline_keys = get_stored_timeline_cache_keys(previous)
+
+
+@receiver(post_save, sender=Booking)
+def invalidate_booking_timeline_on_save(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or not _affects_timeline(update_fields):
+        return
+
+    previous_keys = getattr(instance, '_previous_timeline_keys', set())
+    invalidate_timeline_cache(previous_keys | get_stored_timeline_cache_keys(instance))
+
+
+@receiver(post_delete, sender=Booking)
+def invalidate_booking_timeline_on_delete(sender, instance, **kwargs):
+    invalidate_timeline_cache(get_stored_timeline_cache_keys(instance))
+
+
+@receiver(post_save, sender=Route)
+def refresh_booking_windows_for_route(sender, instance, created, **kwargs):
+    """Re-derive stored window ends when a route's duration changes."""
+    if created:
+        return
+
+    duration = timedelta(minutes=instance.duration_minutes + BUFFER_MINUTES)
+    bookings = Booking.objects.filter(route=instance)
+    stale_keys = set()
+
+    for start_field, end_field in (('outbound_start', 'outbound_end'), ('return_start', 'return_end')):
+        new_end = ExpressionWrapper(F(start_field) + duration, output_field=DateTimeField())
+        stale = bookings.filter(
+            **{f"{start_field}__isnull": False}
+        ).exclude(
+            **{end_field: new_end}
+        )
+
+        # The window now ends at start + duration; drop the days it covered before and after.
+        for driver_id, vehicle_id, start, end in stale.values_list('driver_id', 'vehicle_id', start_field, end_field):
+            stale_keys |= get_timeline_cache_keys(driver_id, vehicle_id, [(start, max(end, start + duration))])
+
+        stale.update(**{end_field: new_end})
+
+    invalidate_timeline_cache(stale_keys)
+
+
+@receiver(pre_save, sender=Route)
+def forget_cached_route_pk_on_save(sender, instance, raw=False, **kwargs):
+    """The route's public ID may be changing; drop the cached lookup for the old one."""
+    if raw or not instance.pk:
+        return
+
+    previous_route_id = Route.objects.filter(pk=instance.pk).values_list('route_id', flat=True).first()
+    forget_route_pk(previous_route_id)
+
+
+@receiver(post_delete, sender=Route)
+def forget_cached_route_pk_on_delete(sender, instance, **kwargs):
+    forget_route_pk(instance.route_id)
@@ -1,14 +1,52 @@
 import json
-from datetime import date, time
-from unittest.mock import patch
+import random
+import re
+import threading
+from datetime import date, datetime, time, timedelta
+from unittest.mock import PropertyMock, patch
 
-from django.test import TestCase, override_settings
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from rest_framework.test import APIClient
+from django.utils import timezone
+from djangorestframework_camel_case.util import underscoreize
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient, APIRequestFactory
 
+from account.models import UserProfile
+from fct.testing import IN_PROCESS_CACHES, QueryCountAssertions
+from notifications.models import DriverNotification, OutboundEmail
 from routes.models import Route
+from vehicle.models import Vehicle
+from .auto_assign import ResourceSchedule, solve_assignments
+from .checks import check_shared_cache
+from .bulk_import import create_bookings, parse_booking_feed, validate_booking_rows
 from .emails import send_reservation_to_passenger
-from .models import Booking, PassengerDetail, TransferInformation
+from .idempotency import REPLAYED_HEADER, request_fingerprint
+from .models import Booking, IdempotencyKey, PassengerDetail, TransferInformation
+from .normalizers import BOOKING_NESTED_FIELDS, normalize_booking_request_data, route_pk_cache_key
+from .overlap import find_resource_conflicts, iter_overlaps
+from .serializers import (
+    AssignDriverVehicleSerializer,
+    BookingCreateSerializer,
+    BookingImportSerializer,
+    BookingStatusSerializer,
+    RescheduleBookingSerializer,
+)
+from .timeline import get_resource_timeline
+from .utils import (
+    check_time_overlap,
+    get_availability_matrix,
+    get_available_drivers,
+    get_available_vehicles,
+    get_booking_time_windows,
+    get_conflicting_booking_for_driver,
+    to_epoch,
+    to_stored_datetime,
+)
 
 
 @override_settings(API_KEY="test-api-key", EMAIL_FROM="admin@example.com")
@@ -250,3 +288,1685 @@ class BookingAdminEmailTest(TestCase):
         self.assertNotIn("provide us with the exact pickup address", message)
         self.assertNotIn("feel free to let us know", message)
         self.assertIn(booking.booking_id, detail)
+
+
+def create_test_route(**overrides):
+    fields = {
+        "from_location": "Larnaca Airport",
+        "to_location": "Limassol",
+        "meta_title": "Larnaca Airport to Limassol",
+        "meta_description": "Route meta description",
+        "hero_title": "Larnaca Airport to Limassol Transfer",
+        "sub_headline": "Comfortable ride",
+        "body": "Route body",
+        "distance": "70 km",
+        "time": "50 mins",
+        "duration_minutes": 50,
+        "sedan_price": 70,
+        "van_price": 100,
+        "image": "routes/test.jpg",
+        "book_cta_label": "Book now",
+        "book_cta_support": "Support text",
+    }
+    fields.update(overrides)
+    return Route.objects.create(**fields)
+
+
+class AvailabilityEngineTest(TestCase):
+    """The indexed availability lookup must match a full scan of every booking."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.rng = random.Random(1805)
+        cls.routes = [
+            create_test_route(from_location="Larnaca", to_location="Limassol", duration_minutes=50),
+            create_test_route(from_location="Paphos", to_location="Ayia Napa", duration_minutes=1500),
+        ]
+        cls.drivers = [
+            UserProfile.objects.create_user(
+                email=f"driver{i}@example.com",
+                password="password123",
+                full_name=f"Driver {i}",
+                is_driver=True,
+            )
+            for i in range(8)
+        ]
+        cls.vehicles = [
+            Vehicle.objects.create(
+                license_plate=f"CY{i:03}",
+                make="Mercedes",
+                model="E-Class",
+                type="sedan",
+                max_passengers=3,
+            )
+            for i in range(8)
+        ]
+        cls.transfer = TransferInformation.objects.create(adults=1, luggage="Hand")
+        cls.passenger = PassengerDetail.objects.create(
+            full_name="Test Passenger",
+            phone_number="+35700000000",
+            email_address="passenger@example.com",
+        )
+
+        for _ in range(200):
+            cls._create_booking(
+                driver=cls.rng.choice(cls.drivers + [None]),
+                vehicle=cls.rng.choice(cls.vehicles + [None]),
+                booking_status=cls.rng.choice(["Pending", "Assigned", "Completed", "Cancelled"]),
+            )
+
+    @classmethod
+    def _create_booking(cls, **fields):
+        pickup_date = date(2026, 6, 1) + timedelta(days=cls.rng.randint(0, 20))
+        is_return = cls.rng.random() < 0.4
+        return_date = pickup_date + timedelta(days=cls.rng.randint(0, 5)) if is_return else None
+        booking = Booking(
+            route=cls.rng.choice(cls.routes),
+            vehicle_type="sedan",
+            payment_type="card",
+            trip_type="Return" if is_return else "One Way",
+            pickup_date=pickup_date,
+            pickup_time=time(cls.rng.randint(0, 23), cls.rng.choice([0, 30])),
+            return_date=return_date,
+            return_time=time(cls.rng.randint(0, 23), 0) if is_return else None,
+            time_period="Day Tariff",
+            transfer_information=cls.transfer,
+            passenger_information=cls.passenger,
+            **fields,
+        )
+        booking.save()
+        return booking
+
+    def _busy_ids(self, booking, resource_field, excluded_statuses):
+        new_windows = get_booking_time_windows(booking)
+        busy = set()
+        for existing in Booking.objects.exclude(pk=booking.pk).exclude(booking_status__in=excluded_statuses):
+            resource_id = getattr(existing, resource_field)
+            if resource_id is None:
+                continue
+            for new_start, new_end in new_windows:
+                for existing_start, existing_end in get_booking_time_windows(existing):
+                    if check_time_overlap(new_start, new_end, existing_start, existing_end):
+                        busy.add(resource_id)
+        return busy
+
+    def test_available_drivers_match_full_scan(self):
+        for _ in range(25):
+            target = self._create_booking()
+
+            expected = {driver.pk for driver in self.drivers} - self._busy_ids(
+                target, 'driver_id', ["Cancelled"]
+            )
+            available = get_available_drivers(target, exclude_booking_id=target.booking_id)
+
+            self.assertEqual(set(available.values_list('pk', flat=True)), expected)
+
+    def test_available_vehicles_match_full_scan(self):
+        for _ in range(25):
+            target = self._create_booking()
+
+            expected = {vehicle.pk for vehicle in self.vehicles} - self._busy_ids(
+                target, 'vehicle_id', ["Cancelled", "Completed"]
+            )
+            available = get_available_vehicles(target, exclude_booking_id=target.booking_id)
+
+            self.assertEqual(set(available.values_list('pk', flat=True)), expected)
+
+    def test_availability_matrix_matches_single_lookups(self):
+        targets = [self._create_booking() for _ in range(10)]
+        bookings = list(Booking.objects.filter(pk__in=[t.pk for t in targets]).select_related('route'))
+
+        # Drivers, vehicles, longest route and one read of overlapping bookings.
+        with self.assertNumQueries(4):
+            _, _, rows = get_availability_matrix(bookings)
+
+        for row in rows:
+            booking = row['booking']
+            self.assertEqual(
+                set(row['available_driver_ids']),
+                set(get_available_drivers(booking, booking.booking_id).values_list('pk', flat=True)),
+            )
+            self.assertEqual(
+                set(row['available_vehicle_ids']),
+                set(get_available_vehicles(booking, booking.booking_id).values_list('pk', flat=True)),
+            )
+
+    @override_settings(API_KEY="test-api-key")
+    def test_availability_matrix_endpoint_by_date_range(self):
+        admin = UserProfile.objects.create_superuser(email="admin@example.com", password="password123")
+        client = APIClient()
+        client.force_authenticate(user=admin)
+
+        response = client.get(
+            reverse("booking-availability-matrix"),
+            {"date_from": "2026-06-05", "date_to": "2026-06-06"},
+            HTTP_API_KEY="test-api-key",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        expected_ids = list(
+            Booking.objects.filter(pickup_date__range=(date(2026, 6, 5), date(2026, 6, 6)))
+            .exclude(booking_status="Cancelled")
+            .order_by('pickup_date', 'pickup_time', 'pk')
+            .values_list('booking_id', flat=True)
+        )
+        self.assertEqual([row["bookingId"] for row in payload["bookings"]], expected_ids)
+        self.assertEqual(len(payload["drivers"]), len(self.drivers))
+
+        first = Booking.objects.get(booking_id=expected_ids[0])
+        self.assertEqual(
+            set(payload["bookings"][0]["availableDriverIds"]),
+            set(get_available_drivers(first, first.booking_id).values_list('pk', flat=True)),
+        )
+
+    @override_settings(API_KEY="test-api-key")
+    def test_availability_matrix_requires_ids_or_range(self):
+        admin = UserProfile.objects.create_superuser(email="admin@example.com", password="password123")
+        client = APIClient()
+        client.force_authenticate(user=admin)
+
+        response = client.get(reverse("booking-availability-matrix"), HTTP_API_KEY="test-api-key")
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_long_route_from_previous_days_blocks_driver(self):
+        long_route = self.routes[1]
+        driver = self.drivers[0]
+        Booking.objects.all().delete()
+
+        Booking.objects.create(
+            route=long_route,
+            vehicle_type="sedan",
+            payment_type="card",
+            trip_type="One Way",
+            pickup_date=date(2026, 7, 1),
+            pickup_time=time(23, 0),
+            time_period="Night Tariff",
+            driver=driver,
+            transfer_information=self.transfer,
+            passenger_information=self.passenger,
+        )
+        target = Booking.objects.create(
+            route=self.routes[0],
+            vehicle_type="sedan",
+            payment_type="card",
+            trip_type="One Way",
+            pickup_date=date(2026, 7, 2),
+            pickup_time=time(20, 0),
+            time_period="Day Tariff",
+            transfer_information=self.transfer,
+            passenger_information=self.passenger,
+        )
+
+        available = get_available_drivers(target, exclude_booking_id=target.booking_id)
+
+        self.assertNotIn(driver, available)
+
+
+class BookingScheduleWindowTest(TestCase):
+    """The stored window columns must always mirror get_booking_time_windows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.route = create_test_route(duration_minutes=60)
+        cls.transfer = TransferInformation.objects.create(adults=1, luggage="Hand")
+        cls.passenger = PassengerDetail.objects.create(
+            full_name="Test Passenger",
+            phone_number="+35700000000",
+            email_address="passenger@example.com",
+        )
+
+    def _create_booking(self, **fields):
+        values = {
+            "route": self.route,
+            "vehicle_type": "sedan",
+            "payment_type": "card",
+            "trip_type": "Return",
+            "pickup_date": date(2026, 6, 1),
+            "pickup_time": time(10, 0),
+            "return_date": date(2026, 6, 3),
+            "return_time": time(18, 0),
+            "time_period": "Day Tariff",
+            "transfer_information": self.transfer,
+            "passenger_information": self.passenger,
+        }
+        values.update(fields)
+        return Booking.objects.create(**values)
+
+    def assertWindowsStored(self, booking):
+        booking.refresh_from_db()
+        expected = [
+            (to_stored_datetime(start), to_stored_datetime(end))
+            for start, end in get_booking_time_windows(booking)
+        ]
+        stored = [(booking.outbound_start, booking.outbound_end)]
+        if booking.return_start:
+            stored.append((booking.return_start, booking.return_end))
+        self.assertEqual(stored, expected)
+
+    def test_windows_stored_on_create(self):
+        booking = self._create_booking()
+
+        self.assertWindowsStored(booking)
+        self.assertEqual(booking.outbound_start, to_stored_datetime(datetime(2026, 6, 1, 10, 0)))
+        self.assertEqual(booking.outbound_end, to_stored_datetime(datetime(2026, 6, 1, 11, 30)))
+
+    def test_windows_follow_partial_reschedule_save(self):
+        booking = self._create_booking()
+
+        booking.pickup_time = time(14, 0)
+        booking.return_date = date(2026, 6, 5)
+        booking.save(update_fields=['pickup_time', 'return_date'])
+
+        self.assertWindowsStored(booking)
+
+    def test_windows_follow_route_duration_change(self):
+        booking = self._create_booking()
+
+        self.route.duration_minutes = 120
+        self.route.save()
+
+        self.assertWindowsStored(booking)
+        self.assertEqual(booking.return_end, to_stored_datetime(datetime(2026, 6, 3, 20, 30)))
+
+    def test_one_way_booking_has_no_return_window(self):
+        booking = self._create_booking(trip_type="One Way", return_date=None, return_time=None)
+
+        booking.refresh_from_db()
+        self.assertIsNone(booking.return_start)
+        self.assertIsNone(booking.return_end)
+
+    def test_conflicting_booking_found_via_return_window(self):
+        driver = UserProfile.objects.create(email="driver@example.com", full_name="Driver", is_driver=True)
+        existing = self._create_booking(driver=driver, booking_status="Assigned")
+        candidate = self._create_booking(
+            trip_type="One Way",
+            pickup_date=date(2026, 6, 3),
+            pickup_time=time(19, 0),
+            return_date=None,
+            return_time=None,
+        )
+
+        conflict = get_conflicting_booking_for_driver(driver, candidate, exclude_booking_id=candidate.booking_id)
+        self.assertEqual(conflict, existing)
+
+        candidate.pickup_time = time(19, 30)
+        conflict = get_conflicting_booking_for_driver(driver, candidate, exclude_booking_id=candidate.booking_id)
+        self.assertIsNone(conflict)
+
+
+class AutoAssignTest(TestCase):
+    """Auto-assignment must respect vehicle type, capacity and existing commitments."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.route = create_test_route(duration_minutes=60)
+        cls.drivers = [
+            UserProfile.objects.create_user(
+                email=f"driver{i}@example.com",
+                password="password123",
+                full_name=f"Driver {i}",
+                is_driver=True,
+            )
+            for i in range(2)
+        ]
+        cls.sedan = Vehicle.objects.create(
+            license_plate="CY001", make="Mercedes", model="E-Class", type="sedan", max_passengers=3
+        )
+        cls.van = Vehicle.objects.create(
+            license_plate="CY002", make="Mercedes", model="Vito", type="van", max_passengers=8
+        )
+        cls.passenger = PassengerDetail.objects.create(
+            full_name="Test Passenger",
+            phone_number="+35700000000",
+            email_address="passenger@example.com",
+        )
+        cls.admin = UserProfile.objects.create_superuser(email="admin@example.com", password="password123")
+
+    def _create_booking(self, pickup_time, vehicle_type="sedan", adults=1, **fields):
+        return Booking.objects.create(
+            route=self.route,
+            vehicle_type=vehicle_type,
+            payment_type="card",
+            trip_type="One Way",
+            pickup_date=date(2026, 6, 1),
+            pickup_time=pickup_time,
+            time_period="Day Tariff",
+            transfer_information=TransferInformation.objects.create(adults=adults, luggage="Hand"),
+            passenger_information=self.passenger,
+            **fields,
+        )
+
+    def _post(self, **data):
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+        with override_settings(API_KEY="test-api-key"):
+            return client.post(
+                reverse("booking-auto-assign"),
+                {"date_from": "2026-06-01", **data},
+                format="json",
+                HTTP_API_KEY="test-api-key",
+            )
+
+    def test_solver_respects_capacity_and_overlaps(self):
+        drivers = {driver_id: ResourceSchedule(3600) for driver_id in (1, 2, 3)}
+        vehicles = [
+            (10, "Sedan", 3, ResourceSchedule(3600)),
+            (11, "sedan", 4, ResourceSchedule(3600)),
+            (20, "van", 8, ResourceSchedule(3600)),
+        ]
+        jobs = [
+            {'key': 'a', 'windows': [(0, 3600)], 'vehicle_type': 'sedan', 'passengers': 2},
+            {'key': 'b', 'windows': [(1800, 5400)], 'vehicle_type': 'sedan', 'passengers': 2},
+            {'key': 'c', 'windows': [(1800, 5400)], 'vehicle_type': 'sedan', 'passengers': 4},
+            {'key': 'd', 'windows': [(3600, 7200)], 'vehicle_type': 'van', 'passengers': 9},
+            {'key': 'e', 'windows': [(3600, 7200)], 'vehicle_type': 'sedan', 'passengers': 3},
+        ]
+
+        assignments, unassigned = solve_assignments(jobs, drivers, vehicles)
+
+        # The smallest sedan goes first, the 4-seater covers the overlap.
+        self.assertEqual(assignments['a'][1], 10)
+        self.assertEqual(assignments['b'][1], 11)
+        self.assertIn('c', unassigned)
+        self.assertIn('d', unassigned)
+        # 'a' ends exactly when 'e' starts, so its driver and sedan are reused.
+        self.assertEqual(assignments['e'], assignments['a'])
+        self.assertNotEqual(assignments['a'][0], assignments['b'][0])
+
+    def test_solver_never_double_books(self):
+        rng = random.Random(7)
+        drivers = {driver_id: ResourceSchedule(7200) for driver_id in range(15)}
+        vehicles = [
+            (vehicle_id, rng.choice(["sedan", "van"]), rng.choice([3, 4, 8]), ResourceSchedule(7200))
+            for vehicle_id in range(15)
+        ]
+        capacities = {vehicle_id: (vehicle_type, capacity) for vehicle_id, vehicle_type, capacity, _ in vehicles}
+        # Some resources already have commitments later in the day.
+        for driver_id in range(0, 15, 3):
+            drivers[driver_id].add(40000, 45000)
+        jobs = []
+        for key in range(300):
+            start = rng.randrange(0, 80000, 900)
+            windows = [(start, start + rng.choice([1800, 3600, 7200]))]
+            if rng.random() < 0.3:
+                return_start = windows[0][1] + rng.randrange(0, 20000, 900)
+                windows.append((return_start, return_start + 3600))
+            jobs.append({
+                'key': key,
+                'windows': windows,
+                'vehicle_type': rng.choice(["sedan", "van"]),
+                'passengers': rng.randint(1, 8),
+            })
+
+        assignments, unassigned = solve_assignments(jobs, drivers, vehicles)
+
+        self.assertEqual(len(assignments) + len(unassigned), len(jobs))
+        self.assertGreater(len(assignments), 100)
+        busy = {'driver': {driver_id: [(40000, 45000)] for driver_id in range(0, 15, 3)}, 'vehicle': {}}
+        for job in jobs:
+            if job['key'] not in assignments:
+                continue
+            driver_id, vehicle_id = assignments[job['key']]
+            vehicle_type, capacity = capacities[vehicle_id]
+            self.assertEqual(vehicle_type, job['vehicle_type'])
+            self.assertGreaterEqual(capacity, job['passengers'])
+            for kind, resource_id in (('driver', driver_id), ('vehicle', vehicle_id)):
+                intervals = busy[kind].setdefault(resource_id, [])
+                for start, end in job['windows']:
+                    for other_start, other_end in intervals:
+                        self.assertFalse(check_time_overlap(start, end, other_start, other_end))
+                intervals.extend(job['windows'])
+
+    def test_auto_assign_writes_back_plan(self):
+        # The only sedan and the first driver are already out on a 09:30 booking.
+        self._create_booking(time(9, 30), booking_status="Assigned", driver=self.drivers[0], vehicle=self.sedan)
+        sedan_booking = self._create_booking(time(10, 0))
+        van_booking = self._create_booking(time(10, 0), vehicle_type="van", adults=6)
+        too_big = self._create_booking(time(12, 0), adults=5)
+
+        response = self._post()
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(
+            payload["assigned"],
+            [{"bookingId": van_booking.booking_id, "driverId": self.drivers[1].pk, "vehicleId": self.van.pk}],
+        )
+        self.assertEqual(
+            {row["bookingId"]: row["reason"] for row in payload["unassigned"]},
+            {
+                sedan_booking.booking_id: "No matching vehicle is free for this time slot.",
+                too_big.booking_id: "No vehicle matches the requested type and passenger count.",
+            },
+        )
+
+        van_booking.refresh_from_db()
+        self.assertEqual(van_booking.booking_status, "Assigned")
+        self.assertEqual((van_booking.driver, van_booking.vehicle), (self.drivers[1], self.van))
+        self.assertTrue(DriverNotification.objects.filter(driver=self.drivers[1], booking=van_booking).exists())
+        sedan_booking.refresh_from_db()
+        self.assertEqual(sedan_booking.booking_status, "Pending")
+
+    def test_dry_run_leaves_bookings_pending(self):
+        booking = self._create_booking(time(10, 0))
+
+        response = self._post(dry_run=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["assigned"]), 1)
+        booking.refresh_from_db()
+        self.assertEqual(booking.booking_status, "Pending")
+        self.assertIsNone(booking.driver)
+
+
+class ConcurrentAssignmentTest(TransactionTestCase):
+    """Assignments that passed validation concurrently must not double-book a driver."""
+
+    def setUp(self):
+        self.route = create_test_route(duration_minutes=60)
+        self.driver = UserProfile.objects.create_user(
+            email="driver@example.com", password="password123", full_name="Driver", is_driver=True
+        )
+        self.vehicles = [
+            Vehicle.objects.create(
+                license_plate=f"CY{i:03}", make="Mercedes", model="E-Class", type="sedan", max_passengers=3
+            )
+            for i in range(8)
+        ]
+        self.transfer = TransferInformation.objects.create(adults=1, luggage="Hand")
+        self.passenger = PassengerDetail.objects.create(
+            full_name="Test Passenger",
+            phone_number="+35700000000",
+            email_address="passenger@example.com",
+        )
+        self.admin = UserProfile.objects.create_superuser(email="admin@example.com", password="password123")
+        # Eight bookings that all overlap 10:00-11:30 on the same day.
+        self.bookings = [
+            Booking.objects.create(
+                route=self.route,
+                vehicle_type="sedan",
+                payment_type="card",
+                trip_type="One Way",
+                pickup_date=date(2026, 6, 1),
+                pickup_time=time(10, minute),
+                time_period="Day Tariff",
+                transfer_information=self.transfer,
+                passenger_information=self.passenger,
+            )
+            for minute in range(0, 40, 5)
+        ]
+
+    def test_recheck_rejects_assignment_validated_against_stale_data(self):
+        first = AssignDriverVehicleSerializer(
+            instance=self.bookings[0], data={"driver_id": self.driver.pk, "vehicle_id": self.vehicles[0].pk}
+        )
+        second = AssignDriverVehicleSerializer(
+            instance=self.bookings[1], data={"driver_id": self.driver.pk, "vehicle_id": self.vehicles[1].pk}
+        )
+        # Both pass validation before either one is saved.
+        self.assertTrue(first.is_valid())
+        self.assertTrue(second.is_valid())
+
+        first.save()
+        with self.assertRaises(ValidationError) as raised:
+            second.save()
+
+        self.assertIn("driver_id", raised.exception.detail)
+        self.assertEqual(list(Booking.objects.filter(driver=self.driver)), [self.bookings[0]])
+        self.assertEqual(Booking.objects.get(pk=self.bookings[0].pk).booking_status, "Assigned")
+        self.bookings[1].refresh_from_db()
+        self.assertEqual(self.bookings[1].booking_status, "Pending")
+
+    def test_recheck_rejects_reschedule_into_new_assignment(self):
+        moved = self.bookings[0]
+        moved.pickup_time = time(15, 0)
+        moved.driver = self.driver
+        moved.save()
+
+        reschedule = RescheduleBookingSerializer(instance=moved, data={"pickup_time": "10:30"}, partial=True)
+        self.assertTrue(reschedule.is_valid())
+
+        assign = AssignDriverVehicleSerializer(
+            instance=self.bookings[1], data={"driver_id": self.driver.pk, "vehicle_id": self.vehicles[1].pk}
+        )
+        self.assertTrue(assign.is_valid())
+        assign.save()
+
+        with self.assertRaises(ValidationError):
+            reschedule.save()
+        moved.refresh_from_db()
+        self.assertEqual(moved.pickup_time, time(15, 0))
+
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_parallel_assignments_book_driver_once(self):
+        barrier = threading.Barrier(len(self.bookings))
+        status_codes = []
+
+        def assign(booking, vehicle):
+            client = APIClient()
+            client.force_authenticate(user=self.admin)
+            try:
+                barrier.wait()
+                response = client.patch(
+                    reverse("booking-assign", kwargs={"booking_id": booking.booking_id}),
+                    {"driver_id": self.driver.pk, "vehicle_id": vehicle.pk},
+                    format="json",
+                    HTTP_API_KEY="test-api-key",
+                )
+                status_codes.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=assign, args=(booking, vehicle))
+            for booking, vehicle in zip(self.bookings, self.vehicles)
+        ]
+        with override_settings(API_KEY="test-api-key"):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(sorted(status_codes), [200] + [400] * (len(self.bookings) - 1))
+        self.assertEqual(Booking.objects.filter(driver=self.driver).count(), 1)
+
+
+class SharedCacheCheckTest(SimpleTestCase):
+    def test_process_local_cache_is_an_error(self):
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ['booking.E001'])
+
+    def test_shared_caches_pass(self):
+        for backend in ('django.core.cache.backends.db.DatabaseCache', 'django.core.cache.backends.redis.RedisCache'):
+            with self.subTest(backend=backend), override_settings(CACHES={'default': {'BACKEND': backend}}):
+                self.assertEqual(check_shared_cache(None), [])
+
+
+@override_settings(API_KEY="test-api-key", CACHES=IN_PROCESS_CACHES)
+class ResourceTimelineTest(TestCase):
+    """Timelines are bucketed per day, served from cache and dropped when bookings change."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.route = create_test_route(duration_minutes=60)
+        cls.drivers = [
+            UserProfile.objects.create_user(
+                email=f"driver{i}@example.com", password="password123", full_name=f"Driver {i}", is_driver=True
+            )
+            for i in range(2)
+        ]
+        cls.vehicle = Vehicle.objects.create(
+            license_plate="CY001", make="Mercedes", model="E-Class", type="sedan", max_passengers=3
+        )
+        cls.admin = UserProfile.objects.create_superuser(email="admin@example.com", password="password123")
+        cls.transfer = TransferInformation.objects.create(adults=1, luggage="Hand")
+        cls.passenger = PassengerDetail.objects.create(
+            full_name="Test Passenger",
+            phone_number="+35700000000",
+            email_address="passenger@example.com",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+        # A late return trip whose outbound leg runs past midnight.
+        self.booking = Booking.objects.create(
+            route=self.route,
+            vehicle_type="sedan",
+            payment_type="card",
+            trip_type="Return",
+            pickup_date=date(2026, 6, 1),
+            pickup_time=time(23, 30),
+            return_date=date(2026, 6, 3),
+            return_time=time(9, 0),
+            time_period="Night Tariff",
+            driver=self.drivers[0],
+            vehicle=self.vehicle,
+            transfer_information=self.transfer,
+            passenger_information=self.passenger,
+        )
+
+    def _timeline(self, resource_id=None, resource="driver"):
+        return get_resource_timeline(
+            resource, resource_id or self.drivers[0].pk, date(2026, 6, 1), date(2026, 6, 3)
+        )
+
+    def _booking_ids(self, timeline):
+        return [[interval['booking_id'] for interval in day['intervals']] for day in timeline]
+
+    def test_intervals_are_bucketed_per_day(self):
+        response = self.client.get(
+            reverse("driver-timeline", kwargs={"pk": self.drivers[0].pk}),
+            {"date_from": "2026-06-01", "date_to": "2026-06-03"},
+            HTTP_API_KEY="test-api-key",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        days = response.json()["days"]
+        self.assertEqual([day["date"] for day in days], ["2026-06-01", "2026-06-02", "2026-06-03"])
+        self.assertEqual([len(day["intervals"]) for day in days], [1, 1, 1])
+        self.assertEqual(days[0]["intervals"], days[1]["intervals"])
+        self.assertEqual(days[0]["intervals"][0]["leg"], "outbound")
+        self.assertEqual(days[2]["intervals"][0]["leg"], "return")
+        self.assertEqual(self._booking_ids(self._timeline(self.vehicle.pk, "vehicle"))[2], [self.booking.booking_id])
+
+    def test_warm_timeline_needs_no_queries(self):
+        cold = self._timeline()
+
+        with self.assertNumQueries(0):
+            warm = self._timeline()
+
+        self.assertEqual(warm, cold)
+
+    def test_reassignment_invalidates_both_drivers(self):
+        self._timeline()
+        self._timeline(self.drivers[1].pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.booking.driver = self.drivers[1]
+            self.booking.return_date = date(2026, 6, 2)
+            self.booking.save()
+
+        self.assertEqual(self._booking_ids(self._timeline()), [[], [], []])
+        self.assertEqual(
+            self._booking_ids(self._timeline(self.drivers[1].pk)),
+            [[self.booking.booking_id], [self.booking.booking_id] * 2, []],
+        )
+
+    def test_status_update_and_delete_invalidate(self):
+        self._timeline()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            serializer = BookingStatusSerializer(instance=self.booking, data={"booking_status": "Cancelled"})
+            self.assertTrue(serializer.is_valid())
+            serializer.save()
+        self.assertEqual(self._booking_ids(self._timeline()), [[], [], []])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.filter(pk=self.booking.pk).update(booking_status="Assigned")
+            self.booking.refresh_from_db()
+            self.booking.save()
+        self.assertEqual(len(self._timeline()[2]['intervals']), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.booking.delete()
+        self.assertEqual(self._booking_ids(self._timeline()), [[], [], []])
+
+    def test_driver_cannot_read_another_drivers_timeline(self):
+        client = APIClient()
+        client.force_authenticate(user=self.drivers[1])
+        url_params = {"date_from": "2026-06-01"}
+
+        own = client.get(
+            reverse("driver-timeline", kwargs={"pk": self.drivers[1].pk}), url_params, HTTP_API_KEY="test-api-key"
+        )
+        other = client.get(
+            reverse("driver-timeline", kwargs={"pk": self.drivers[0].pk}), url_params, HTTP_API_KEY="test-api-key"
+        )
+
+        self.assertEqual(own.status_code, 200)
+        self.assertEqual(other.status_code, 404)
+
+
+class OverlapKernelTest(SimpleTestCase):
+    """The sweep kernel must find exactly the pairs check_time_overlap finds."""
+
+    def test_matches_pairwise_check(self):
+        rng = random.Random(42)
+        for _ in range(20):
+            # Coarse grid so equal starts, touching ends and empty intervals all occur.
+            windows = [(start, start + rng.randrange(0, 6), key) for key, start in
+                       enumerate(rng.randrange(0, 40) for _ in range(rng.randint(0, 30)))]
+            intervals = [(start, start + rng.randrange(0, 6), f"r{key}") for key, start in
+                         enumerate(rng.randrange(0, 40) for _ in range(rng.randint(0, 30)))]
+
+            expected = sorted(
+                (window_key, interval_key)
+                for window_start, window_end, window_key in windows
+                for interval_start, interval_end, interval_key in intervals
+                if window_start < window_end and interval_start < interval_end
+                and check_time_overlap(window_start, window_end, interval_start, interval_end)
+            )
+
+            self.assertEqual(sorted(iter_overlaps(windows, intervals)), expected)
+
+    def test_find_resource_conflicts_groups_by_window(self):
+        conflicts = find_resource_conflicts(
+            [(0, 10, "a"), (10, 20, "b"), (30, 40, "c")],
+            [(5, 15, 1), (8, 9, 2), (9, 12, 1), (20, 30, 3)],
+        )
+
+        self.assertEqual(conflicts, {"a": {1, 2}, "b": {1}})
+
+    def test_to_epoch_treats_naive_windows_as_utc(self):
+        naive = datetime(2026, 6, 1, 10, 30)
+
+        self.assertEqual(to_epoch(naive), int(to_stored_datetime(naive).timestamp()))
+        self.assertEqual(to_epoch(to_stored_datetime(naive)), to_epoch(naive))
+
+
+class BookingQueryPlanTest(TestCase):
+    """Hot lookups must be served by the identifier and schedule indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.route = create_test_route()
+        cls.driver = UserProfile.objects.create_user(
+            email="driver@example.com", password="password123", full_name="Driver", is_driver=True
+        )
+        cls.vehicle = Vehicle.objects.create(
+            license_plate="CY001", make="Mercedes", model="E-Class", type="sedan", max_passengers=3
+        )
+        transfer = TransferInformation.objects.create(adults=1, luggage="Hand")
+        passenger = PassengerDetail.objects.create(
+            full_name="Test Passenger",
+            phone_number="+35700000000",
+            email_address="passenger@example.com",
+        )
+        # Enough rows that a full scan is never the cheaper plan.
+        Booking.objects.bulk_create(
+            Booking(
+                booking_id=f"FCTplan{i}",
+                route=cls.route,
+                vehicle_type="sedan",
+                payment_type="card",
+                trip_type="One Way",
+                booking_status=["Pending", "Assigned", "Completed", "Cancelled"][i % 4],
+                pickup_date=date(2026, 1, 1) + timedelta(days=i % 365),
+                pickup_time=time(10, 0),
+                time_period="Day Tariff",
+                driver=cls.driver if i % 2 else None,
+                vehicle=cls.vehicle if i % 3 else None,
+                transfer_information=transfer,
+                passenger_information=passenger,
+            )
+            for i in range(500)
+        )
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        names = [index_name]
+        if connection.vendor == 'sqlite':
+            # SQLite builds unique constraints into the table as sqlite_autoindex_<table>_N.
+            names.append(f"sqlite_autoindex_{queryset.model._meta.db_table}_")
+        self.assertTrue(any(name in plan for name in names), f"{index_name} not used by plan:\n{plan}")
+
+    def test_identifier_lookups_use_unique_indexes(self):
+        self.assertUsesIndex(Booking.objects.filter(booking_id="FCTplan42"), "booking_booking_id_uniq")
+        self.assertUsesIndex(Route.objects.filter(route_id=self.route.route_id), "route_route_id_uniq")
+
+    def test_schedule_filters_use_composite_indexes(self):
+        since = date(2026, 6, 1)
+
+        self.assertUsesIndex(
+            Booking.objects.filter(driver=self.driver, booking_status="Assigned", pickup_date__gte=since),
+            "booking_driver_sched_idx",
+        )
+        self.assertUsesIndex(
+            Booking.objects.filter(vehicle=self.vehicle, booking_status="Assigned", pickup_date__gte=since),
+            "booking_vehicle_sched_idx",
+        )
+        self.assertUsesIndex(
+            Booking.objects.filter(pickup_date__range=(since, date(2026, 6, 7)), booking_status="Pending"),
+            "booking_date_status_idx",
+        )
+
+    def test_generated_identifiers_stay_unique(self):
+        first = Booking.objects.get(booking_id="FCTplan0")
+        first.pk = None
+        first.booking_id = ""
+        first.save()
+        second = Booking.objects.get(booking_id="FCTplan1")
+        second.pk = None
+        second.booking_id = None
+        second.save()
+
+        self.assertTrue(first.booking_id.startswith("FCT"))
+        self.assertNotEqual(first.booking_id, second.booking_id)
+        self.assertTrue(create_test_route(from_location="Paphos", to_location="Limassol").route_id.startswith("fct"))
+
+
+class PublicIdTest(TestCase):
+    """Public IDs are generated before the INSERT and retried on collision."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.route = create_test_route()
+        cls.transfer = TransferInformation.objects.create(adults=1, luggage="Hand")
+        cls.passenger = PassengerDetail.objects.create(
+            full_name="Test Passenger",
+            phone_number="+35700000000",
+            email_address="passenger@example.com",
+        )
+
+    def _create_booking(self, **fields):
+        return Booking.objects.create(
+            route=self.route,
+            vehicle_type="sedan",
+            payment_type="card",
+            trip_type="One Way",
+            pickup_date=date(2026, 6, 1),
+            pickup_time=time(10, 0),
+            time_period="Day Tariff",
+            transfer_information=self.transfer,
+            passenger_information=self.passenger,
+            **fields,
+        )
+
+    def _writes(self, queries, table):
+        return [
+            query['sql'].split()[0].upper() for query in queries
+            if table in query['sql'] and query['sql'].lstrip().upper().startswith(('INSERT', 'UPDATE'))
+        ]
+
+    def test_create_is_a_single_insert(self):
+        with CaptureQueriesContext(connection) as booking_queries:
+            booking = self._create_booking()
+        with CaptureQueriesContext(connection) as route_queries:
+            route = create_test_route(from_location="Paphos", to_location="Limassol")
+
+        self.assertEqual(self._writes(booking_queries.captured_queries, Booking._meta.db_table), ["INSERT"])
+        self.assertEqual(self._writes(route_queries.captured_queries, Route._meta.db_table), ["INSERT"])
+        self.assertRegex(booking.booking_id, r"^FCT[a-z0-9]{10}$")
+        self.assertRegex(route.route_id, r"^fct[a-z0-9]{10}$")
+
+    def test_collision_retries_with_fresh_id(self):
+        self._create_booking(booking_id="FCTtaken")
+
+        with patch("fct.utils.generate_public_id", side_effect=["FCTtaken", "FCTfresh"]):
+            booking = self._create_booking()
+
+        self.assertEqual(booking.booking_id, "FCTfresh")
+        self.assertEqual(Booking.objects.filter(booking_id="FCTtaken").count(), 1)
+
+    def test_legacy_ids_are_kept(self):
+        booking = self._create_booking(booking_id="FCTab3d912")
+
+        booking.pickup_time = time(11, 0)
+        booking.save()
+
+        self.assertEqual(Booking.objects.get(pk=booking.pk).booking_id, "FCTab3d912")
+
+
+class BookingImportTest(TestCase):
+    """Feeds are validated in bulk and imported all-or-nothing."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.route = create_test_route()
+        cls.admin = UserProfile.objects.create_superuser(email="admin@example.com", password="password123")
+
+    def _row(self, **overrides):
+        row = {
+            "route": self.route.route_id,
+            "amount_paid": 10.004,
+            "outstanding_amount": 60,
+            "total_amount": 70,
+            "vehicle_type": "sedan",
+            "payment_type": "card",
+            "trip_type": "One Way",
+            "pickup_date": "2026-06-01",
+            "pickup_time": "10:00",
+            "time_period": "Day Tariff",
+            "adults": 2,
+            "luggage": "Hand",
+            "full_name": "Feed Passenger",
+            "phone_number": "+35700000000",
+            "email_address": "feed@example.com",
+        }
+        row.update(overrides)
+        return row
+
+    def _post(self, data, path=""):
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+        with override_settings(API_KEY="test-api-key"):
+            return client.post(
+                reverse("booking-import") + path,
+                data,
+                format="json",
+                HTTP_API_KEY="test-api-key",
+            )
+
+    def test_import_is_batched(self):
+        rows = [self._row(transaction_id=f"TX{i}", pickup_time=f"10:{i:02d}") for i in range(20)]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self._post({"bookings": rows})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["created"], 20)
+        self.assertEqual(Booking.objects.count(), 20)
+        # Route lookup, duplicate check, ID check and one INSERT per table, not per row.
+        self.assertLess(len(queries), 15)
+
+        booking = Booking.objects.select_related("transfer_information", "passenger_information").get(
+            transaction_id="TX3"
+        )
+        self.assertRegex(booking.booking_id, r"^FCT[a-z0-9]{10}$")
+        self.assertEqual(booking.amount_paid, 10.01)
+        self.assertEqual(booking.outbound_start, to_stored_datetime(datetime(2026, 6, 1, 10, 3)))
+        self.assertEqual(booking.transfer_information.adults, 2)
+        self.assertEqual(booking.passenger_information.full_name, "Feed Passenger")
+
+    def test_import_without_returning_bulk_inserts(self):
+        # MySQL can't return pks from a bulk INSERT; the details are found again by import_key.
+        rows = [
+            self._row(transaction_id=f"TX{i}", adults=i + 1, full_name=f"Passenger {i}", pickup_time=f"10:{i:02d}")
+            for i in range(20)
+        ]
+        validated_rows, errors = validate_booking_rows(rows)
+        self.assertEqual(errors, [])
+
+        features = type(connection.features)
+        with patch.object(features, "can_return_rows_from_bulk_insert", new_callable=PropertyMock, return_value=False):
+            with CaptureQueriesContext(connection) as queries:
+                create_bookings(validated_rows)
+
+        detail_inserts = [
+            query["sql"] for query in queries.captured_queries
+            if query["sql"].startswith(('INSERT INTO "booking_transferinformation"', 'INSERT INTO "booking_passengerdetail"'))
+        ]
+        self.assertEqual(len(detail_inserts), 2)
+        self.assertLess(len(queries), 15)
+        for i in range(20):
+            booking = Booking.objects.select_related("transfer_information", "passenger_information").get(
+                transaction_id=f"TX{i}"
+            )
+            self.assertEqual(booking.transfer_information.adults, i + 1)
+            self.assertEqual(booking.passenger_information.full_name, f"Passenger {i}")
+
+    def test_invalid_rows_import_nothing(self):
+        Booking.objects.create(
+            route=self.route,
+            vehicle_type="sedan",
+            payment_type="card",
+            trip_type="One Way",
+            pickup_date=date(2026, 6, 1),
+            pickup_time=time(9, 0),
+            time_period="Day Tariff",
+            transaction_id="TX-OLD",
+            transfer_information=TransferInformation.objects.create(adults=1, luggage="Hand"),
+            passenger_information=PassengerDetail.objects.create(
+                full_name="Old", phone_number="+35700000000", email_address="old@example.com"
+            ),
+        )
+        rows = [
+            self._row(transaction_id="TX1"),
+            self._row(route="fctmissing"),
+            self._row(transaction_id="TX1"),
+            self._row(transaction_id="TX-OLD"),
+        ]
+
+        response = self._post(rows)
+
+        self.assertEqual(response.status_code, 400)
+        errors = {error["row"]: error["errors"] for error in response.json()["details"]["rows"]}
+        self.assertEqual(set(errors), {2, 3, 4})
+        self.assertIn("route", errors[2])
+        self.assertIn("transactionId", errors[3])
+        self.assertIn("transactionId", errors[4])
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(TransferInformation.objects.count(), 1)
+
+    def test_assigned_rows_are_checked_for_conflicts_in_bulk(self):
+        driver, other_driver = (
+            UserProfile.objects.create_user(
+                email=f"driver{i}@example.com", password="password123", full_name=f"Driver {i}", is_driver=True
+            )
+            for i in range(2)
+        )
+        vehicle, other_vehicle = (
+            Vehicle.objects.create(
+                license_plate=f"CY00{i}", make="Mercedes", model="E-Class", type="sedan", max_passengers=3
+            )
+            for i in range(2)
+        )
+        existing = Booking.objects.create(
+            route=self.route,
+            vehicle_type="sedan",
+            payment_type="card",
+            trip_type="One Way",
+            pickup_date=date(2026, 6, 1),
+            pickup_time=time(10, 0),
+            time_period="Day Tariff",
+            driver=driver,
+            vehicle=vehicle,
+            transfer_information=TransferInformation.objects.create(adults=1, luggage="Hand"),
+            passenger_information=PassengerDetail.objects.create(
+                full_name="Old", phone_number="+35700000000", email_address="old@example.com"
+            ),
+        )
+        rows = [
+            self._row(pickup_time="10:30", driver=driver.pk, vehicle=other_vehicle.pk),
+            self._row(pickup_time="14:00", driver=other_driver.pk, vehicle=other_vehicle.pk),
+            self._row(pickup_time="14:15", driver=other_driver.pk, vehicle=vehicle.pk),
+            self._row(pickup_time="18:00", driver=other_driver.pk),
+            self._row(pickup_time="20:00", driver=driver.pk, vehicle=vehicle.pk),
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            validated_rows, errors = validate_booking_rows(rows)
+
+        # Routes, drivers, vehicles, the longest route and the bookings the whole feed overlaps.
+        self.assertEqual(len(queries), 5)
+        errors = {error["row"]: error["errors"] for error in errors}
+        self.assertEqual(set(errors), {1, 2, 3, 4})
+        self.assertEqual(
+            errors[1]["driver"],
+            [f"Driver 'Driver 0' is unavailable. Already assigned to booking #{existing.booking_id}."],
+        )
+        self.assertNotIn("vehicle", errors[1])
+        self.assertEqual(errors[2]["driver"], ["Driver 'Driver 1' is unavailable. Already assigned to row 3 of this feed."])
+        self.assertEqual(errors[3]["driver"], ["Driver 'Driver 1' is unavailable. Already assigned to row 2 of this feed."])
+        self.assertNotIn("vehicle", errors[2])
+        self.assertIn("non_field_errors", errors[4])
+        self.assertEqual(len(validated_rows), 1)
+
+    def test_assigned_rows_are_imported_as_assigned(self):
+        driver = UserProfile.objects.create_user(
+            email="driver@example.com", password="password123", full_name="Driver", is_driver=True
+        )
+        vehicle = Vehicle.objects.create(
+            license_plate="CY001", make="Mercedes", model="E-Class", type="sedan", max_passengers=3
+        )
+
+        response = self._post([self._row(driver=driver.pk, vehicle=vehicle.pk), self._row(driver=9999, vehicle=vehicle.pk)])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["details"]["rows"][0]["row"], 2)
+        self.assertIn("driver", response.json()["details"]["rows"][0]["errors"])
+
+        response = self._post([self._row(driver=driver.pk, vehicle=vehicle.pk)])
+
+        self.assertEqual(response.status_code, 201)
+        booking = Booking.objects.get()
+        self.assertEqual((booking.driver, booking.vehicle, booking.booking_status), (driver, vehicle, "Assigned"))
+
+    def test_import_serializer_saves_in_bulk(self):
+        serializer = BookingImportSerializer(
+            data=[
+                normalize_booking_request_data(self._row(transaction_id=transaction_id), resolve_route=False)
+                for transaction_id in ("TX1", "TX2")
+            ],
+            many=True,
+            context={"routes": {self.route.route_id: self.route}},
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        bookings = serializer.save()
+
+        self.assertEqual({booking.transaction_id for booking in bookings}, {"TX1", "TX2"})
+        self.assertEqual(Booking.objects.count(), 2)
+
+    def test_dry_run_only_validates(self):
+        response = self._post([self._row()], path="?dry_run=true")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"dryRun": True, "valid": 1})
+        self.assertFalse(Booking.objects.exists())
+
+    def test_csv_feed(self):
+        header = ["route", "amount_paid", "outstanding_amount", "total_amount", "vehicle_type", "payment_type",
+                  "trip_type", "pickup_date", "pickup_time", "time_period", "return_date", "return_time",
+                  "transfer_information.adults", "luggage", "full_name", "phone_number", "email_address"]
+        line = [str(self.route.pk), "0", "70", "70", "sedan", "card", "One Way", "2026-06-01", "10:00",
+                "Day Tariff", "", "", "3", "Hand", "CSV Passenger", "+35700000000", "csv@example.com"]
+        content = ",".join(header) + "\n" + ",".join(line) + "\n"
+
+        validated_rows, errors = validate_booking_rows(parse_booking_feed(content, "csv"))
+        self.assertEqual(errors, [])
+        create_bookings(validated_rows)
+
+        booking = Booking.objects.get()
+        self.assertEqual(booking.route, self.route)
+        self.assertIsNone(booking.return_date)
+        self.assertEqual(booking.transfer_information.adults, 3)
+
+    def test_create_rolls_back_details_on_failure(self):
+        serializer = BookingCreateSerializer(data={
+            "route": self.route.pk,
+            "amount_paid": 0,
+            "outstanding_amount": 70,
+            "total_amount": 70,
+            "vehicle_type": "sedan",
+            "payment_type": "card",
+            "trip_type": "One Way",
+            "pickup_date": "2026-06-01",
+            "pickup_time": "10:00",
+            "time_period": "Day Tariff",
+            "transfer_information": {"adults": 1, "luggage": "Hand"},
+            "passenger_information": {
+                "full_name": "Test Passenger",
+                "phone_number": "+35700000000",
+                "email_address": "passenger@example.com",
+            },
+        })
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        with patch.object(Booking, "save", side_effect=IntegrityError("boom")):
+            with self.assertRaises(IntegrityError):
+                serializer.save()
+
+        self.assertFalse(TransferInformation.objects.exists())
+        self.assertFalse(PassengerDetail.objects.exists())
+
+
+def booking_request(route, **overrides):
+    data = {
+        "route": route.route_id,
+        "amount_paid": 50,
+        "outstanding_amount": 100,
+        "total_amount": 150,
+        "vehicle_type": "sedan",
+        "payment_type": "card",
+        "trip_type": "One Way",
+        "pickup_date": "2026-06-01",
+        "pickup_time": "10:30:00",
+        "time_period": "Day Tariff",
+        "transfer_information": {"adults": 2, "luggage": "Large"},
+        "passenger_information": {
+            "full_name": "Jane Doe",
+            "phone_number": "+35700000000",
+            "email_address": "jane@example.com",
+        },
+    }
+    data.update(overrides)
+    return data
+
+
+@override_settings(EMAIL_FROM="admin@example.com")
+class IdempotentBookingCreateTest(TestCase):
+    """Retried booking requests with the same Idempotency-Key replay the first response."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.route = create_test_route()
+
+    def _post(self, data, key=None):
+        headers = {"HTTP_IDEMPOTENCY_KEY": key} if key else {}
+        return APIClient().post(reverse("booking-create"), data, format="json", **headers)
+
+    def test_replay_returns_original_response_without_side_effects(self):
+        first = self._post(booking_request(self.route), key="retry-1")
+        emails = OutboundEmail.objects.count()
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self._post(booking_request(self.route), key="retry-1")
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second[REPLAYED_HEADER], "true")
+        self.assertNotIn(REPLAYED_HEADER, first)
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(OutboundEmail.objects.count(), emails)
+        # Claim attempt and lookup only; no validation queries or inserts.
+        self.assertFalse(any("booking_booking" in query["sql"] for query in queries.captured_queries))
+
+    def test_requests_without_key_are_not_deduplicated(self):
+        self._post(booking_request(self.route))
+        self._post(booking_request(self.route))
+
+        self.assertEqual(Booking.objects.count(), 2)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_key_reused_for_different_request_is_rejected(self):
+        self._post(booking_request(self.route), key="retry-2")
+        response = self._post(booking_request(self.route, pickup_time="11:00:00"), key="retry-2")
+
+        self.assertEqual(response.status_code, 422)
+        self.assertIn("error", response.json())
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_failed_request_releases_key(self):
+        invalid = self._post(booking_request(self.route, vehicle_type=""), key="retry-3")
+        fixed = self._post(booking_request(self.route), key="retry-3")
+
+        self.assertEqual(invalid.status_code, 400)
+        self.assertEqual(fixed.status_code, 201)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_expired_key_is_claimed_again(self):
+        self._post(booking_request(self.route), key="retry-4")
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        response = self._post(booking_request(self.route), key="retry-4")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn(REPLAYED_HEADER, response)
+        self.assertEqual(Booking.objects.count(), 2)
+
+    def test_key_still_in_progress_is_a_conflict(self):
+        IdempotencyKey.objects.create(
+            scope="booking-create",
+            key="retry-5",
+            fingerprint=self._fingerprint(booking_request(self.route)),
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+
+        response = self._post(booking_request(self.route), key="retry-5")
+
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Booking.objects.exists())
+
+    def _fingerprint(self, data):
+        request = APIRequestFactory().post(reverse("booking-create"), data, format="json")
+        return request_fingerprint(request)
+
+
+@override_settings(EMAIL_FROM="admin@example.com")
+class ConcurrentIdempotentCreateTest(TransactionTestCase):
+    """Parallel duplicates of one booking request must create exactly one booking."""
+
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_parallel_duplicate_posts_create_one_booking(self):
+        route = create_test_route()
+        attempts = 6
+        barrier = threading.Barrier(attempts)
+        status_codes = []
+        errors = []
+
+        def post():
+            try:
+                barrier.wait()
+                response = APIClient().post(
+                    reverse("booking-create"),
+                    booking_request(route),
+                    format="json",
+                    HTTP_IDEMPOTENCY_KEY="parallel-1",
+                )
+                status_codes.append(response.status_code)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=post) for _ in range(attempts)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # A failure in a worker thread would otherwise only show up as a short count below.
+        if errors:
+            raise errors[0]
+        self.assertEqual(len(status_codes), attempts)
+        self.assertIn(201, status_codes)
+        self.assertTrue(set(status_codes) <= {201, 409}, status_codes)
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(IdempotencyKey.objects.get().response_status, 201)
+
+
+def reference_recursive_underscoreize(data):
+    """recursive_underscoreize as it was before fct.casing: underscoreize at every level."""
+    if isinstance(data, dict):
+        return {key: reference_recursive_underscoreize(value) for key, value in underscoreize(data).items()}
+    if isinstance(data, list):
+        return [reference_recursive_underscoreize(item) for item in data]
+    return data
+
+
+def reference_normalize_booking_request_data(raw_data):
+    """The normalizer as it was before the single-pass rewrite, without route lookup."""
+    if hasattr(raw_data, 'lists'):
+        data = {key: values if len(values) > 1 else values[-1] for key, values in raw_data.lists()}
+    else:
+        data = dict(raw_data)
+    data = reference_recursive_underscoreize(data)
+
+    for field_name in BOOKING_NESTED_FIELDS:
+        if field_name in data and isinstance(data[field_name], str):
+            try:
+                data[field_name] = reference_recursive_underscoreize(json.loads(data[field_name]))
+            except Exception:
+                pass
+
+    def extract(key, prefix):
+        if key.startswith(f"{prefix}."):
+            return [segment for segment in key[len(prefix) + 1:].split('.') if segment]
+        if key.startswith(f"{prefix}["):
+            suffix = key[len(prefix):]
+            path = re.compile(r'\[([^\[\]]+)\]').findall(suffix)
+            if path and suffix == ''.join(f'[{segment}]' for segment in path):
+                return path
+        return None
+
+    for field_name, nested_fields in BOOKING_NESTED_FIELDS.items():
+        nested_payload = data.get(field_name)
+        if not isinstance(nested_payload, dict):
+            nested_payload = {}
+        consumed_keys = []
+        for key, value in list(data.items()):
+            if key == field_name:
+                continue
+            key_path = extract(key, field_name)
+            if key_path:
+                current = nested_payload
+                for segment in key_path[:-1]:
+                    if not isinstance(current.get(segment), dict):
+                        current[segment] = {}
+                    current = current[segment]
+                current[key_path[-1]] = value
+                consumed_keys.append(key)
+                continue
+            if key in nested_fields and key not in nested_payload:
+                nested_payload[key] = value
+                consumed_keys.append(key)
+        if nested_payload:
+            data[field_name] = nested_payload
+        for key in consumed_keys:
+            data.pop(key, None)
+    return data
+
+
+@override_settings(CACHES=IN_PROCESS_CACHES)
+class BookingNormalizerTest(TestCase):
+    """The single-pass normalizer must match the previous implementation for every payload shape."""
+
+    NESTED_NAMES = {
+        "transfer_information": ["transferInformation", "transfer_information", "TransferInformation"],
+        "passenger_information": ["passengerInformation", "passenger_information"],
+    }
+    FIELD_NAMES = [
+        "flightNumber", "flight_number", "adults", "children", "luggage",
+        "fullName", "full_name", "phoneNumber", "phone_number", "emailAddress",
+        "email_address", "additionalInformation", "additional_information",
+        "route", "amountPaid", "pickup_time", "tripType", "addressLine2", "HTMLNotes", "x1Y",
+    ]
+
+    def _value(self, rng, depth=0):
+        choice = rng.randrange(8 if depth < 2 else 5)
+        if choice == 0:
+            return rng.randint(-3, 30)
+        if choice == 1:
+            return rng.choice([None, True, 1.5, ""])
+        if choice in (2, 3, 4):
+            return rng.choice(["Large", "Jane Doe", "+35700000000", "10:30", "{not json", "[1, 2]"])
+        if choice == 5:
+            return [self._value(rng, depth + 1) for _ in range(rng.randint(0, 3))]
+        return {rng.choice(self.FIELD_NAMES): self._value(rng, depth + 1) for _ in range(rng.randint(0, 4))}
+
+    def _key(self, rng):
+        field = rng.choice(self.FIELD_NAMES)
+        nested = rng.choice(self.NESTED_NAMES[rng.choice(list(self.NESTED_NAMES))])
+        shape = rng.randrange(7)
+        if shape == 0:
+            return nested
+        if shape == 1:
+            return f"{nested}[{field}]"
+        if shape == 2:
+            return f"{nested}[{field}][{rng.choice(self.FIELD_NAMES)}]"
+        if shape == 3:
+            return f"{nested}.{field}" + rng.choice(["", ".", f".{rng.choice(self.FIELD_NAMES)}", ".."])
+        if shape == 4:
+            return rng.choice([f"{nested}[]", f"{nested}[{field}", f"{nested}[{field}]x", f"{nested}x"])
+        return field
+
+    def _payload(self, rng):
+        payload = {}
+        for _ in range(rng.randint(0, 12)):
+            key = self._key(rng)
+            if key in self.NESTED_NAMES["transfer_information"] + self.NESTED_NAMES["passenger_information"]:
+                value = rng.choice([
+                    self._value(rng),
+                    json.dumps({rng.choice(self.FIELD_NAMES): self._value(rng) for _ in range(3)}),
+                ])
+            else:
+                value = self._value(rng)
+            payload[key] = value
+        return payload
+
+    def assertSameNormalization(self, payload):
+        expected = reference_normalize_booking_request_data(payload)
+        actual = normalize_booking_request_data(payload, resolve_route=False)
+        # Compare serialized, so key order counts too.
+        self.assertEqual(json.dumps(actual), json.dumps(expected), payload)
+
+    def test_matches_previous_implementation(self):
+        rng = random.Random(2017)
+        for _ in range(3000):
+            payload = self._payload(rng)
+            self.assertSameNormalization(payload)
+            # The same payload after the camel-case parsers have run.
+            self.assertSameNormalization(reference_recursive_underscoreize(payload))
+
+    def test_matches_previous_implementation_for_form_data(self):
+        rng = random.Random(2018)
+        for _ in range(500):
+            form = QueryDict(mutable=True)
+            for _ in range(rng.randint(0, 10)):
+                form.appendlist(self._key(rng), rng.choice(["Large", "2", "Jane", '{"adults": 2}']))
+            self.assertSameNormalization(form)
+
+    def test_accepted_shapes(self):
+        expected = {"adults": 2, "luggage": "Large"}
+        for payload in (
+            {"transferInformation": {"adults": 2, "luggage": "Large"}},
+            {"transfer_information": json.dumps({"adults": 2, "luggage": "Large"})},
+            {"transferInformation[adults]": 2, "transferInformation[luggage]": "Large"},
+            {"transfer_information.adults": 2, "transfer_information.luggage": "Large"},
+            {"adults": 2, "luggage": "Large"},
+        ):
+            self.assertEqual(normalize_booking_request_data(payload)["transfer_information"], expected, payload)
+
+    def test_route_id_lookup_is_cached_and_invalidated(self):
+        route = create_test_route()
+        cache.clear()
+
+        self.assertEqual(normalize_booking_request_data({"route": route.route_id})["route"], route.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(normalize_booking_request_data({"route": route.route_id})["route"], route.pk)
+
+        old_route_id = route.route_id
+        with self.captureOnCommitCallbacks(execute=True):
+            Route.objects.get(pk=route.pk).save()
+        self.assertIsNone(cache.get(route_pk_cache_key(old_route_id)))
+
+        normalize_booking_request_data({"route": route.route_id})
+        with self.captureOnCommitCallbacks(execute=True):
+            route.delete()
+        self.assertEqual(normalize_booking_request_data({"route": old_route_id})["route"], old_route_id)
+
+
+@override_settings(API_KEY="test-api-key")
+class BookingPaginationTest(TestCase):
+    """The booking lists page with keyset cursors: no OFFSET, no COUNT, no skipped or repeated rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.route = create_test_route()
+        cls.admin = UserProfile.objects.create_superuser(email="admin@example.com", password="password123")
+        cls.driver = UserProfile.objects.create_user(
+            email="driver@example.com", password="password123", full_name="Driver", is_driver=True
+        )
+        cls.transfer = TransferInformation.objects.create(adults=1, luggage="Hand")
+        cls.passenger = PassengerDetail.objects.create(
+            full_name="Test Passenger",
+            phone_number="+35700000000",
+            email_address="passenger@example.com",
+        )
+        # Several bookings share each pickup date and time, so only pk orders them.
+        for i in range(12):
+            cls._create_booking(pickup_date=date(2026, 6, 1 + i % 3), pickup_time=time(10 + i % 2, 0))
+
+    @classmethod
+    def _create_booking(cls, **fields):
+        defaults = dict(
+            route=cls.route,
+            vehicle_type="sedan",
+            payment_type="card",
+            trip_type="One Way",
+            pickup_date=date(2026, 6, 1),
+            pickup_time=time(10, 0),
+            time_period="Day Tariff",
+            driver=cls.driver,
+            transfer_information=cls.transfer,
+            passenger_information=cls.passenger,
+        )
+        defaults.update(fields)
+        return Booking.objects.create(**defaults)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def _get(self, url, params=None):
+        response = self.client.get(url, params, HTTP_API_KEY="test-api-key")
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def _walk(self, url, params, direction="next", during=None):
+        """Follow `direction` links from `url`, returning the booking IDs of each page."""
+        pages = []
+        page = self._get(url, params)
+        while True:
+            pages.append([booking["bookingId"] for booking in page["results"]])
+            if during:
+                during(len(pages))
+            if not page[direction]:
+                return pages, page
+            page = self._get(page[direction])
+
+    def test_booking_list_walks_every_booking_newest_first(self):
+        pages, last = self._walk(reverse("booking-list"), {"page_size": 5})
+
+        expected = list(Booking.objects.order_by("-pk").values_list("booking_id", flat=True))
+        self.assertEqual([len(page) for page in pages], [5, 5, 2])
+        self.assertEqual(sum(pages, []), expected)
+        self.assertNotIn("count", last)
+
+        back, _ = self._walk(last["previous"], None, direction="previous")
+        self.assertEqual(sum(reversed(back), []), expected[:10])
+
+    def test_driver_bookings_break_pickup_ties_by_pk(self):
+        url = reverse("assigned-bookings", kwargs={"pk": self.driver.pk})
+        self.client.force_authenticate(user=self.driver)
+
+        pages, _ = self._walk(url, {"page_size": 5})
+
+        expected = list(
+            Booking.objects.filter(driver=self.driver)
+            .order_by("-pickup_date", "-pickup_time", "-pk")
+            .values_list("booking_id", flat=True)
+        )
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_concurrent_inserts_do_not_shift_pages(self):
+        url = reverse("assigned-bookings", kwargs={"pk": self.driver.pk})
+        self.client.force_authenticate(user=self.driver)
+        before = list(
+            Booking.objects.filter(driver=self.driver)
+            .order_by("-pickup_date", "-pickup_time", "-pk")
+            .values_list("booking_id", flat=True)
+        )
+
+        def insert(page_number):
+            # New rows at the very top and tied with rows already served.
+            self._create_booking(pickup_date=date(2026, 6, 3), pickup_time=time(11, 0))
+            self._create_booking(pickup_date=date(2026, 6, 1), pickup_time=time(10, 0))
+
+        pages, _ = self._walk(url, {"page_size": 4}, during=insert)
+        served = sum(pages, [])
+
+        self.assertEqual(len(served), len(set(served)))
+        self.assertEqual([booking_id for booking_id in served if booking_id in before], before)
+
+    def test_deep_pages_seek_instead_of_offset(self):
+        first = self._get(reverse("booking-list"), {"page_size": 2})
+        page = first
+        for _ in range(3):
+            page = self._get(page["next"])
+
+        with CaptureQueriesContext(connection) as queries:
+            self._get(page["next"])
+
+        booking_queries = [q["sql"] for q in queries if 'FROM "booking_booking"' in q["sql"]]
+        self.assertEqual(len(booking_queries), 1)
+        self.assertNotIn("OFFSET", booking_queries[0])
+        self.assertNotIn("COUNT(", " ".join(q["sql"] for q in queries))
+
+    def test_page_size_is_capped(self):
+        with patch("booking.pagination.BookingListPagination.max_page_size", 3):
+            page = self._get(reverse("booking-list"), {"page_size": 1000})
+
+        self.assertEqual(len(page["results"]), 3)
+
+    def test_filters_apply_across_pages(self):
+        pages, _ = self._walk(reverse("booking-list"), {"page_size": 2, "pickup_date": "2026-06-02"})
+
+        self.assertEqual(len(sum(pages, [])), 4)
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get(reverse("booking-list"), {"cursor": "bm9wZQ=="}, HTTP_API_KEY="test-api-key")
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_driver_ordering_uses_pickup_index(self):
+        queryset = Booking.objects.filter(driver=self.driver).order_by("-pickup_date", "-pickup_time", "-pk")[:31]
+
+        self.assertIn("booking_driver_pickup_idx", queryset.explain())
+
+
+@override_settings(API_KEY="test-api-key")
+class BookingListQueryCountTest(QueryCountAssertions, TestCase):
+    """Booking lists load every nested object of BookingDetailSerializer in one query."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.route = create_test_route()
+        cls.admin = UserProfile.objects.create_superuser(email="admin@example.com", password="password123")
+        cls.driver = UserProfile.objects.create_user(
+            email="driver@example.com", password="password123", full_name="Driver", is_driver=True
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def _create_booking(self, index):
+        # Fresh related rows each time, so a missing join shows up as a query per booking.
+        Booking.objects.create(
+            route=create_test_route(from_location=f"Town {index}", to_location="Limassol"),
+            vehicle_type="sedan",
+            payment_type="card",
+            trip_type="One Way",
+            pickup_date=date(2026, 6, 1) + timedelta(days=index),
+            pickup_time=time(10, 0),
+            time_period="Day Tariff",
+            driver=self.driver,
+            vehicle=Vehicle.objects.create(
+                license_plate=f"CYQ{index:03}", make="Mercedes", model="E-Class", type="sedan", max_passengers=3
+            ),
+            transfer_information=TransferInformation.objects.create(adults=1, luggage="Hand"),
+            passenger_information=PassengerDetail.objects.create(
+                full_name=f"Passenger {index}",
+                phone_number="+35700000000",
+                email_address=f"passenger{index}@example.com",
+            ),
+        )
+
+    def test_booking_list(self):
+        self.assertListQueriesConstant(reverse("booking-list"), self._create_booking, HTTP_API_KEY="test-api-key")
+
+    def test_assigned_bookings(self):
+        self.client.force_authenticate(user=self.driver)
+
+        self.assertListQueriesConstant(
+            reverse("assigned-bookings", kwargs={"pk": self.driver.pk}),
+            self._create_booking,
+            HTTP_API_KEY="test-api-key",
+        )
+
+    def test_list_loads_only_serialized_columns(self):
+        self._create_booking(0)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("booking-list"), HTTP_API_KEY="test-api-key")
+
+        sql = next(q["sql"] for q in queries if 'FROM "booking_booking"' in q["sql"])
+        self.assertIn('"booking_transferinformation"."flight_number"', sql)
+        self.assertNotIn('"routes_route"."body"', sql)
+        self.assertNotIn('"booking_booking"."outbound_start"', sql)
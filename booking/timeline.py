@@ -0,0 +1,122 @@
+"""
+Per-day driver/vehicle schedule timelines.
+
+A timeline day lists the busy intervals (from get_booking_time_windows) of one
+driver or vehicle that touch that day. Days are cached under
+(resource, resource id, day) and dropped by the booking signals whenever a
+booking touching that day is saved or deleted, so warm reads are a single
+cache.get_many.
+"""
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .utils import get_booking_time_windows, get_window_overlap_filter, to_stored_datetime
+
+RESOURCE_FIELDS = {
+    'driver': 'driver_id',
+    'vehicle': 'vehicle_id',
+}
+# Invalidation covers every write path; the timeout only bounds how long a
+# read racing a concurrent write can keep serving the pre-write day.
+TIMELINE_CACHE_TIMEOUT = 60 * 60
+
+
+def timeline_cache_key(resource, resource_id, day):
+    return f"booking:timeline:{resource}:{resource_id}:{day.isoformat()}"
+
+
+def get_window_days(start, end):
+    """Return every date the half-open window [start, end) touches."""
+    day = start.date()
+    last_day = (end - timedelta(microseconds=1)).date()
+    days = []
+    while day <= last_day:
+        days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def get_timeline_cache_keys(driver_id, vehicle_id, windows):
+    """Return the cache keys of every (resource, day) the windows occupy."""
+    keys = set()
+    for resource, resource_id in (('driver', driver_id), ('vehicle', vehicle_id)):
+        if not resource_id:
+            continue
+        for start, end in windows:
+            for day in get_window_days(start, end):
+                keys.add(timeline_cache_key(resource, resource_id, day))
+    return keys
+
+
+def get_stored_timeline_cache_keys(booking):
+    """Cache keys for a booking, from its stored window columns."""
+    windows = [
+        (start, end)
+        for start, end in (
+            (booking.outbound_start, booking.outbound_end),
+            (booking.return_start, booking.return_end),
+        )
+        if start and end
+    ]
+    return get_timeline_cache_keys(booking.driver_id, booking.vehicle_id, windows)
+
+
+def invalidate_timeline_cache(keys):
+    """Drop cached timeline days once the current transaction commits."""
+    keys = list(keys)
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def get_resource_timeline(resource, resource_id, date_from, date_to):
+    """
+    Return [{'date', 'intervals'}] for each day from date_from to date_to.
+
+    Cached days are read in one round trip. Missing days are filled from one
+    indexed query spanning them, then written back to the cache.
+    """
+    from .models import Booking
+
+    days = get_window_days(
+        datetime.combine(date_from, time.min),
+        datetime.combine(date_to + timedelta(days=1), time.min),
+    )
+    keys = {day: timeline_cache_key(resource, resource_id, day) for day in days}
+    cached = cache.get_many(keys.values())
+
+    missing = [day for day in days if keys[day] not in cached]
+    if missing:
+        span = [(
+            datetime.combine(missing[0], time.min),
+            datetime.combine(missing[-1] + timedelta(days=1), time.min),
+        )]
+        bookings = Booking.objects.filter(
+            **{RESOURCE_FIELDS[resource]: resource_id}
+        ).exclude(
+            booking_status="Cancelled"
+        ).filter(
+            get_window_overlap_filter(span)
+        ).select_related('route')
+
+        filled = {keys[day]: [] for day in missing}
+        for booking in bookings:
+            for leg, (start, end) in zip(('outbound', 'return'), get_booking_time_windows(booking)):
+                interval = {
+                    'booking_id': booking.booking_id,
+                    'leg': leg,
+                    'status': booking.booking_status,
+                    'start': to_stored_datetime(start),
+                    'end': to_stored_datetime(end),
+                }
+                for day in get_window_days(start, end):
+                    if day in keys and keys[day] in filled:
+                        filled[keys[day]].append(interval)
+        for intervals in filled.values():
+            intervals.sort(key=lambda interval: (interval['start'], interval['booking_id']))
+
+        cache.set_many(filled, TIMELINE_CACHE_TIMEOUT)
+        cached.update(filled)
+
+    return [{'date': day, 'intervals': cached[keys[day]]} for day in days]
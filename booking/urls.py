@@ -6,6 +6,11 @@ from .views import (
     BookingUpdateView,
     AvailableDriversView,
     AvailableVehiclesView,
+    AvailabilityMatrixView,
+    AutoAssignBookingsView,
+    BookingImportView,
+    DriverTimelineView,
+    VehicleTimelineView,
     AssignDriverVehicleView,
     BookingStatusUpdateView,
     PaymentStatusUpdateView,
@@ -17,6 +22,11 @@ from .views import (
 urlpatterns = [
     path('create/', BookingCreateView.as_view(), name='booking-create'),
     path('list/', BookingListView.as_view(), name='booking-list'),
+    path('availability-matrix/', AvailabilityMatrixView.as_view(), name='booking-availability-matrix'),
+    path('import/', BookingImportView.as_view(), name='booking-import'),
+    path('auto-assign/', AutoAssignBookingsView.as_view(), name='booking-auto-assign'),
+    path('timeline/drivers/<int:pk>/', DriverTimelineView.as_view(), name='driver-timeline'),
+    path('timeline/vehicles/<int:pk>/', VehicleTimelineView.as_view(), name='vehicle-timeline'),
     path('<str:booking_id>/update/', BookingUpdateView.as_view(), name='booking-update'),
     path('<str:booking_id>/delete/', BookingDeleteView.as_view(), name='booking-update'),
     path('<str:booking_id>/assign/', AssignDriverVehicleView.as_view(), name='booking-assign'),
@@ -1,7 +1,16 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+
+from django.db.models import Max, Q
+
+from .overlap import iter_overlaps
 
 BUFFER_MINUTES = 30
 
+# Naive window datetimes are wall-clock UTC (see to_stored_datetime).
+EPOCH = datetime(1970, 1, 1)
+STORED_EPOCH = EPOCH.replace(tzinfo=timezone.utc)
+ONE_SECOND = timedelta(seconds=1)
+
 
 def get_booking_time_windows(booking):
     """
@@ -31,6 +40,54 @@ def get_booking_time_windows(booking):
     return windows
 
 
+def to_stored_datetime(value):
+    """
+    Convert a naive window datetime into the aware value stored on Booking.
+
+    Pickup dates/times are wall-clock values, so they are tagged as UTC as-is;
+    every stored and queried window goes through here so comparisons line up.
+    """
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+def to_epoch(value):
+    """Convert a window datetime into integer epoch seconds for the overlap kernel."""
+    # Subtracting the epoch is ~4x faster than to_stored_datetime(value).timestamp()
+    epoch = EPOCH if value.tzinfo is None else STORED_EPOCH
+    return (value - epoch) // ONE_SECOND
+
+
+def get_longest_window():
+    """Return the longest possible booking window: the longest route plus the buffer."""
+    from routes.models import Route
+
+    longest_route = Route.objects.aggregate(longest=Max('duration_minutes'))['longest'] or 0
+    return timedelta(minutes=longest_route + BUFFER_MINUTES)
+
+
+def get_window_overlap_filter(windows, longest_window=None):
+    """
+    Build a Q matching bookings whose stored outbound or return window overlaps any of `windows`.
+
+    Uses the indexed outbound_start/outbound_end/return_start/return_end columns,
+    so the overlap check runs in the database instead of in Python. A stored
+    window can't be longer than `longest_window`, which gives every start column
+    a lower bound and keeps the index range scan to the days around `windows`.
+    """
+    if longest_window is None:
+        longest_window = get_longest_window()
+
+    overlap_filter = Q()
+    for start, end in windows:
+        start, end = to_stored_datetime(start), to_stored_datetime(end)
+        earliest_start = start - longest_window
+        overlap_filter |= Q(outbound_start__gt=earliest_start, outbound_start__lt=end, outbound_end__gt=start)
+        overlap_filter |= Q(return_start__gt=earliest_start, return_start__lt=end, return_end__gt=start)
+    return overlap_filter
+
+
 def check_time_overlap(window1_start, window1_end, window2_start, window2_end):
     """
     Check if two time windows overlap.
@@ -66,16 +123,9 @@ def get_conflicting_booking_for_driver(driver, booking, exclude_booking_id=None)
     if exclude_booking_id:
         existing_bookings = existing_bookings.exclude(booking_id=exclude_booking_id)
 
-    # Check each existing booking for conflicts
-    for existing_booking in existing_bookings:
-        existing_windows = get_booking_time_windows(existing_booking)
-
-        for new_start, new_end in new_windows:
-            for existing_start, existing_end in existing_windows:
-                if check_time_overlap(new_start, new_end, existing_start, existing_end):
-                    return existing_booking
-
-    return None
+    return existing_bookings.filter(
+        get_window_overlap_filter(new_windows)
+    ).select_related('route').order_by('pk').first()
 
 
 def get_conflicting_booking_for_vehicle(vehicle, booking, exclude_booking_id=None):
@@ -107,16 +157,55 @@ def get_conflicting_booking_for_vehicle(vehicle, booking, exclude_booking_id=Non
     if exclude_booking_id:
         existing_bookings = existing_bookings.exclude(booking_id=exclude_booking_id)
 
-    # Check each existing booking for conflicts
-    for existing_booking in existing_bookings:
-        existing_windows = get_booking_time_windows(existing_booking)
+    return existing_bookings.filter(
+        get_window_overlap_filter(new_windows)
+    ).select_related('route').order_by('pk').first()
+
+
+def lock_schedule_rows(booking, driver=None, vehicle=None):
+    """
+    Lock a booking row and the driver/vehicle rows it is about to occupy.
+
+    Must run inside transaction.atomic(). The conflict check that follows then
+    sees every assignment committed before the locks were granted, and another
+    writer for the same driver or vehicle waits until this transaction ends.
+    Only the rows involved are locked, so unrelated assignments run in parallel.
+
+    Rows are always locked booking -> driver -> vehicle to avoid deadlocks.
+    driver/vehicle default to the ones currently stored on the booking.
+    Returns the (driver_id, vehicle_id) that were locked.
+    """
+    from account.models import UserProfile
+    from vehicle.models import Vehicle
+    from .models import Booking
+
+    current = list(
+        Booking.objects.select_for_update().filter(pk=booking.pk).values_list('driver_id', 'vehicle_id')
+    )
+    current_driver_id, current_vehicle_id = current[0] if current else (None, None)
+
+    driver_id = getattr(driver, 'pk', driver) or current_driver_id
+    vehicle_id = getattr(vehicle, 'pk', vehicle) or current_vehicle_id
+
+    if driver_id:
+        list(UserProfile.objects.select_for_update().filter(pk=driver_id).values_list('pk', flat=True))
+    if vehicle_id:
+        list(Vehicle.objects.select_for_update().filter(pk=vehicle_id).values_list('pk', flat=True))
 
-        for new_start, new_end in new_windows:
-            for existing_start, existing_end in existing_windows:
-                if check_time_overlap(new_start, new_end, existing_start, existing_end):
-                    return existing_booking
+    return driver_id, vehicle_id
 
-    return None
+
+def get_unavailable_resource_ids(existing_bookings, new_windows, resource_field):
+    """
+    Return the ids in `resource_field` (e.g. 'driver_id') of bookings overlapping `new_windows`.
+
+    The overlap check runs as one indexed query on the stored window columns.
+    """
+    return set(
+        existing_bookings.filter(
+            get_window_overlap_filter(new_windows)
+        ).values_list(resource_field, flat=True).distinct()
+    )
 
 
 def get_available_drivers(booking, exclude_booking_id=None):
@@ -137,27 +226,17 @@ def get_available_drivers(booking, exclude_booking_id=None):
     if not new_windows:
         return all_drivers
 
-    # Find drivers with conflicting bookings
-    unavailable_driver_ids = set()
-
     # Get all non-cancelled bookings with assigned drivers
     existing_bookings = Booking.objects.filter(
         driver__isnull=False
     ).exclude(
         booking_status="Cancelled"
-    ).select_related('route', 'driver')
+    )
 
     if exclude_booking_id:
         existing_bookings = existing_bookings.exclude(booking_id=exclude_booking_id)
 
-    for existing_booking in existing_bookings:
-        existing_windows = get_booking_time_windows(existing_booking)
-
-        for new_start, new_end in new_windows:
-            for existing_start, existing_end in existing_windows:
-                if check_time_overlap(new_start, new_end, existing_start, existing_end):
-                    unavailable_driver_ids.add(existing_booking.driver_id)
-                    break
+    unavailable_driver_ids = get_unavailable_resource_ids(existing_bookings, new_windows, 'driver_id')
 
     return all_drivers.exclude(id__in=unavailable_driver_ids)
 
@@ -180,9 +259,6 @@ def get_available_vehicles(booking, exclude_booking_id=None):
     if not new_windows:
         return all_vehicles
 
-    # Find vehicles with conflicting bookings
-    unavailable_vehicle_ids = set()
-
     # Get all non-cancelled bookings with assigned vehicles
     existing_bookings = Booking.objects.filter(
         vehicle__isnull=False
@@ -190,23 +266,90 @@ def get_available_vehicles(booking, exclude_booking_id=None):
         booking_status="Cancelled"
     ).exclude(
         booking_status="Completed"
-    ).select_related('route', 'vehicle')
+    )
 
     if exclude_booking_id:
         existing_bookings = existing_bookings.exclude(booking_id=exclude_booking_id)
 
-    for existing_booking in existing_bookings:
-        existing_windows = get_booking_time_windows(existing_booking)
-
-        for new_start, new_end in new_windows:
-            for existing_start, existing_end in existing_windows:
-                if check_time_overlap(new_start, new_end, existing_start, existing_end):
-                    unavailable_vehicle_ids.add(existing_booking.vehicle_id)
-                    break
+    unavailable_vehicle_ids = get_unavailable_resource_ids(existing_bookings, new_windows, 'vehicle_id')
 
     return all_vehicles.exclude(id__in=unavailable_vehicle_ids)
 
 
+def get_availability_matrix(bookings):
+    """
+    Compute driver and vehicle availability for many bookings at once.
+
+    Matches get_available_drivers / get_available_vehicles for each booking,
+    but reads active drivers, vehicles and every overlapping assigned booking
+    once for the whole batch. Returns (drivers, vehicles, rows) where each row
+    holds a booking and the ids of the drivers and vehicles free for it.
+    """
+    from account.models import UserProfile
+    from vehicle.models import Vehicle
+    from .models import Booking
+
+    drivers = list(UserProfile.objects.filter(is_driver=True, is_active=True, disabled=False))
+    vehicles = list(Vehicle.objects.all())
+
+    booking_windows = [
+        (booking, [(to_stored_datetime(start), to_stored_datetime(end)) for start, end in get_booking_time_windows(booking)])
+        for booking in bookings
+    ]
+    all_windows = [window for _, windows in booking_windows for window in windows]
+
+    assigned_bookings = []
+    if all_windows:
+        assigned_bookings = list(Booking.objects.filter(
+            Q(driver__isnull=False) | Q(vehicle__isnull=False)
+        ).exclude(
+            booking_status="Cancelled"
+        ).filter(
+            get_window_overlap_filter(all_windows)
+        ).values_list(
+            'booking_id', 'driver_id', 'vehicle_id', 'booking_status',
+            'outbound_start', 'outbound_end', 'return_start', 'return_end',
+        ))
+
+    new_intervals = [
+        (to_epoch(start), to_epoch(end), row_index)
+        for row_index, (_, windows) in enumerate(booking_windows)
+        for start, end in windows
+    ]
+    assigned_intervals = [
+        (to_epoch(start), to_epoch(end), assigned_index)
+        for assigned_index, (*_, outbound_start, outbound_end, return_start, return_end) in enumerate(assigned_bookings)
+        for start, end in ((outbound_start, outbound_end), (return_start, return_end))
+        if start is not None
+    ]
+
+    busy_driver_ids = [set() for _ in booking_windows]
+    busy_vehicle_ids = [set() for _ in booking_windows]
+    for row_index, assigned_index in iter_overlaps(new_intervals, assigned_intervals):
+        booking_id, driver_id, vehicle_id, booking_status, *_ = assigned_bookings[assigned_index]
+        own_booking_id = booking_windows[row_index][0].booking_id
+        if own_booking_id and booking_id == own_booking_id:
+            continue
+        if driver_id:
+            busy_driver_ids[row_index].add(driver_id)
+        # Completed bookings keep their driver busy but free the vehicle.
+        if vehicle_id and booking_status != "Completed":
+            busy_vehicle_ids[row_index].add(vehicle_id)
+
+    driver_ids = [driver.pk for driver in drivers]
+    vehicle_ids = [vehicle.pk for vehicle in vehicles]
+
+    rows = []
+    for row_index, (booking, _) in enumerate(booking_windows):
+        rows.append({
+            'booking': booking,
+            'available_driver_ids': [pk for pk in driver_ids if pk not in busy_driver_ids[row_index]],
+            'available_vehicle_ids': [pk for pk in vehicle_ids if pk not in busy_vehicle_ids[row_index]],
+        })
+
+    return drivers, vehicles, rows
+
+
 def format_time_window(start, end):
     """
     Format a time window for display in error messages.
@@ -1,34 +1,42 @@
-import json
 import logging
-import re
 
+from django.db import transaction
 from rest_framework.generics import CreateAPIView, ListAPIView, UpdateAPIView, DestroyAPIView
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.parsers import JSONParser
 from rest_framework import status
-from account.permissions import HasBookingPermission, HasRoutesAPIKey, IsDriverPermission
+from rest_framework.exceptions import ValidationError
+from account.permissions import HasBookingPermission, HasDriverPermission, HasRoutesAPIKey, IsDriverPermission
 from rest_framework.generics import ListAPIView
-from fct.utils import CustomPagination
 from account.utils import log_user_activity
 
 logger = logging.getLogger('print')
 
 from .models import Booking
-from routes.models import Route
+from account.models import UserProfile
+from vehicle.models import Vehicle
 from .serializers import (
     BookingCreateSerializer,
     BookingDetailSerializer,
     AssignDriverVehicleSerializer,
     AvailableDriverSerializer,
     AvailableVehicleSerializer,
+    AvailabilityMatrixQuerySerializer,
+    AutoAssignSerializer,
+    DateRangeSerializer,
     BookingUpdateSerializer,
     BookingStatusSerializer,
     PaymentStatusSerializer,
     RescheduleBookingSerializer,
 )
 from .filters import BookingFilter
-from .utils import get_available_drivers, get_available_vehicles
+from .pagination import BookingListPagination, DriverBookingsPagination
+from .utils import get_available_drivers, get_available_vehicles, get_availability_matrix
+from .auto_assign import apply_auto_assignment, plan_auto_assignment
+from .idempotency import idempotent
+from .bulk_import import FeedError, create_bookings, parse_booking_feed, validate_booking_rows
+from .timeline import get_resource_timeline
 from .emails import (
     send_booking_confirmation_to_passenger,
     send_booking_updated_to_passenger,
@@ -52,107 +60,14 @@ from notifications.utils import (
     create_booking_updated_notification,
     create_booking_status_notification,
 )
+from fct.query_plan import QueryPlanMixin
 from fct.parsers import (
     RecursiveCamelCaseFormParser,
     RecursiveCamelCaseJSONParser,
     RecursiveCamelCaseMultiPartParser,
-    recursive_underscoreize,
 )
-from contextlib import suppress
-
-
-BOOKING_NESTED_FIELDS = {
-    'transfer_information': {'flight_number', 'adults', 'children', 'luggage'},
-    'passenger_information': {
-        'full_name',
-        'phone_number',
-        'email_address',
-        'additional_information',
-    },
-}
-
-
-def _coerce_request_data(raw_data):
-    """Convert request data into a plain dict while preserving scalar values."""
-    if hasattr(raw_data, 'lists'):
-        return {
-            key: values if len(values) > 1 else values[-1]
-            for key, values in raw_data.lists()
-        }
-    return dict(raw_data)
-
-
-def _extract_nested_key_path(key, prefix):
-    """Support nested multipart keys like field[subfield] and field.subfield."""
-    if key.startswith(f"{prefix}."):
-        path = key[len(prefix) + 1:].split('.')
-        return [segment for segment in path if segment]
-
-    bracket_pattern = re.compile(r'\[([^\[\]]+)\]')
-    bracket_prefix = f"{prefix}["
-    if key.startswith(bracket_prefix):
-        suffix = key[len(prefix):]
-        path = bracket_pattern.findall(suffix)
-        if path and suffix == ''.join(f'[{segment}]' for segment in path):
-            return path
-
-    return None
-
-
-def _assign_nested_value(payload, path, value):
-    current = payload
-    for segment in path[:-1]:
-        next_value = current.get(segment)
-        if not isinstance(next_value, dict):
-            next_value = {}
-            current[segment] = next_value
-        current = next_value
-
-    current[path[-1]] = value
-
-
-def _normalize_booking_request_data(raw_data):
-    """Accept JSON strings, bracket notation, dot notation, and flat aliases."""
-    data = recursive_underscoreize(_coerce_request_data(raw_data))
-
-    for field_name in BOOKING_NESTED_FIELDS:
-        if field_name in data and isinstance(data[field_name], str):
-            with suppress(Exception):
-                parsed = json.loads(data[field_name])
-                data[field_name] = recursive_underscoreize(parsed)
-
-    for field_name, nested_fields in BOOKING_NESTED_FIELDS.items():
-        nested_payload = data.get(field_name)
-        if not isinstance(nested_payload, dict):
-            nested_payload = {}
-
-        consumed_keys = []
-        for key, value in list(data.items()):
-            if key == field_name:
-                continue
-
-            key_path = _extract_nested_key_path(key, field_name)
-            if key_path:
-                _assign_nested_value(nested_payload, key_path, value)
-                consumed_keys.append(key)
-                continue
-
-            if key in nested_fields and key not in nested_payload:
-                nested_payload[key] = value
-                consumed_keys.append(key)
-
-        if nested_payload:
-            data[field_name] = nested_payload
-
-        for key in consumed_keys:
-            data.pop(key, None)
-
-    if 'route' in data and isinstance(data['route'], str):
-        with suppress(Exception):
-            route_obj = Route.objects.get(route_id=data['route'])
-            data['route'] = route_obj.pk
-
-    return data
+from .normalizers import normalize_booking_request_data
+from notifications.rendering import email_batch
 
 
 class BookingCreateView(CreateAPIView):
@@ -171,10 +86,12 @@ class BookingCreateView(CreateAPIView):
     def get_serializer(self, *args, **kwargs):
         """Parse JSON fields from multipart form data and convert route_id to pk."""
         if 'data' in kwargs:
-            kwargs['data'] = _normalize_booking_request_data(kwargs['data'])
+            kwargs['data'] = normalize_booking_request_data(kwargs['data'])
 
         return super().get_serializer(*args, **kwargs)
 
+    @idempotent('booking-create')
+    @transaction.atomic
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         
@@ -185,9 +102,10 @@ class BookingCreateView(CreateAPIView):
             )
         
         booking = serializer.save()
-        # send_booking_confirmation_to_passenger(booking)
-        send_reservation_to_passenger(booking)
-        send_reservation_to_admin(booking)
+        with email_batch():
+            # send_booking_confirmation_to_passenger(booking)
+            send_reservation_to_passenger(booking)
+            send_reservation_to_admin(booking)
         
 
         return Response(
@@ -198,16 +116,12 @@ class BookingCreateView(CreateAPIView):
     
 
 
-class BookingListView(ListAPIView):
-    queryset = Booking.objects.select_related(
-        'passenger_information',
-        'route',
-        'vehicle',
-        'driver'
-    ).order_by('-pk', '-pickup_date', '-pickup_time')
+class BookingListView(QueryPlanMixin, ListAPIView):
+    queryset = Booking.objects.order_by('-pk')
     serializer_class = BookingDetailSerializer
     permission_classes = [HasRoutesAPIKey, HasBookingPermission]
     filterset_class = BookingFilter
+    pagination_class = BookingListPagination
 
 class BookingUpdateView(UpdateAPIView):
     """
@@ -226,6 +140,7 @@ class BookingUpdateView(UpdateAPIView):
         'driver'
     )
 
+    @transaction.atomic
     def perform_update(self, serializer):
         # Store old status before update
         old_status = serializer.instance.booking_status if serializer.instance else None
@@ -245,21 +160,22 @@ class BookingUpdateView(UpdateAPIView):
         # Only send emails and notifications if there were actual changes
         
         if changes:
-            # Send email to passenger
-            send_booking_updated_to_passenger(booking, changes)
-            send_booking_updated_to_admin(booking, user, changes)
+            with email_batch():
+                # Send email to passenger
+                send_booking_updated_to_passenger(booking, changes)
+                send_booking_updated_to_admin(booking, user, changes)
 
-            # Send email and notification to driver if one is assigned
-            if booking.driver:
-                send_booking_updated_to_driver(booking, changes)
-
-                # Check if status changed - create specific status notification
-                new_status = booking.booking_status
-                if old_status and old_status != new_status:
-                    create_booking_status_notification(booking, old_status, new_status)
-                else:
-                    # General update notification
-                    create_booking_updated_notification(booking, changes)
+                # Send email and notification to driver if one is assigned
+                if booking.driver:
+                    send_booking_updated_to_driver(booking, changes)
+
+                    # Check if status changed - create specific status notification
+                    new_status = booking.booking_status
+                    if old_status and old_status != new_status:
+                        create_booking_status_notification(booking, old_status, new_status)
+                    else:
+                        # General update notification
+                        create_booking_updated_notification(booking, changes)
 
 
 class AvailableDriversView(APIView):
@@ -314,6 +230,58 @@ class AvailableVehiclesView(APIView):
         return Response(serializer.data)
 
 
+class AvailabilityMatrixView(APIView):
+    """
+    Driver and vehicle availability for many bookings in one request.
+
+    Query with ?booking_ids=FCT1,FCT2 or ?date_from=YYYY-MM-DD&date_to=YYYY-MM-DD
+    (non-cancelled bookings picked up in that range). Optional ?vehicle_type=
+    narrows the vehicle list, like AvailableVehiclesView.
+    """
+    permission_classes = [HasRoutesAPIKey, HasBookingPermission]
+
+    def get(self, request):
+        query = AvailabilityMatrixQuerySerializer(data=request.query_params)
+
+        if not query.is_valid():
+            return Response(
+                {'error': 'Validation failed', 'details': query.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        params = query.validated_data
+        bookings = Booking.objects.select_related('route').order_by('pickup_date', 'pickup_time', 'pk')
+
+        if params.get('booking_ids'):
+            bookings = bookings.filter(booking_id__in=params['booking_ids'])
+        else:
+            bookings = bookings.filter(
+                pickup_date__range=(params['date_from'], params['date_to'])
+            ).exclude(booking_status="Cancelled")
+
+        drivers, vehicles, rows = get_availability_matrix(list(bookings))
+
+        vehicle_type = params.get('vehicle_type')
+        if vehicle_type:
+            matching_ids = {vehicle.pk for vehicle in vehicles if vehicle.type == vehicle_type}
+            vehicles = [vehicle for vehicle in vehicles if vehicle.pk in matching_ids]
+            for row in rows:
+                row['available_vehicle_ids'] = [pk for pk in row['available_vehicle_ids'] if pk in matching_ids]
+
+        return Response({
+            'drivers': AvailableDriverSerializer(drivers, many=True).data,
+            'vehicles': AvailableVehicleSerializer(vehicles, many=True).data,
+            'bookings': [
+                {
+                    'booking_id': row['booking'].booking_id,
+                    'available_driver_ids': row['available_driver_ids'],
+                    'available_vehicle_ids': row['available_vehicle_ids'],
+                }
+                for row in rows
+            ],
+        })
+
+
 class AssignDriverVehicleView(UpdateAPIView):
     """
     Assign both driver and vehicle to a booking.
@@ -341,20 +309,25 @@ class AssignDriverVehicleView(UpdateAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        self.perform_update(serializer)
+        try:
+            self.perform_update(serializer)
+        except ValidationError as exc:
+            return Response(
+                {'error': 'Validation failed', 'details': exc.detail},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         return Response(
             {'message': 'Driver and vehicle assigned successfully'},
             status=status.HTTP_200_OK
         )
 
+    @transaction.atomic
     def perform_update(self, serializer):
         user = self.request.user
+        # Saves driver, vehicle and the Assigned status under row locks
         booking = serializer.save()
 
-        # Update status to Assigned (both driver and vehicle are required)
-        booking.booking_status = 'Assigned'
-        booking.save(update_fields=['booking_status'])
-
         # Log user activity
         log_user_activity(
             self.request.user,
@@ -362,6 +335,12 @@ class AssignDriverVehicleView(UpdateAPIView):
             self.request
         )
 
+        notify_booking_assigned(booking, user)
+
+
+def notify_booking_assigned(booking, user):
+    """Send the assignment emails and driver notification for a newly assigned booking."""
+    with email_batch():
         # Send email to passenger with driver and vehicle info
         send_assignment_to_passenger(booking)
         send_assignment_to_admin(booking, user)
@@ -369,8 +348,193 @@ class AssignDriverVehicleView(UpdateAPIView):
         # Send email to driver with booking and vehicle info
         send_assignment_to_driver(booking)
 
-        # Create notification for the driver
-        create_booking_assigned_notification(booking)
+    # Create notification for the driver
+    create_booking_assigned_notification(booking)
+
+
+class AutoAssignBookingsView(APIView):
+    """
+    Assign drivers and vehicles to every Pending booking picked up in a date range.
+
+    Vehicles must match the booking's vehicle_type and seat all adults and
+    children. With dry_run the plan is returned without saving anything.
+    """
+    permission_classes = [HasRoutesAPIKey, HasBookingPermission]
+
+    def post(self, request):
+        user = request.user
+        serializer = AutoAssignSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(
+                {'error': 'Validation failed', 'details': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        params = serializer.validated_data
+
+        with transaction.atomic():
+            bookings, assignments, unassigned = plan_auto_assignment(
+                params['date_from'], params['date_to'], lock=not params['dry_run']
+            )
+            if not params['dry_run']:
+                assigned_bookings = apply_auto_assignment(bookings, assignments)
+
+                # Queued in the same transaction as the assignments
+                if params['notify']:
+                    with email_batch():
+                        for booking in assigned_bookings:
+                            notify_booking_assigned(booking, user)
+
+        if not params['dry_run'] and assignments:
+            log_user_activity(
+                user,
+                f"Auto-assigned {len(assigned_bookings)} booking(s) from {params['date_from']} to {params['date_to']}",
+                request
+            )
+
+        return Response(
+            {
+                'dry_run': params['dry_run'],
+                'assigned': [
+                    {
+                        'booking_id': bookings[booking_pk].booking_id,
+                        'driver_id': driver_id,
+                        'vehicle_id': vehicle_id,
+                    }
+                    for booking_pk, (driver_id, vehicle_id) in assignments.items()
+                ],
+                'unassigned': [
+                    {'booking_id': bookings[booking_pk].booking_id, 'reason': reason}
+                    for booking_pk, reason in unassigned.items()
+                ],
+            },
+            status=status.HTTP_200_OK
+        )
+
+
+class BookingImportView(APIView):
+    """
+    Import a partner/agency feed of bookings in one transaction.
+
+    Send a CSV or JSON file as `file` (multipart), or a JSON body holding a
+    list of bookings or {"bookings": [...]}. A row may name its driver and
+    vehicle (by pk); it is then imported as Assigned, and must not clash with
+    other bookings or rows. If any row is invalid nothing is imported and the
+    row errors are returned. No emails are sent for imported bookings. With
+    dry_run the feed is only validated.
+    """
+    permission_classes = [HasRoutesAPIKey, HasBookingPermission]
+    parser_classes = [
+        RecursiveCamelCaseJSONParser,
+        RecursiveCamelCaseMultiPartParser,
+        JSONParser,
+    ]
+
+    def get_rows(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            data = request.data
+            return data if isinstance(data, list) else data.get('bookings')
+
+        feed_format = request.data.get('format') or upload.name.rsplit('.', 1)[-1].lower()
+        try:
+            content = upload.read().decode('utf-8-sig')
+        except UnicodeDecodeError as exc:
+            raise FeedError("The file must be UTF-8 encoded.") from exc
+        return parse_booking_feed(content, feed_format)
+
+    def post(self, request):
+        user = request.user
+
+        try:
+            rows = self.get_rows(request)
+        except FeedError as exc:
+            return Response(
+                {'error': 'Validation failed', 'details': {'file': [str(exc)]}},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not isinstance(rows, list) or not rows:
+            return Response(
+                {'error': 'Validation failed', 'details': {'bookings': ["Send a non-empty list of bookings or a file."]}},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        validated_rows, errors = validate_booking_rows(rows)
+        if errors:
+            return Response(
+                {'error': 'Validation failed', 'details': {'rows': errors}},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        dry_run = request.query_params.get('dry_run', '').lower() in ('1', 'true', 'yes')
+        if dry_run:
+            return Response({'dry_run': True, 'valid': len(validated_rows)}, status=status.HTTP_200_OK)
+
+        bookings = create_bookings(validated_rows)
+        log_user_activity(user, f"Imported {len(bookings)} booking(s)", request)
+
+        return Response(
+            {
+                'created': len(bookings),
+                'booking_ids': [booking.booking_id for booking in bookings],
+            },
+            status=status.HTTP_201_CREATED
+        )
+
+
+class ResourceTimelineView(APIView):
+    """
+    Busy intervals of one driver or vehicle, bucketed per day.
+
+    Query params: date_from (required) and date_to (defaults to date_from).
+    Each day is cached until a booking touching it changes.
+    """
+    resource = None
+    queryset = None
+
+    def get_resource_queryset(self):
+        return self.queryset
+
+    def get(self, request, pk):
+        serializer = DateRangeSerializer(data=request.query_params)
+
+        if not serializer.is_valid():
+            return Response(
+                {'error': 'Validation failed', 'details': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not self.get_resource_queryset().filter(pk=pk).exists():
+            return Response(
+                {"error": f"{self.resource.title()} not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        params = serializer.validated_data
+        days = get_resource_timeline(self.resource, pk, params['date_from'], params['date_to'])
+
+        return Response({f'{self.resource}_id': pk, 'days': days})
+
+
+class DriverTimelineView(ResourceTimelineView):
+    """Timeline of a driver. Drivers may only read their own."""
+    permission_classes = [HasRoutesAPIKey, HasDriverPermission]
+    resource = 'driver'
+
+    def get_resource_queryset(self):
+        drivers = UserProfile.objects.filter(is_driver=True)
+        user = self.request.user
+        if user.is_driver and not user.is_superuser and 'drivers' not in user.user_permissions:
+            drivers = drivers.filter(pk=user.pk)
+        return drivers
+
+
+class VehicleTimelineView(ResourceTimelineView):
+    """Timeline of a vehicle."""
+    permission_classes = [HasRoutesAPIKey, HasBookingPermission]
+    resource = 'vehicle'
+    queryset = Vehicle.objects.all()
 
 
 class BookingStatusUpdateView(UpdateAPIView):
@@ -385,6 +549,7 @@ class BookingStatusUpdateView(UpdateAPIView):
         'driver', 'passenger_information', 'route'
     )
 
+    @transaction.atomic
     def update(self, request, *args, **kwargs):
         user = request.user
         booking = self.get_object()
@@ -408,14 +573,15 @@ class BookingStatusUpdateView(UpdateAPIView):
             request
         )
 
-        # Send email to passenger about status change
-        send_status_change_to_passenger(booking, old_status, new_status)
-        send_status_change_to_admin(user, booking, old_status, new_status)
+        with email_batch():
+            # Send email to passenger about status change
+            send_status_change_to_passenger(booking, old_status, new_status)
+            send_status_change_to_admin(user, booking, old_status, new_status)
 
-        # Send email and notification to driver if assigned
-        if booking.driver:
-            send_status_change_to_driver(booking, old_status, new_status)
-            create_booking_status_notification(booking, old_status, new_status)
+            # Send email and notification to driver if assigned
+            if booking.driver:
+                send_status_change_to_driver(booking, old_status, new_status)
+                create_booking_status_notification(booking, old_status, new_status)
 
         return Response(
             {'message': f'Booking status updated to {new_status}'},
@@ -462,6 +628,7 @@ class PaymentStatusUpdateView(UpdateAPIView):
         'passenger_information', 'route'
     )
 
+    @transaction.atomic
     def update(self, request, *args, **kwargs):
         user = request.user
         booking = self.get_object()
@@ -508,6 +675,7 @@ class RescheduleBookingView(UpdateAPIView):
         'driver', 'vehicle', 'passenger_information', 'route'
     )
 
+    @transaction.atomic
     def update(self, request, *args, **kwargs):
         user = request.user
         booking = self.get_object()
@@ -519,7 +687,14 @@ class RescheduleBookingView(UpdateAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        serializer.save()
+        try:
+            serializer.save()
+        except ValidationError as exc:
+            return Response(
+                {'error': 'Validation failed', 'details': exc.detail},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         changes = getattr(serializer, 'changes', [])
 
         # Log user activity
@@ -531,23 +706,24 @@ class RescheduleBookingView(UpdateAPIView):
 
         # Send emails and notifications if there were changes
         if changes:
-            send_booking_updated_to_passenger(booking, changes)
-            send_booking_updated_to_admin(booking, user, changes)
+            with email_batch():
+                send_booking_updated_to_passenger(booking, changes)
+                send_booking_updated_to_admin(booking, user, changes)
 
-            if booking.driver:
-                send_booking_updated_to_driver(booking, changes)
-                create_booking_updated_notification(booking, changes)
+                if booking.driver:
+                    send_booking_updated_to_driver(booking, changes)
+                    create_booking_updated_notification(booking, changes)
 
         return Response(
             {'message': 'Booking rescheduled successfully', 'changes': changes},
             status=status.HTTP_200_OK
         )
 
-class UserBookingsView(ListAPIView):
+class UserBookingsView(QueryPlanMixin, ListAPIView):
     serializer_class = BookingDetailSerializer
     permission_classes = [HasRoutesAPIKey, IsDriverPermission ]
     filterset_class = BookingFilter
-    pagination_class = CustomPagination
+    pagination_class = DriverBookingsPagination
 
     def get_queryset(self):
         user_id = self.kwargs.get('pk')
@@ -556,11 +732,6 @@ class UserBookingsView(ListAPIView):
 
         return Booking.objects.filter(
             driver__pk=user_id
-        ).select_related(
-            'passenger_information',
-            'route',
-            'vehicle',
-            'driver'
-        ).order_by('-pickup_date', '-pickup_time')
+        ).order_by('-pickup_date', '-pickup_time', '-pk')
         
         
@@ -1,3 +1,26 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from account.models import UserProfile
+from fct.testing import QueryCountAssertions
+
+
+@override_settings(API_KEY="test-api-key")
+class DriverListQueryCountTest(QueryCountAssertions, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=UserProfile.objects.create_superuser(email="admin@example.com", password="password123")
+        )
+
+    def _create_driver(self, index):
+        UserProfile.objects.create_user(
+            email=f"driver{index}@example.com", password="password123", full_name=f"Driver {index}", is_driver=True
+        )
+
+    def test_driver_list(self):
+        self.assertListQueriesConstant(reverse("driver-list"), self._create_driver, HTTP_API_KEY="test-api-key")
+
+    def test_available_drivers(self):
+        self.assertListQueriesConstant(reverse("available-drivers"), self._create_driver, HTTP_API_KEY="test-api-key")
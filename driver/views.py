@@ -15,6 +15,7 @@ from django_filters import rest_framework as filters
 from account.models import UserProfile
 from .serializers import DriverSerializer, DriverDetailSerializer, AvailableDriverSerializer, DriverListSerializer, DriverRegistrationSerializer
 from account.permissions import HasDriverPermission, HasRoutesAPIKey, IsDriverPermission
+from fct.query_plan import QueryPlanMixin
 from fct.utils import CustomPagination
 from account.utils import log_user_activity
 from django.db import transaction, IntegrityError
@@ -90,11 +91,11 @@ class CreateDriverView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-class DriverListView(generics.ListAPIView):
+class DriverListView(QueryPlanMixin, generics.ListAPIView):
     """List all users where is_driver=True"""
     serializer_class = DriverDetailSerializer
     permission_classes = [HasRoutesAPIKey, HasDriverPermission]
-    queryset = UserProfile.objects.filter(is_driver=True)
+    queryset = UserProfile.objects.filter(is_driver=True).order_by('pk')
     pagination_class = CustomPagination
     filterset_class = DriverFilter
 
@@ -109,7 +110,7 @@ class  RetrieveDriverView(generics.RetrieveAPIView):
         user = self.request.user
         return user
 
-class RetrieveUpdateDestroyDriverView(generics.RetrieveUpdateDestroyAPIView):
+class RetrieveUpdateDestroyDriverView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, Update, or Destroy a driver"""
     serializer_class = DriverSerializer
     queryset = UserProfile.objects.filter(is_driver=True)
@@ -171,7 +172,7 @@ class RetrieveUpdateDestroyDriverView(generics.RetrieveUpdateDestroyAPIView):
         return super().destroy(request, *args, **kwargs)
 
 
-class AvailableDriverListView(generics.ListAPIView):
+class AvailableDriverListView(QueryPlanMixin, generics.ListAPIView):
     """List all available drivers (is_driver=True and status='Available')"""
     serializer_class = AvailableDriverSerializer
     permission_classes = [HasRoutesAPIKey, HasDriverPermission]
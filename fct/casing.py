@@ -0,0 +1,83 @@
+"""
+camelCase <-> snake_case key conversion for request and response payloads.
+
+djangorestframework_camel_case converts every key with a regex on every
+request, and recursive_underscoreize used to run its (already recursive)
+underscoreize again at each nesting level. The functions here walk a
+payload once and translate each distinct key through a bounded LRU cache,
+which is a dict lookup for the handful of field names an API actually uses.
+Output matches the library's camelize()/underscoreize() with default
+options; camel_to_underscore is idempotent, so one pass is equivalent to
+the repeated ones.
+"""
+import re
+from datetime import date, time, timedelta
+from decimal import Decimal
+from functools import lru_cache
+from uuid import UUID
+
+from django.core.files import File
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from djangorestframework_camel_case.util import camel_to_underscore, camelize, underscore_to_camel, underscoreize
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+KEY_CACHE_SIZE = 8192
+CAMELIZE_PATTERN = re.compile(r"[a-z0-9]?_[a-z0-9]")
+
+# Values returned as-is in both directions.
+_SCALAR_TYPES = (str, int, float, bool, type(None), Decimal, date, time, timedelta, UUID)
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def underscore_key(key):
+    return camel_to_underscore(key)
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def camelize_key(key):
+    return CAMELIZE_PATTERN.sub(underscore_to_camel, key) if "_" in key else key
+
+
+def underscoreize_keys(data):
+    """Convert every dict key in `data` to snake_case in one traversal."""
+    if isinstance(data, _SCALAR_TYPES) or isinstance(data, File):
+        return data
+    if isinstance(data, dict):
+        # For a QueryDict/MultiValueDict .items() yields each key's last value,
+        # as recursive_underscoreize always did.
+        return {
+            underscore_key(key) if isinstance(key, str) else key: underscoreize_keys(value)
+            for key, value in data.items()
+        }
+    if isinstance(data, (list, tuple)):
+        return [underscoreize_keys(item) for item in data]
+    # Anything else (sets, generators, ...) takes the library's path.
+    return underscoreize(data)
+
+
+def underscoreize_querydict(data):
+    """A mutable copy of a QueryDict with snake_case keys and every value list kept."""
+    converted = data.__class__(mutable=True)
+    for key, values in data.lists():
+        converted.setlist(underscore_key(key), values)
+    return converted
+
+
+def camelize_keys(data):
+    """Convert every dict key in `data` to camelCase in one traversal."""
+    if isinstance(data, _SCALAR_TYPES):
+        return data
+    if isinstance(data, dict):
+        converted = {}
+        for key, value in data.items():
+            if isinstance(key, Promise):
+                key = force_str(key)
+            converted[camelize_key(key) if isinstance(key, str) else key] = camelize_keys(value)
+        if isinstance(data, ReturnDict):
+            # The browsable API reads .serializer to build its forms.
+            return ReturnDict(converted, serializer=data.serializer)
+        return converted
+    if isinstance(data, (list, tuple)):
+        return [camelize_keys(item) for item in data]
+    return camelize(data)
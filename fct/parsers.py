@@ -1,13 +1,24 @@
 """
 Custom parsers that ensure recursive camelCase to snake_case conversion
 for nested form data and JSON data.
+
+Keys are converted in a single traversal through fct.casing, instead of
+calling the library's underscoreize and then walking the result again.
 """
+import json
+
+from django.conf import settings
 from djangorestframework_camel_case.parser import (
     CamelCaseFormParser,
     CamelCaseMultiPartParser,
     CamelCaseJSONParser,
 )
+from django.http.multipartparser import MultiPartParser as DjangoMultiPartParser, MultiPartParserError
 from djangorestframework_camel_case.util import underscoreize
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import DataAndFiles, FormParser
+
+from .casing import underscoreize_keys, underscoreize_querydict
 
 
 def recursive_underscoreize(data):
@@ -15,30 +26,16 @@ def recursive_underscoreize(data):
     Recursively convert all keys in nested data structures from camelCase to snake_case.
     Handles dicts, lists, and nested combinations.
     """
-    if isinstance(data, dict):
-        # First underscoreize the top-level keys, then recursively process values
-        underscored = underscoreize(data)
-        return {key: recursive_underscoreize(value) for key, value in underscored.items()}
-    elif isinstance(data, list):
-        return [recursive_underscoreize(item) for item in data]
-    else:
-        return data
+    return underscoreize_keys(data)
 
 
 class RecursiveCamelCaseFormParser(CamelCaseFormParser):
     """
-    Form parser that recursively converts all nested camelCase keys to snake_case.
+    Form parser that converts camelCase keys to snake_case.
+    Form values are flat strings, so only the keys need converting.
     """
     def parse(self, stream, media_type=None, parser_context=None):
-        data = super().parse(stream, media_type, parser_context)
-        # Ensure nested data is also converted
-        # Use .dict() for QueryDict to get single values instead of lists
-        if hasattr(data, 'data'):
-            if hasattr(data.data, 'dict'):
-                data.data = recursive_underscoreize(data.data.dict())
-            else:
-                data.data = recursive_underscoreize(data.data)
-        return data
+        return underscoreize_querydict(FormParser.parse(self, stream, media_type, parser_context))
 
 
 class RecursiveCamelCaseMultiPartParser(CamelCaseMultiPartParser):
@@ -46,15 +43,20 @@ class RecursiveCamelCaseMultiPartParser(CamelCaseMultiPartParser):
     MultiPart parser that recursively converts all nested camelCase keys to snake_case.
     """
     def parse(self, stream, media_type=None, parser_context=None):
-        result = super().parse(stream, media_type, parser_context)
-        # Ensure nested data is also converted
+        parser_context = parser_context or {}
+        request = parser_context['request']
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        meta = request.META.copy()
+        meta['CONTENT_TYPE'] = media_type
+
+        try:
+            parser = DjangoMultiPartParser(meta, stream, request.upload_handlers, encoding)
+            data, files = parser.parse()
+        except MultiPartParserError as exc:
+            raise ParseError(f"Multipart form parse error - {exc}")
+
         # Use .dict() for QueryDict to get single values instead of lists
-        if hasattr(result, 'data'):
-            if hasattr(result.data, 'dict'):
-                result.data = recursive_underscoreize(result.data.dict())
-            else:
-                result.data = recursive_underscoreize(result.data)
-        return result
+        return DataAndFiles(underscoreize_keys(data.dict()), underscoreize(files))
 
 
 class RecursiveCamelCaseJSONParser(CamelCaseJSONParser):
@@ -62,6 +64,11 @@ class RecursiveCamelCaseJSONParser(CamelCaseJSONParser):
     JSON parser that recursively converts all nested camelCase keys to snake_case.
     """
     def parse(self, stream, media_type=None, parser_context=None):
-        data = super().parse(stream, media_type, parser_context)
-        # Ensure nested data is also converted
-        return recursive_underscoreize(data)
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            data = json.loads(stream.read().decode(encoding))
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+        return underscoreize_keys(data)
@@ -0,0 +1,170 @@
+"""
+Querysets shaped by the serializer that renders them.
+
+A list view that misses a select_related costs one query per row. Nothing
+shows it until the table is large. serializer_query_plan() walks a
+serializer's readable fields once per class and derives:
+
+- select_related for nested serializers and dotted sources that follow
+  foreign keys and one-to-one relations;
+- prefetch_related for many=True fields over reverse or many-to-many
+  relations. Nested model serializers there get a planned Prefetch
+  queryset of their own;
+- only() with just the columns those fields read, on every model joined.
+
+A SerializerMethodField, a source='*' field or a source that is not a model
+field (a property, a method) could read anything. The model it sits on is
+then loaded in full. Relations such fields touch are declared on the
+serializer's Meta as `select_related` / `prefetch_related`.
+"""
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+@dataclass
+class QueryPlan:
+    model: type
+    select_related: list = field(default_factory=list)
+    # (path, QueryPlan for the related model or None for a plain prefetch)
+    prefetch_related: list = field(default_factory=list)
+    only: list = field(default_factory=list)
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        for path, plan in self.prefetch_related:
+            if plan is None:
+                queryset = queryset.prefetch_related(path)
+            else:
+                queryset = queryset.prefetch_related(
+                    Prefetch(path, queryset=plan.apply(plan.model._default_manager.all()))
+                )
+        return queryset.only(*self.only)
+
+
+class _Planner:
+    def __init__(self, model):
+        self.plan = QueryPlan(model)
+        # Column names per model in the plan, keyed by lookup prefix ('' for
+        # the root, 'route__' for a join). None loads every column.
+        self.columns = {'': set()}
+        self.models = {'': model}
+
+    def build(self):
+        for prefix, columns in self.columns.items():
+            if columns is None:
+                columns = [model_field.name for model_field in self.models[prefix]._meta.concrete_fields]
+            self.plan.only.extend(prefix + name for name in sorted(columns))
+        return self.plan
+
+    def add_column(self, prefix, name):
+        if self.columns[prefix] is not None:
+            self.columns[prefix].add(name)
+
+    def load_all(self, prefix):
+        self.columns[prefix] = None
+
+    def join(self, prefix, name, model):
+        path = prefix + name
+        if path + '__' not in self.columns:
+            self.plan.select_related.append(path)
+            self.columns[path + '__'] = set()
+            self.models[path + '__'] = model
+        return path + '__'
+
+    def add_serializer(self, serializer, prefix=''):
+        meta = getattr(serializer, 'Meta', None)
+        for path in getattr(meta, 'select_related', ()):
+            self.follow(prefix, path.split('__'))
+        for path in getattr(meta, 'prefetch_related', ()):
+            self.plan.prefetch_related.append((prefix + path, None))
+
+        for serializer_field in serializer.fields.values():
+            if not serializer_field.write_only:
+                self.add_field(serializer_field, prefix)
+
+    def follow(self, prefix, attrs, serializer_field=None):
+        """Plan the lookup `attrs` from the model at `prefix`, ending in `serializer_field`."""
+        for index, attr in enumerate(attrs):
+            model = self.models[prefix]
+            last = index == len(attrs) - 1
+            try:
+                model_field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                # A property or method: it may read any column.
+                self.load_all(prefix)
+                return
+
+            if not model_field.is_relation:
+                # Further attrs index into the value (JSON keys and the like).
+                self.add_column(prefix, attr)
+                return
+
+            if model_field.one_to_many or model_field.many_to_many:
+                self.prefetch(prefix + attr, model_field, serializer_field if last else None)
+                return
+
+            if model_field.concrete:
+                self.add_column(prefix, attr)
+                if last and serializer_field is not None and _reads_pk_only(serializer_field):
+                    return
+            prefix = self.join(prefix, attr, model_field.related_model)
+
+        if isinstance(serializer_field, serializers.BaseSerializer):
+            self.add_serializer(serializer_field, prefix)
+        else:
+            # Slug/string related fields, or a Meta.select_related hint.
+            self.load_all(prefix)
+
+    def add_field(self, serializer_field, prefix):
+        if isinstance(serializer_field, serializers.SerializerMethodField) or serializer_field.source == '*':
+            self.load_all(prefix)
+            return
+        self.follow(prefix, serializer_field.source_attrs, serializer_field)
+
+    def prefetch(self, path, model_field, serializer_field):
+        child = getattr(serializer_field, 'child', None)
+        if not isinstance(child, serializers.ModelSerializer):
+            self.plan.prefetch_related.append((path, None))
+            return
+
+        planner = _Planner(model_field.related_model)
+        planner.add_serializer(child)
+        if model_field.one_to_many:
+            # Prefetched rows are matched to their parent on the foreign key.
+            planner.add_column('', model_field.field.name)
+        self.plan.prefetch_related.append((path, planner.build()))
+
+
+def _reads_pk_only(serializer_field):
+    # PrimaryKeyRelatedField renders the foreign key column without loading the row.
+    return isinstance(serializer_field, serializers.RelatedField) and serializer_field.use_pk_only_optimization()
+
+
+@lru_cache(maxsize=None)
+def serializer_query_plan(serializer_class):
+    """The QueryPlan for rendering instances of serializer_class.Meta.model with it."""
+    serializer = serializer_class()
+    planner = _Planner(serializer.Meta.model)
+    planner.add_serializer(serializer)
+    return planner.build()
+
+
+class QueryPlanMixin:
+    """
+    Shape a generic view's GET queryset to what its serializer reads.
+
+    Applied in filter_queryset, so it covers list and retrieve views and
+    views with their own get_queryset. Writes keep full instances, since
+    saving a deferred instance would skip the unloaded columns.
+    """
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method in SAFE_METHODS:
+            queryset = serializer_query_plan(self.get_serializer_class()).apply(queryset)
+        return queryset
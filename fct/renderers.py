@@ -0,0 +1,108 @@
+"""
+Drop-in replacements for the djangorestframework_camel_case renderers that
+camelize response keys through fct.casing's cached, single-pass converter.
+
+FastCamelCaseJSONRenderer also encodes with orjson when it is installed.
+Its output is byte-for-byte what CamelCaseJSONRenderer produces: anything
+orjson would write differently (floats in exponent notation, NaN, non-str
+keys, integers over 64 bits, ...) is sent down the stdlib json path instead.
+"""
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from djangorestframework_camel_case.util import is_iterable
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+
+from .casing import camelize_key, camelize_keys
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# repr() and orjson agree on every float whose magnitude is in this range
+# (or zero); outside it repr() switches to exponent notation and orjson
+# spells exponents differently.
+ORJSON_FLOAT_RANGE = (1e-4, 1e16)
+
+
+class StdlibOnly(Exception):
+    """Raised for data whose orjson encoding would differ from json.dumps."""
+
+
+def _check_float(value):
+    if value and not ORJSON_FLOAT_RANGE[0] <= abs(value) < ORJSON_FLOAT_RANGE[1]:
+        raise StdlibOnly
+
+
+def camelize_for_orjson(data):
+    """camelize_keys() that also rejects values orjson can't encode like json.dumps."""
+    if isinstance(data, (str, int, type(None))):
+        return data
+    if isinstance(data, float):
+        _check_float(data)
+        return data
+    if isinstance(data, dict):
+        converted = {}
+        for key, value in data.items():
+            if isinstance(key, Promise):
+                key = force_str(key)
+            if not isinstance(key, str):
+                raise StdlibOnly
+            converted[camelize_key(key)] = camelize_for_orjson(value)
+        return converted
+    if isinstance(data, (list, tuple)):
+        return [camelize_for_orjson(item) for item in data]
+    if isinstance(data, Promise):
+        return force_str(data)
+    if is_iterable(data):
+        # Sets, generators, querysets: rare enough to leave to camelize().
+        raise StdlibOnly
+    # Dates, Decimals, UUIDs, ... go through the DRF encoder.
+    return data
+
+
+class CamelCaseJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(camelize_keys(data), accepted_media_type, renderer_context)
+
+
+class FastCamelCaseJSONRenderer(CamelCaseJSONRenderer):
+    # OPT_PASSTHROUGH_* hands these to the DRF encoder, which formats them
+    # differently from orjson (millisecond datetimes, 'Z' for UTC, ...).
+    orjson_options = (
+        orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS if orjson else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        encoder = self.encoder_class()
+
+        def default(obj):
+            value = encoder.default(obj)
+            if isinstance(value, float):
+                _check_float(value)
+            elif not isinstance(value, str):
+                # Containers from the encoder could hold anything; let json.dumps decide.
+                raise StdlibOnly
+            return value
+
+        try:
+            ret = orjson.dumps(camelize_for_orjson(data), default=default, option=self.orjson_options)
+        except (StdlibOnly, TypeError):
+            # orjson.JSONEncodeError is a TypeError.
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same escaping as JSONRenderer, so the output stays a JavaScript subset.
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class CamelCaseBrowsableAPIRenderer(BrowsableAPIRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(camelize_keys(data), accepted_media_type, renderer_context)
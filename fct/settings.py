@@ -10,7 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
-from decouple import config
+from decouple import Csv, config
 
 import os
 from pathlib import Path
@@ -172,9 +172,11 @@ REST_FRAMEWORK = {
         'django_filters.rest_framework.DjangoFilterBackend',
     ),
 
+    # FastCamelCaseJSONRenderer encodes with orjson when it is installed;
+    # set API_JSON_RENDERER=fct.renderers.CamelCaseJSONRenderer to opt out.
     'DEFAULT_RENDERER_CLASSES': (
-        'djangorestframework_camel_case.render.CamelCaseJSONRenderer',
-        'djangorestframework_camel_case.render.CamelCaseBrowsableAPIRenderer',
+        config('API_JSON_RENDERER', default='fct.renderers.FastCamelCaseJSONRenderer'),
+        'fct.renderers.CamelCaseBrowsableAPIRenderer',
     ),
 
     'DEFAULT_PARSER_CLASSES': (
@@ -183,8 +185,21 @@ REST_FRAMEWORK = {
         'fct.parsers.RecursiveCamelCaseJSONParser',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+
+    # Per-client limits for the public intake endpoints (views set throttle_scope)
+    'DEFAULT_THROTTLE_RATES': {
+        'contact': config('CONTACT_THROTTLE_RATE', default='20/hour'),
+        'leads': config('LEAD_THROTTLE_RATE', default='20/hour'),
+    },
 }
 
+# Repeated contact/lead submissions with the same email and content inside this
+# many seconds are not stored or emailed again (admin.intake).
+INTAKE_DEDUPE_WINDOW = config('INTAKE_DEDUPE_WINDOW', default=600, cast=int)
+
+# How long a booking Idempotency-Key and its stored response are kept (booking.idempotency).
+IDEMPOTENCY_KEY_TTL = config('IDEMPOTENCY_KEY_TTL', default=24 * 60 * 60, cast=int)
+
 # Camel case settings for nested object conversion
 JSON_UNDERSCOREIZE = {
     'no_underscore_before_number': True,
@@ -239,7 +254,8 @@ CSRF_TRUSTED_ORIGINS = [
 ]
 
 
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+# SMTP backend that keeps one authenticated connection per thread (see notifications.backends)
+EMAIL_BACKEND = "notifications.backends.PooledSMTPEmailBackend"
 EMAIL_FROM = config('AUTHEMAIL_DEFAULT_EMAIL_FROM')
 EMAIL_BCC = config('AUTHEMAIL_DEFAULT_EMAIL_BCC')
 EMAIL_HOST = config('AUTHEMAIL_EMAIL_HOST')
@@ -248,6 +264,22 @@ EMAIL_HOST_USER = config('AUTHEMAIL_EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('AUTHEMAIL_EMAIL_HOST_PASSWORD')
 EMAIL_USE_TLS = config("EMAIL_USE_TLS", default=True, cast=bool)
 EMAIL_TIMEOUT = 20
+EMAIL_POOL_CHECK_AFTER = 30
+EMAIL_POOL_MAX_AGE = 5 * 60
+
+# Outbox delivery (notifications.outbox): retries back off from EMAIL_OUTBOX_RETRY_DELAY
+# seconds, doubling per attempt; emails still failing after max attempts are marked dead.
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=8, cast=int)
+EMAIL_OUTBOX_RETRY_DELAY = config('EMAIL_OUTBOX_RETRY_DELAY', default=60, cast=int)
+
+# Admin digest (notifications.digest): with ADMIN_EMAIL_DIGEST on, admin emails are
+# collected and sent as one digest every ADMIN_EMAIL_DIGEST_INTERVAL seconds, except
+# for ADMIN_EMAIL_URGENT_EVENTS. ADMIN_EMAIL_DISABLED_EVENTS are never sent.
+# Event types are listed in notifications.models.AdminEvent.EVENT_TYPES.
+ADMIN_EMAIL_DIGEST = config('ADMIN_EMAIL_DIGEST', default=False, cast=bool)
+ADMIN_EMAIL_DIGEST_INTERVAL = config('ADMIN_EMAIL_DIGEST_INTERVAL', default=3600, cast=int)
+ADMIN_EMAIL_URGENT_EVENTS = config('ADMIN_EMAIL_URGENT_EVENTS', default='reservation', cast=Csv())
+ADMIN_EMAIL_DISABLED_EVENTS = config('ADMIN_EMAIL_DISABLED_EVENTS', default='', cast=Csv())
 
 
 # Frontend URL for email links
@@ -364,3 +396,18 @@ DATABASES = {
     }
 }
 
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# Cached data is invalidated by whichever process writes (web workers and management
+# commands), so every process must share one backend; the booking.E001 check rejects
+# per-process caches. docker-compose.yml points every service at Redis; without
+# CACHE_BACKEND the database cache is used, whose table migrations create.
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': config('CACHE_LOCATION', default='fct_cache'),
+    }
+}
@@ -0,0 +1,55 @@
+"""
+Test helpers shared across apps.
+
+QueryCountAssertions.assertListQueriesConstant() catches N+1 queries on a
+list endpoint. It grows the list, fetches it at each size with page_size
+raised to fit every row, and fails if the number of queries changes.
+"""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+LIST_SIZES = (1, 5)
+MAX_PAGE_SIZE = 100
+
+# For tests that count queries across cached reads: the production database
+# cache would add its own SELECTs. Tests run in one process, so sharing is moot.
+IN_PROCESS_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'fct-tests'},
+}
+
+
+class QueryCountAssertions:
+    """Mixin for TestCase classes with an API client on self.client."""
+
+    def assertListQueriesConstant(self, url, create_row, sizes=LIST_SIZES, data=None, **extra):
+        """
+        GET `url` with create_row(index) called until `sizes[i]` rows have
+        been added, for each size in turn. Every new row must show up in
+        the response, and the query count must be the same at every size.
+        """
+        params = {'page_size': MAX_PAGE_SIZE, **(data or {})}
+        created, counts, lengths = 0, [], []
+        for size in sizes:
+            while created < size:
+                create_row(created)
+                created += 1
+
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, params, **extra)
+            self.assertEqual(response.status_code, 200, response.content)
+
+            body = response.json()
+            results = body['results'] if isinstance(body, dict) else body
+            counts.append(len(queries))
+            lengths.append(len(results))
+            self.assertEqual(
+                counts[-1], counts[0],
+                f"{url} ran {counts[0]} queries for {sizes[0]} added row(s) and {counts[-1]} for {size}:\n"
+                + "\n".join(query['sql'] for query in queries.captured_queries),
+            )
+
+        self.assertEqual(
+            [length - lengths[0] for length in lengths],
+            [size - sizes[0] for size in sizes],
+            f"{url} did not list every added row",
+        )
@@ -1,28 +1,52 @@
-from django.test import TestCase, Client
+from django.core import mail
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, Client
 from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer as LibraryCamelCaseJSONRenderer
+from djangorestframework_camel_case.util import camelize, underscoreize
+from rest_framework import serializers
+from rest_framework.test import APIRequestFactory
+from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.settings import api_settings
+from rest_framework.utils.serializer_helpers import ReturnDict
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest import skipUnless
 from unittest.mock import patch
 import json
+import random
+import uuid
+
+from admin.models import ContactMessage
+from booking.models import Booking
+from booking.serializers import BookingDetailSerializer
+from notifications.models import OutboundEmail
+from notifications.serializers import DriverNotificationListSerializer
+from routes.models import Route
+from routes.serializers import RouteListSerializer, VehicleSerializer as RouteVehicleSerializer
+from .casing import KEY_CACHE_SIZE, camelize_key, camelize_keys, underscore_key, underscoreize_keys
+from .parsers import RecursiveCamelCaseFormParser, RecursiveCamelCaseJSONParser, RecursiveCamelCaseMultiPartParser
+from .query_plan import serializer_query_plan
+from .renderers import CamelCaseJSONRenderer, FastCamelCaseJSONRenderer, orjson
+from .serializers import ContactSerializer
 
 
 class ContactUsViewTest(TestCase):
     def setUp(self):
         self.client = Client()
         self.contact_url = reverse('contact-us')
+        cache.clear()
 
     def test_contact_us_get_request(self):
         """Test GET request to contact us endpoint"""
         response = self.client.get(self.contact_url)
         
-        self.assertEqual(response.status_code, 200)
-        self.assertIn('message', response.json())
-        self.assertIn('fields', response.json())
+        self.assertEqual(response.status_code, 405)
 
-    @patch('fct.views.send_mail')
-    def test_contact_us_post_success(self, mock_send_mail):
+    def test_contact_us_post_success(self):
         """Test successful contact form submission"""
-        # Mock the send_mail function to avoid actual email sending
-        mock_send_mail.return_value = 1
-        
         data = {
             'name': 'John Doe',
             'whatsapp_number': '+1234567890',
@@ -41,8 +65,72 @@ class ContactUsViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn('message', response.json())
         self.assertEqual(response.json()['message'], 'Contact form submitted successfully')
-        # Verify that send_mail was called
-        mock_send_mail.assert_called_once()
+        # Stored, and the email queued for the outbox worker rather than sent inline
+        self.assertTrue(ContactMessage.objects.filter(email='john@example.com').exists())
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.subject, 'Contact Us: Test Subject')
+        self.assertIn('This is a test message', email.body)
+
+    def test_contact_us_duplicate_submission_is_not_stored_twice(self):
+        """Test repeated submissions within the dedupe window"""
+        data = {
+            'name': 'John Doe',
+            'email': 'john@example.com',
+            'subject': 'Test Subject',
+            'message': 'This is a test message'
+        }
+        repeat = dict(data, email='JOHN@example.com', message='  This is a   test message ')
+
+        for payload in (data, repeat):
+            response = self.client.post(self.contact_url, data=json.dumps(payload), content_type='application/json')
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(ContactMessage.objects.count(), 1)
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+
+        response = self.client.post(
+            self.contact_url,
+            data=json.dumps(dict(data, message='A different question')),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ContactMessage.objects.count(), 2)
+
+    def test_contact_us_parallel_duplicate_is_not_stored_twice(self):
+        """Test a duplicate whose check ran before the first submission committed"""
+        data = {
+            'name': 'John Doe',
+            'email': 'john@example.com',
+            'subject': 'Test Subject',
+            'message': 'This is a test message'
+        }
+        self.client.post(self.contact_url, data=json.dumps(data), content_type='application/json')
+
+        with patch('admin.intake.find_recent_duplicate', return_value=None):
+            response = self.client.post(self.contact_url, data=json.dumps(data), content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ContactMessage.objects.count(), 1)
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+
+    @patch.object(ScopedRateThrottle, 'THROTTLE_RATES', {'contact': '2/min'})
+    def test_contact_us_is_throttled(self):
+        """Test that a client cannot flood the contact endpoint"""
+        for i in range(3):
+            response = self.client.post(
+                self.contact_url,
+                data=json.dumps({
+                    'name': 'John Doe',
+                    'email': 'john@example.com',
+                    'subject': f'Subject {i}',
+                    'message': 'This is a test message'
+                }),
+                content_type='application/json'
+            )
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(ContactMessage.objects.count(), 2)
 
     def test_contact_us_post_missing_fields(self):
         """Test contact form submission with missing required fields"""
@@ -73,4 +161,224 @@ class ContactUsViewTest(TestCase):
         )
         
         self.assertEqual(response.status_code, 400)
-        self.assertIn('error', response.json())
\ No newline at end of file
+        self.assertIn('error', response.json())
+
+def reference_recursive_underscoreize(data):
+    """recursive_underscoreize as it was before fct.casing: underscoreize at every level."""
+    if isinstance(data, dict):
+        return {key: reference_recursive_underscoreize(value) for key, value in underscoreize(data).items()}
+    if isinstance(data, list):
+        return [reference_recursive_underscoreize(item) for item in data]
+    return data
+
+
+class CaseConversionTest(SimpleTestCase):
+    """The cached single-pass converters must match djangorestframework_camel_case."""
+
+    KEYS = [
+        "vehicleOptions", "vehicle_options", "faqs", "maxPassengers", "max_passengers", "HTMLBody",
+        "addressLine2", "address_line_2", "x1Y", "_private", "trailing_", "a__b", "", "id", "ÉtéKey", 3,
+    ]
+
+    def _payload(self, rng, depth=0):
+        choice = rng.randrange(6 if depth < 4 else 3)
+        if choice == 0:
+            return rng.choice([1, 2.5, None, True, "text", "snake_case_value", Decimal("1.10")])
+        if choice in (1, 2):
+            return rng.choice(["camelValue", "", "10:30"])
+        if choice == 3:
+            return [self._payload(rng, depth + 1) for _ in range(rng.randint(0, 3))]
+        if choice == 4:
+            return tuple(self._payload(rng, depth + 1) for _ in range(rng.randint(0, 2)))
+        return {rng.choice(self.KEYS): self._payload(rng, depth + 1) for _ in range(rng.randint(0, 5))}
+
+    def test_underscoreize_matches_previous_recursive_underscoreize(self):
+        rng = random.Random(2018)
+        for _ in range(2000):
+            payload = {str(rng.choice(self.KEYS)): self._payload(rng) for _ in range(rng.randint(0, 6))}
+            self.assertEqual(
+                json.dumps(underscoreize_keys(payload), default=str),
+                json.dumps(reference_recursive_underscoreize(payload), default=str),
+                payload,
+            )
+
+    def test_camelize_matches_library(self):
+        rng = random.Random(2019)
+        for _ in range(2000):
+            payload = self._payload(rng)
+            self.assertEqual(
+                json.dumps(camelize_keys(payload), default=str),
+                json.dumps(camelize(payload), default=str),
+                payload,
+            )
+
+    def test_camelize_keeps_serializer_on_return_dict(self):
+        serializer = ContactSerializer()
+        data = ReturnDict({"whatsapp_number": "1"}, serializer=serializer)
+
+        converted = camelize_keys(data)
+
+        self.assertEqual(converted, {"whatsappNumber": "1"})
+        self.assertIs(converted.serializer, serializer)
+
+    def test_key_caches_are_bounded(self):
+        self.assertEqual(underscore_key.cache_info().maxsize, KEY_CACHE_SIZE)
+        self.assertEqual(camelize_key.cache_info().maxsize, KEY_CACHE_SIZE)
+
+    def test_renderer_matches_library_renderer(self):
+        data = [
+            {"route_id": "fct1", "vehicle_options": [{"max_passengers": 3, "ideal_for": "Couples"}], "faqs": []},
+            {"route_id": "fct2", "vehicle_options": [], "faqs": [{"question": "Q", "answer": "A"}]},
+        ]
+
+        self.assertEqual(CamelCaseJSONRenderer().render(data), LibraryCamelCaseJSONRenderer().render(data))
+
+    def test_parsers_convert_nested_keys(self):
+        factory = APIRequestFactory()
+        payload = {"vehicleOptions": [{"maxPassengers": 3, "idealFor": "Couples"}], "fromLocation": "Larnaca"}
+
+        parsed = RecursiveCamelCaseJSONParser().parse(BytesIO(json.dumps(payload).encode()))
+        self.assertEqual(parsed, {"vehicle_options": [{"max_passengers": 3, "ideal_for": "Couples"}], "from_location": "Larnaca"})
+
+        form = RecursiveCamelCaseFormParser().parse(BytesIO(b"fromLocation=Larnaca&toLocation=A&toLocation=B"))
+        self.assertEqual(form.getlist("to_location"), ["A", "B"])
+        self.assertEqual(form["from_location"], "Larnaca")
+
+        request = factory.post("/", {"fromLocation": "Larnaca", "sedanPrice": "70"})
+        result = RecursiveCamelCaseMultiPartParser().parse(
+            BytesIO(request.body), request.META["CONTENT_TYPE"], {"request": request}
+        )
+        self.assertEqual(result.data, {"from_location": "Larnaca", "sedan_price": "70"})
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    """FastCamelCaseJSONRenderer must produce exactly the bytes CamelCaseJSONRenderer does."""
+
+    TEXT = "aé  \x00\x1f\"\\/\n\t€😀"
+
+    def _value(self, rng, depth=0):
+        choice = rng.randrange(12 if depth < 4 else 9)
+        if choice == 0:
+            return rng.choice([None, True, False, 0, -1, 2 ** 63, 2 ** 64, -(2 ** 63) - 1])
+        if choice == 1:
+            exponent = rng.uniform(-8, 20)
+            return rng.choice([1, -1]) * 10 ** exponent
+        if choice == 2:
+            return rng.choice([0.0, -0.0, 1e-4, 1e16, 9999999999999998.0, 70.5, float("nan"), float("inf")])
+        if choice == 3:
+            return "".join(rng.choice(self.TEXT) for _ in range(rng.randint(0, 8)))
+        if choice == 4:
+            return rng.choice([Decimal("70.50"), Decimal("1E+20"), uuid.UUID(int=rng.getrandbits(128))])
+        if choice == 5:
+            return rng.choice([
+                datetime(2026, 6, 1, 10, 30, 15, 123456),
+                datetime(2026, 6, 1, 10, 30, tzinfo=dt_timezone.utc),
+                date(2026, 6, 1), time(10, 30, 0, 500), timedelta(minutes=90),
+            ])
+        if choice == 6:
+            return gettext_lazy("Booking")
+        if choice == 7:
+            return rng.randint(-10 ** 6, 10 ** 6)
+        if choice == 8:
+            return rng.choice(["", "snake_case", "10:30"])
+        if choice == 9:
+            return [self._value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+        if choice == 10:
+            return tuple(self._value(rng, depth + 1) for _ in range(rng.randint(0, 2)))
+        keys = ["booking_id", "vehicle_options", "amount_paid", "faqs", "a__b", "_x", "é_key", 1, gettext_lazy("lazy_key")]
+        return {rng.choice(keys): self._value(rng, depth + 1) for _ in range(rng.randint(0, 5))}
+
+    def _render(self, renderer, data, media_type=None):
+        try:
+            return renderer.render(data, media_type)
+        except Exception as exc:
+            return type(exc)
+
+    def assertSameRendering(self, data, media_type=None):
+        self.assertEqual(
+            self._render(FastCamelCaseJSONRenderer(), data, media_type),
+            self._render(CamelCaseJSONRenderer(), data, media_type),
+            data,
+        )
+
+    def test_matches_stdlib_renderer_for_random_payloads(self):
+        rng = random.Random(2020)
+        for _ in range(3000):
+            self.assertSameRendering(self._value(rng))
+
+    def test_matches_stdlib_renderer_without_orjson(self):
+        rng = random.Random(2021)
+        with patch("fct.renderers.orjson", None):
+            for _ in range(300):
+                self.assertSameRendering(self._value(rng))
+
+    def test_matches_stdlib_renderer_when_indented(self):
+        self.assertSameRendering({"booking_id": "FCT1", "amount_paid": 50.5}, "application/json; indent=4")
+
+    def test_unsupported_values_fall_back(self):
+        self.assertSameRendering({"ids": {1, 2}, "big": 2 ** 70, "nested": [[[[[]]]]] * 300})
+        self.assertEqual(FastCamelCaseJSONRenderer().render(None), b"")
+
+    @skipUnless(orjson, "orjson is not installed")
+    def test_uses_orjson_when_installed(self):
+        with patch("fct.renderers.orjson.dumps", wraps=orjson.dumps) as dumps:
+            FastCamelCaseJSONRenderer().render({"booking_id": "FCT1"})
+        dumps.assert_called_once()
+
+    def test_default_renderer_is_fast_renderer(self):
+        self.assertEqual(api_settings.DEFAULT_RENDERER_CLASSES[0], FastCamelCaseJSONRenderer)
+
+
+class QueryPlanTest(SimpleTestCase):
+    """serializer_query_plan() derives joins, prefetches and columns from serializer fields."""
+
+    def test_nested_serializers_are_joined_and_pruned(self):
+        plan = serializer_query_plan(BookingDetailSerializer)
+
+        self.assertCountEqual(
+            plan.select_related,
+            ["route", "vehicle", "driver", "transfer_information", "passenger_information"],
+        )
+        self.assertIn("transfer_information__flight_number", plan.only)
+        self.assertIn("route", plan.only)
+        self.assertNotIn("route__body", plan.only)
+        self.assertNotIn("outbound_start", plan.only)
+
+    def test_primary_key_fields_read_the_foreign_key_column(self):
+        class BookingRouteSerializer(serializers.ModelSerializer):
+            class Meta:
+                model = Booking
+                fields = ["booking_id", "route"]
+
+        plan = serializer_query_plan(BookingRouteSerializer)
+
+        self.assertEqual(plan.select_related, [])
+        self.assertEqual(plan.only, ["booking_id", "route"])
+
+    def test_many_nested_serializers_are_prefetched_with_their_own_plan(self):
+        class RouteWithOptionsSerializer(serializers.ModelSerializer):
+            vehicle_options = RouteVehicleSerializer(many=True, read_only=True)
+
+            class Meta:
+                model = Route
+                fields = ["route_id", "vehicle_options"]
+
+        plan = serializer_query_plan(RouteWithOptionsSerializer)
+
+        [(path, child)] = plan.prefetch_related
+        self.assertEqual(path, "vehicle_options")
+        self.assertIn("route", child.only)
+        self.assertIn("fixed_price", child.only)
+
+    def test_method_fields_load_the_whole_model_and_use_meta_hints(self):
+        plan = serializer_query_plan(RouteListSerializer)
+
+        self.assertIn("reminder", plan.only)
+        self.assertEqual(plan.prefetch_related, [("vehicle_options", None), ("faqs", None)])
+
+    def test_dotted_sources_are_joined(self):
+        plan = serializer_query_plan(DriverNotificationListSerializer)
+
+        self.assertEqual(plan.select_related, ["booking"])
+        self.assertIn("booking__booking_id", plan.only)
+        self.assertNotIn("message", plan.only)
@@ -1,11 +1,13 @@
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.views.generic import TemplateView
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
 from fct.views import LogViewerView
 from fct.views import ContactUsView
+from routes.images import IMAGE_DERIVATIVE_DIR
+from routes.views import serve_image_derivative
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -36,4 +38,12 @@ urlpatterns = [
 ]
 
 if settings.DEBUG:
+    # Derivative names are content-hashed, so they are served as immutable.
+    urlpatterns += [
+        re_path(
+            rf"^{settings.MEDIA_URL.lstrip('/')}(?P<path>{IMAGE_DERIVATIVE_DIR}/.+)$",
+            serve_image_derivative,
+            name='route-image-derivative',
+        ),
+    ]
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,7 +1,137 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+import secrets
+import string
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, router, transaction
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination
+from rest_framework.utils.urls import remove_query_param
+
+PUBLIC_ID_ALPHABET = string.ascii_lowercase + string.digits
+PUBLIC_ID_LENGTH = 10
+PUBLIC_ID_ATTEMPTS = 5
 
 
 class CustomPagination(PageNumberPagination):
     page_size = 30
     page_size_query_param = 'page_size'
-    max_page_size = 100
\ No newline at end of file
+    max_page_size = 100
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination that seeks on every ordering field.
+
+    DRF's CursorPagination keeps only the first ordering field in the cursor
+    and steps over ties with an OFFSET. Here the cursor carries the boundary
+    row's value for each field, so every page is a single range scan of the
+    ordering index, however deep it is. Rows inserted meanwhile never shift
+    a page. `ordering` must name concrete fields of the model and end in a
+    unique one (normally pk). There is no total count.
+    """
+    page_size = 30
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-pk',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.fields = [
+            queryset.model._meta.pk if name == 'pk' else queryset.model._meta.get_field(name)
+            for name in (order.lstrip('-') for order in self.ordering)
+        ]
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(order[1:] if order.startswith('-') else f'-{order}' for order in ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(self.seek_filter(ordering, self.decode_position(self.cursor.position)))
+
+        # One extra row tells whether there is another page in this direction.
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def seek_filter(self, ordering, values):
+        """Rows after `values` in `ordering`: (a > x) OR (a = x AND b > y) OR ..."""
+        condition = Q()
+        for index, order in enumerate(ordering):
+            lookup = 'lt' if order.startswith('-') else 'gt'
+            equal = {order.lstrip('-'): value for order, value in zip(ordering[:index], values)}
+            condition |= Q(**equal, **{f"{order.lstrip('-')}__{lookup}": values[index]})
+        return condition
+
+    def encode_position(self, instance):
+        return json.dumps([field.value_to_string(instance) for field in self.fields])
+
+    def decode_position(self, position):
+        try:
+            values = json.loads(position)
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise ValueError
+            return [field.to_python(value) for field, value in zip(self.fields, values)]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Paged back past the first row: start again from the top.
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self.encode_position(self.page[-1])))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self.encode_position(self.page[0])))
+
+
+def generate_public_id(prefix, length=PUBLIC_ID_LENGTH):
+    """Return `prefix` followed by `length` random lowercase letters and digits."""
+    return prefix + ''.join(secrets.choice(PUBLIC_ID_ALPHABET) for _ in range(length))
+
+
+def save_with_public_id(instance, field_name, prefix, save, *args, **kwargs):
+    """
+    Give a new instance a random public ID and insert it in a single write.
+
+    `save` is the model's parent save method. The ID is generated before the
+    INSERT, and the field's unique constraint catches the rare collision. The
+    insert then runs again with a fresh ID inside a savepoint, so an
+    enclosing transaction is not broken.
+    """
+    model = type(instance)
+    using = kwargs.get('using') or router.db_for_write(model, instance=instance)
+    if kwargs.get('update_fields') is not None:
+        # Older rows without an ID get one on their next save
+        kwargs['update_fields'] = set(kwargs['update_fields']) | {field_name}
+
+    for attempt in range(PUBLIC_ID_ATTEMPTS):
+        setattr(instance, field_name, generate_public_id(prefix))
+        try:
+            with transaction.atomic(using=using):
+                return save(*args, **kwargs)
+        except IntegrityError:
+            collided = model._default_manager.using(using).filter(
+                **{field_name: getattr(instance, field_name)}
+            ).exists()
+            if not collided or attempt == PUBLIC_ID_ATTEMPTS - 1:
+                raise
@@ -2,10 +2,12 @@ import os
 from django.conf import settings
 from django.http import HttpResponse, JsonResponse
 from django.views import View
-from django.core.mail import send_mail
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import ParseError
+from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.views import APIView
+from admin.intake import submit_contact_message
 from .serializers import ContactSerializer
 from rest_framework.response import Response
 from rest_framework import status
@@ -281,59 +283,35 @@ class ContactUsView(APIView):
     - email
     - subject
     - message
+
+    The submission is stored and the admin email queued in the outbox, so
+    the response does not wait on SMTP. Repeats inside the dedupe window are
+    accepted without storing or emailing them again.
     """
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'contact'
 
     def post(self, request):
         """
-        Handle POST request to send contact form data via email
+        Store the contact form submission and queue the admin email
         """
-        serializer = ContactSerializer(data=request.data)
-        serializer.is_valid()
-        
-        # Extract validated data
-        name = serializer.validated_data.get('name', '')
-        whatsapp_number = serializer.validated_data.get('whatsapp_number', '')
-        about = serializer.validated_data.get('about', '')
-        email = serializer.validated_data.get('email', '')
-        subject = serializer.validated_data.get('subject', '')
-        message = serializer.validated_data.get('message', '')
-        
-        # Prepare email content
-        email_subject = f"Contact Us: {subject}"
-        email_body = f"""New contact form submission:
-
-        Name: {name}
-        WhatsApp Number: {whatsapp_number}
-        About: {about}
-        Email: {email}
-
-        Message:
-        {message}"""
-        
         try:
-            # Send email to admin (using EMAIL_FROM as specified in settings)
-            admin_email = getattr(settings, 'EMAIL_FROM', getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@example.com'))
-            send_mail(
-                subject=email_subject,
-                message=email_body,
-                from_email=admin_email,
-                recipient_list=[admin_email],
-                fail_silently=False,
-            )
-            
+            serializer = ContactSerializer(data=request.data)
+        except ParseError as e:
             return Response(
-                {'message': 'Contact form submitted successfully'}, 
-                status=status.HTTP_200_OK
+                {'error': 'Invalid request body', 'details': str(e.detail)},
+                status=status.HTTP_400_BAD_REQUEST
             )
-        except Exception as e:
-            # Log the error for debugging
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Error sending contact form email: {str(e)}")
-            
+
+        if not serializer.is_valid():
             return Response(
-                {'error': 'Failed to send email. Please try again later.'}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {'error': 'Validation failed', 'details': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
             )
 
+        submit_contact_message(serializer.validated_data)
 
+        return Response(
+            {'message': 'Contact form submitted successfully'},
+            status=status.HTTP_200_OK
+        )
@@ -1,3 +1,29 @@
 from django.contrib import admin
+from django.utils import timezone
 
-# Register your models here.
+from .models import AdminEvent, OutboundEmail
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status']
+    search_fields = ['subject', 'recipients']
+    readonly_fields = ['created_at', 'sent_at', 'last_error']
+    actions = ['requeue']
+
+    @admin.action(description="Requeue selected emails")
+    def requeue(self, request, queryset):
+        queryset.exclude(status=OutboundEmail.STATUS_SENT).update(
+            status=OutboundEmail.STATUS_PENDING,
+            attempts=0,
+            next_attempt_at=timezone.now(),
+        )
+
+
+@admin.register(AdminEvent)
+class AdminEventAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'event_type', 'created_at', 'digested_at']
+    list_filter = ['event_type']
+    search_fields = ['subject']
+    readonly_fields = ['created_at', 'digested_at']
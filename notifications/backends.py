@@ -0,0 +1,144 @@
+"""
+Pooled SMTP email backend.
+
+Django's SMTP backend does a full TCP/STARTTLS/AUTH handshake for every
+send_mail() call and then closes the session. This backend keeps one
+authenticated connection per thread and lends it to every backend instance
+the thread creates. Consecutive emails in one request, across requests in a
+web worker, or across batches in the outbox worker all share one session.
+
+Before reuse, a connection idle for longer than EMAIL_POOL_CHECK_AFTER
+seconds is checked with NOOP. Connections older than EMAIL_POOL_MAX_AGE are
+recycled. A send that finds the session dropped before DATA reconnects and
+retries once. Once DATA has started the server may already have the
+message, so a failure from then on is raised to the caller (the outbox
+schedules its own retry) rather than risking a second copy.
+"""
+import smtplib
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail.backends.smtp import EmailBackend
+
+DEFAULT_CHECK_AFTER = 30
+DEFAULT_MAX_AGE = 5 * 60
+
+_pool = threading.local()
+
+
+class _PooledConnection:
+    def __init__(self, key, connection):
+        self.key = key
+        self.connection = connection
+        self.opened_at = self.last_used = time.monotonic()
+
+
+def close_pooled_connections():
+    """Close this thread's pooled SMTP connection, if any."""
+    pooled = getattr(_pool, 'smtp', None)
+    _pool.smtp = None
+    if pooled is not None:
+        try:
+            pooled.connection.quit()
+        except (smtplib.SMTPException, OSError):
+            pooled.connection.close()
+
+
+def _discard_pooled_connection():
+    pooled = getattr(_pool, 'smtp', None)
+    _pool.smtp = None
+    if pooled is not None:
+        pooled.connection.close()
+
+
+class _DataTrackingMixin:
+    """Records whether the current message has reached the DATA command."""
+    data_started = False
+
+    def mail(self, *args, **kwargs):
+        self.data_started = False
+        return super().mail(*args, **kwargs)
+
+    def data(self, msg):
+        self.data_started = True
+        return super().data(msg)
+
+
+class _SMTP(_DataTrackingMixin, smtplib.SMTP):
+    pass
+
+
+class _SMTP_SSL(_DataTrackingMixin, smtplib.SMTP_SSL):
+    pass
+
+
+class PooledSMTPEmailBackend(EmailBackend):
+    """SMTP backend that reuses one connection per thread instead of reconnecting per call."""
+
+    @property
+    def connection_class(self):
+        return _SMTP_SSL if self.use_ssl else _SMTP
+
+    def _pool_key(self):
+        return (self.host, self.port, self.username, self.use_tls, self.use_ssl)
+
+    def _is_usable(self, pooled):
+        now = time.monotonic()
+        if pooled.key != self._pool_key() or pooled.connection.sock is None:
+            return False
+        if now - pooled.opened_at > getattr(settings, 'EMAIL_POOL_MAX_AGE', DEFAULT_MAX_AGE):
+            return False
+        if now - pooled.last_used > getattr(settings, 'EMAIL_POOL_CHECK_AFTER', DEFAULT_CHECK_AFTER):
+            try:
+                return pooled.connection.noop()[0] == 250
+            except (smtplib.SMTPException, OSError):
+                return False
+        return True
+
+    def open(self):
+        if self.connection:
+            return False
+
+        pooled = getattr(_pool, 'smtp', None)
+        if pooled is not None:
+            if self._is_usable(pooled):
+                self.connection = pooled.connection
+                return False
+            _discard_pooled_connection()
+
+        created = super().open()
+        if created:
+            _pool.smtp = _PooledConnection(self._pool_key(), self.connection)
+        return created
+
+    def close(self):
+        """Hand the pooled connection back instead of closing it."""
+        pooled = getattr(_pool, 'smtp', None)
+        if pooled is not None and self.connection is pooled.connection:
+            pooled.last_used = time.monotonic()
+            self.connection = None
+        super().close()
+
+    def _send(self, email_message):
+        fail_silently, self.fail_silently = self.fail_silently, False
+        try:
+            try:
+                return super()._send(email_message)
+            except smtplib.SMTPException:
+                # smtplib drops the socket when the server hangs up (idle
+                # timeout, 421); anything else is a real delivery error. A
+                # hang-up after DATA started may follow a delivered message.
+                connection = self.connection
+                if connection is None or connection.sock is not None or connection.data_started:
+                    raise
+            _discard_pooled_connection()
+            self.connection = None
+            self.open()
+            return super()._send(email_message)
+        except OSError:
+            if not fail_silently:
+                raise
+            return False
+        finally:
+            self.fail_silently = fail_silently
@@ -0,0 +1,99 @@
+"""
+Admin email digest.
+
+Every admin-facing email (new bookings, updates, assignments, route,
+vehicle and driver changes) is tagged with an AdminEvent event type and
+passed through hold_admin_event() before it is queued:
+
+- types in ADMIN_EMAIL_DISABLED_EVENTS are dropped,
+- with ADMIN_EMAIL_DIGEST on, types not listed in ADMIN_EMAIL_URGENT_EVENTS
+  are stored as AdminEvent rows,
+- everything else is sent right away, as before.
+
+The send_admin_digest worker calls send_admin_digest() once every
+ADMIN_EMAIL_DIGEST_INTERVAL seconds. It rolls the pending events into one
+email, grouped by type, and queues it in the outbox in the same transaction
+that marks the events digested.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+from .models import AdminEvent
+from .outbox import enqueue_email
+from .rendering import detail_html, escape, link, message_html, render_email
+
+ADMIN_DASHBOARD_URL = "https://firstclasstransfers.eu/admin/login"
+DEFAULT_DIGEST_INTERVAL = 60 * 60
+DEFAULT_URGENT_EVENTS = ('reservation',)
+DIGEST_MAX_EVENTS = 500
+
+
+def digest_enabled():
+    return getattr(settings, 'ADMIN_EMAIL_DIGEST', False)
+
+
+def get_digest_interval():
+    return getattr(settings, 'ADMIN_EMAIL_DIGEST_INTERVAL', DEFAULT_DIGEST_INTERVAL)
+
+
+def hold_admin_event(event_type, subject, detail):
+    """
+    Decide how an admin email of this type is delivered.
+
+    Returns True if the email must not be sent now, either because the type
+    is opted out or because the event was stored for the digest. Returns
+    False if the caller should send it immediately.
+    """
+    if event_type in getattr(settings, 'ADMIN_EMAIL_DISABLED_EVENTS', ()):
+        return True
+    if not digest_enabled() or event_type in getattr(settings, 'ADMIN_EMAIL_URGENT_EVENTS', DEFAULT_URGENT_EVENTS):
+        return False
+    AdminEvent.objects.create(event_type=event_type, subject=subject, detail=detail)
+    return True
+
+
+def _event_html(event):
+    when = timezone.localtime(event.created_at).strftime('%B %d, %Y %I:%M %p')
+    return mark_safe(f"<strong>{escape(event.subject)}</strong> ({when})<br>{event.detail}")
+
+
+def build_digest(events):
+    """Return (subject, html_body) for a digest of the given events."""
+    labels = dict(AdminEvent.EVENT_TYPES)
+    order = {event_type: position for position, (event_type, _) in enumerate(AdminEvent.EVENT_TYPES)}
+    grouped = {}
+    for event in events:
+        grouped.setdefault(event.event_type, []).append(event)
+    event_types = sorted(grouped, key=lambda event_type: order.get(event_type, len(order)))
+
+    subject = f"Admin Digest – {len(events)} new event{'s' if len(events) != 1 else ''}"
+    message = message_html(
+        "Here is a summary of the activity on the First Class Transfers platform since the last digest.",
+        detail_html([(labels.get(event_type, event_type), len(grouped[event_type])) for event_type in event_types]),
+        link(ADMIN_DASHBOARD_URL),
+    )
+    detail = mark_safe('<br><br>'.join(
+        f"<strong>{escape(labels.get(event_type, event_type))}</strong><br><br>"
+        + '<br><br>'.join(_event_html(event) for event in grouped[event_type])
+        for event_type in event_types
+    ))
+    return subject, render_email(subject, "Hello Admin", message, detail)
+
+
+def send_admin_digest(limit=DIGEST_MAX_EVENTS):
+    """Queue one digest email for up to `limit` pending events. Returns the number of events digested."""
+    with transaction.atomic():
+        events = list(
+            AdminEvent.objects.filter(digested_at__isnull=True)
+            .order_by('created_at', 'pk')
+            .select_for_update(skip_locked=True)[:limit]
+        )
+        if not events:
+            return 0
+
+        subject, html_body = build_digest(events)
+        enqueue_email(subject, [settings.EMAIL_FROM], html_body=html_body)
+        AdminEvent.objects.filter(pk__in=[event.pk for event in events]).update(digested_at=timezone.now())
+    return len(events)
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.digest import DIGEST_MAX_EVENTS, get_digest_interval, send_admin_digest
+
+
+class Command(BaseCommand):
+    help = "Roll pending admin events into one digest email per interval."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=None, help="Seconds between digests (default: ADMIN_EMAIL_DIGEST_INTERVAL)")
+        parser.add_argument('--max-events', type=int, default=DIGEST_MAX_EVENTS, help=f"Events per digest email (default: {DIGEST_MAX_EVENTS})")
+        parser.add_argument('--once', action='store_true', help="Send one digest of the pending events and exit.")
+
+    def handle(self, *args, **options):
+        interval = options['interval'] if options['interval'] is not None else get_digest_interval()
+        max_events = options['max_events']
+
+        try:
+            while True:
+                digested = send_admin_digest(max_events)
+                if digested:
+                    self.stdout.write(f"Queued a digest of {digested} event(s).")
+
+                if digested < max_events:
+                    if options['once']:
+                        return
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping admin digest worker.")
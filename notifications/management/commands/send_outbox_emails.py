@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.backends import close_pooled_connections
+from notifications.outbox import send_due_emails
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails, retrying failures with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help="Emails claimed per batch (default: 100)")
+        parser.add_argument('--interval', type=float, default=5, help="Seconds to sleep when the outbox is empty (default: 5)")
+        parser.add_argument('--once', action='store_true', help="Drain the due emails once and exit.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        try:
+            while True:
+                sent, failed = send_due_emails(batch_size)
+                if sent or failed:
+                    self.stdout.write(f"Sent {sent} email(s), {failed} failed.")
+
+                if sent + failed < batch_size:
+                    if options['once']:
+                        return
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping outbox worker.")
+        finally:
+            close_pooled_connections()
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-17 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_outboundemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdminEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('reservation', 'New Reservation'), ('booking_confirmation', 'Booking Received'), ('booking_updated', 'Booking Updated'), ('booking_assigned', 'Driver & Vehicle Assigned'), ('booking_status', 'Booking Status Changed'), ('route_created', 'Route Created'), ('route_updated', 'Route Updated'), ('vehicle_created', 'Vehicle Added'), ('vehicle_updated', 'Vehicle Updated'), ('vehicle_deleted', 'Vehicle Deleted'), ('driver_created', 'Driver Added'), ('driver_updated', 'Driver Updated'), ('driver_deleted', 'Driver Deleted'), ('user_created', 'User Created')], max_length=30)),
+                ('subject', models.CharField(max_length=255)),
+                ('detail', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('digested_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Admin Event',
+                'verbose_name_plural': 'Admin Events',
+                'ordering': ['created_at', 'pk'],
+                'indexes': [models.Index(fields=['digested_at', 'created_at'], name='admin_event_pending_idx')],
+            },
+        ),
+    ]
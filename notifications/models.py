@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -55,3 +56,88 @@ class DriverNotification(models.Model):
         if not self.read:
             self.read = True
             self.save(update_fields=['read'])
+
+
+class OutboundEmail(models.Model):
+    """
+    Transactional email outbox.
+
+    Rows are written in the same transaction as the change they announce and
+    delivered later by the send_outbox_emails worker, so requests never wait
+    on SMTP. Failed sends are retried with backoff until max attempts, then
+    parked as dead for inspection.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_DEAD = 'dead'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_DEAD, 'Dead'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField(blank=True, default='')
+    html_body = models.TextField(blank=True, default='')
+    from_email = models.CharField(max_length=255)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Outbound Email'
+        verbose_name_plural = 'Outbound Emails'
+        ordering = ['next_attempt_at', 'pk']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {', '.join(self.recipients)} ({self.status})"
+
+
+class AdminEvent(models.Model):
+    """
+    An admin notification held back for the admin digest.
+
+    With ADMIN_EMAIL_DIGEST on, non-urgent admin emails are stored here
+    instead of being queued one by one, and the send_admin_digest worker
+    rolls everything pending into a single email per interval.
+    """
+    EVENT_TYPES = [
+        ('reservation', 'New Reservation'),
+        ('booking_confirmation', 'Booking Received'),
+        ('booking_updated', 'Booking Updated'),
+        ('booking_assigned', 'Driver & Vehicle Assigned'),
+        ('booking_status', 'Booking Status Changed'),
+        ('route_created', 'Route Created'),
+        ('route_updated', 'Route Updated'),
+        ('vehicle_created', 'Vehicle Added'),
+        ('vehicle_updated', 'Vehicle Updated'),
+        ('vehicle_deleted', 'Vehicle Deleted'),
+        ('driver_created', 'Driver Added'),
+        ('driver_updated', 'Driver Updated'),
+        ('driver_deleted', 'Driver Deleted'),
+        ('user_created', 'User Created'),
+    ]
+
+    event_type = models.CharField(max_length=30, choices=EVENT_TYPES)
+    subject = models.CharField(max_length=255)
+    detail = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    digested_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Admin Event'
+        verbose_name_plural = 'Admin Events'
+        ordering = ['created_at', 'pk']
+        indexes = [
+            models.Index(fields=['digested_at', 'created_at'], name='admin_event_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_event_type_display()}: {self.subject}"
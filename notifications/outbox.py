@@ -0,0 +1,143 @@
+"""
+Transactional email outbox.
+
+enqueue_email() stores a message as an OutboundEmail row instead of talking
+to SMTP. Called inside a transaction it commits or rolls back together with
+the booking change it announces. The send_outbox_emails worker claims due rows,
+delivers them and records the outcome. Failed sends are retried with
+exponential backoff, and rows that still fail after
+EMAIL_OUTBOX_MAX_ATTEMPTS are marked dead.
+
+Claiming a row pushes its next_attempt_at forward by a lease. If a worker
+dies mid-send, the row becomes due again once the lease runs out, and
+parallel workers never pick the same row.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger('print')
+
+DEFAULT_MAX_ATTEMPTS = 8
+DEFAULT_RETRY_DELAY = 60
+MAX_RETRY_DELAY = 6 * 60 * 60
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+def get_retry_delay(attempts):
+    """Seconds to wait after the given number of failed attempts."""
+    base = getattr(settings, 'EMAIL_OUTBOX_RETRY_DELAY', DEFAULT_RETRY_DELAY)
+    return min(base * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def enqueue_email(subject, recipients, html_body='', body='', from_email=None):
+    """Queue an email for the outbox worker and return the OutboundEmail row."""
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        html_body=html_body,
+        from_email=from_email or settings.EMAIL_FROM,
+        recipients=list(recipients),
+    )
+
+
+def enqueue_emails(emails):
+    """Queue several (subject, recipients, html_body, from_email) emails with one INSERT."""
+    return OutboundEmail.objects.bulk_create([
+        OutboundEmail(
+            subject=subject,
+            html_body=html_body,
+            from_email=from_email or settings.EMAIL_FROM,
+            recipients=list(recipients),
+        )
+        for subject, recipients, html_body, from_email in emails
+    ])
+
+
+def claim_due_emails(limit):
+    """Lease up to `limit` due emails to this worker and count the attempt."""
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutboundEmail.objects.filter(
+                status=OutboundEmail.STATUS_PENDING,
+                next_attempt_at__lte=now,
+            ).order_by('next_attempt_at', 'pk').select_for_update(skip_locked=True)[:limit]
+        )
+        if emails:
+            OutboundEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+                attempts=F('attempts') + 1,
+                next_attempt_at=now + CLAIM_LEASE,
+            )
+    for email in emails:
+        email.attempts += 1
+    return emails
+
+
+def build_message(email, connection=None):
+    message = EmailMultiAlternatives(
+        email.subject,
+        email.body,
+        email.from_email,
+        email.recipients,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def mark_sent(email):
+    email.status = OutboundEmail.STATUS_SENT
+    email.sent_at = timezone.now()
+    email.last_error = ''
+    email.save(update_fields=['status', 'sent_at', 'last_error'])
+
+
+def mark_failed(email, error):
+    """Schedule a retry, or mark the email dead once it is out of attempts."""
+    max_attempts = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+    email.last_error = f"{type(error).__name__}: {error}"
+    if email.attempts >= max_attempts:
+        email.status = OutboundEmail.STATUS_DEAD
+        logger.error(f"Outbound email {email.pk} is dead after {email.attempts} attempts: {email.last_error}")
+    else:
+        email.next_attempt_at = timezone.now() + timedelta(seconds=get_retry_delay(email.attempts))
+    email.save(update_fields=['status', 'next_attempt_at', 'last_error'])
+
+
+def send_due_emails(limit=100):
+    """Deliver one batch of due emails over a single connection. Returns (sent, failed)."""
+    emails = claim_due_emails(limit)
+    if not emails:
+        return 0, 0
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as exc:
+        for email in emails:
+            mark_failed(email, exc)
+        return 0, len(emails)
+
+    sent = failed = 0
+    try:
+        for email in emails:
+            try:
+                build_message(email, connection).send()
+            except Exception as exc:
+                mark_failed(email, exc)
+                failed += 1
+            else:
+                mark_sent(email)
+                sent += 1
+    finally:
+        connection.close()
+    return sent, failed
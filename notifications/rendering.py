@@ -0,0 +1,189 @@
+"""
+Email rendering.
+
+email.html is compiled once per process into its static HTML chunks and
+the variable slots between them, so rendering a message is one str.join
+over pre-escaped values rather than a walk of the template's node tree.
+The result matches Template.render(): values are conditionally escaped,
+so strings marked safe pass through and everything else is escaped.
+
+Messages are built from structured content instead of hand-written HTML:
+detail_html() takes (label, value) rows, message_html() takes paragraphs
+and link()/heading()/changes_list() cover the recurring fragments. All of
+them escape the data they are given.
+
+Inside email_batch(), queued emails are collected and rendered together
+when the block exits, then written to the outbox with one INSERT. Work
+shared by the batch, such as a booking's summary rows, is computed once
+through batch_memo(). As with an email queued on its own, a failure to
+render or queue is logged and never fails the change the email is about.
+"""
+import html
+import logging
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.template import engines
+from django.template.base import TextNode, Variable, VariableNode
+from django.utils.safestring import mark_safe
+
+EMAIL_TEMPLATE = 'email.html'
+
+logger = logging.getLogger('print')
+
+_local = threading.local()
+
+
+def escape(value):
+    """
+    conditional_escape() without the lazy-string wrapper, which dominates its
+    cost on hot paths. Safe strings pass through, everything else is escaped.
+    """
+    if hasattr(value, '__html__'):
+        return value.__html__()
+    return html.escape(str(value))
+
+
+def _is_plain_name(expression):
+    var = expression.var
+    return not expression.filters and isinstance(var, Variable) and var.lookups and len(var.lookups) == 1
+
+
+class CompiledEmailTemplate:
+    """A template reduced to static chunks and variable slots."""
+
+    def __init__(self, template_name):
+        self.template = engines['django'].get_template(template_name)
+        self.parts = self._compile(self.template.template.nodelist)
+
+    @staticmethod
+    def _compile(nodelist):
+        parts = []
+        for node in nodelist:
+            if isinstance(node, TextNode):
+                parts.append((True, node.s))
+            elif isinstance(node, VariableNode) and _is_plain_name(node.filter_expression):
+                parts.append((False, node.filter_expression.var.var))
+            else:
+                # Tags or filters: keep Django's renderer for this template.
+                return None
+        return parts
+
+    def render(self, context):
+        if self.parts is None:
+            return self.template.render(context)
+        return ''.join(
+            value if static else escape(context.get(value, ''))
+            for static, value in self.parts
+        )
+
+
+@lru_cache(maxsize=None)
+def get_email_template(template_name=EMAIL_TEMPLATE):
+    return CompiledEmailTemplate(template_name)
+
+
+def render_email(subject, greeting, message, detail, template_name=EMAIL_TEMPLATE):
+    """Render the standard email layout. message and detail are trusted HTML."""
+    return get_email_template(template_name).render({
+        'title': subject,
+        'greeting': greeting,
+        'message': mark_safe(message),
+        'detail': mark_safe(detail),
+    })
+
+
+def link(url, text=None):
+    return mark_safe(f"<a href='{escape(url)}'>{escape(text or url)}</a>")
+
+
+def heading(title, text):
+    """A bold heading line followed by a paragraph."""
+    return mark_safe(f"<strong>{escape(title)}</strong><br>{escape(text)}")
+
+
+def message_html(*paragraphs):
+    """Join paragraphs with a blank line; plain strings are escaped, None/'' skipped."""
+    return mark_safe('<br><br>'.join(escape(p) for p in paragraphs if p))
+
+
+def changes_list(changes):
+    """The 'Changes made' bullet list used by update emails, or '' without changes."""
+    if not changes:
+        return ''
+    return mark_safe('<strong>Changes made:</strong><br>' + '<br>'.join(f"• {escape(c)}" for c in changes))
+
+
+def detail_html(*sections):
+    """Render sections of (label, value) rows as '<strong>Label:</strong> value' lines, a blank line apart."""
+    return mark_safe('<br><br>'.join(
+        '<br>'.join(f"<strong>{escape(label)}:</strong> {escape(value)}" for label, value in rows)
+        for rows in sections
+        if rows
+    ))
+
+
+class EmailBatch:
+    def __init__(self):
+        self.emails = []
+        self.memo = {}
+
+
+@contextmanager
+def email_batch():
+    """Collect emails queued in the block and render + enqueue them together on exit."""
+    from .outbox import enqueue_emails
+
+    if getattr(_local, 'batch', None) is not None:
+        # Nested: the outer batch flushes everything.
+        yield _local.batch
+        return
+
+    batch = _local.batch = EmailBatch()
+    try:
+        yield batch
+    finally:
+        _local.batch = None
+
+    # The callers queued inside suppress(Exception); failures here get the same treatment.
+    emails = []
+    for subject, greeting, message, detail, recipient, from_email in batch.emails:
+        try:
+            emails.append((subject, [recipient], render_email(subject, greeting, message, detail), from_email))
+        except Exception:
+            logger.exception(f"Could not render email '{subject}' to {recipient}")
+    if not emails:
+        return
+    try:
+        # A savepoint, so a failed INSERT leaves the caller's transaction usable.
+        with transaction.atomic():
+            enqueue_emails(emails)
+    except Exception:
+        logger.exception(f"Could not queue {len(emails)} email(s)")
+
+
+def batch_memo(key, factory):
+    """Return factory(), computed once per key for the current email batch."""
+    batch = getattr(_local, 'batch', None)
+    if batch is None:
+        return factory()
+    if key not in batch.memo:
+        batch.memo[key] = factory()
+    return batch.memo[key]
+
+
+def queue_html_email(subject, greeting, message, detail, recipient_email, from_email=None):
+    """Queue one email, deferring rendering to the enclosing email_batch() if there is one."""
+    from .outbox import enqueue_email
+
+    from_email = from_email or settings.EMAIL_FROM
+    batch = getattr(_local, 'batch', None)
+    if batch is not None:
+        batch.emails.append((subject, greeting, message, detail, recipient_email, from_email))
+        return
+
+    html_body = render_email(subject, greeting, message, detail)
+    enqueue_email(subject, [recipient_email], html_body=html_body, from_email=from_email)
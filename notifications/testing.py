@@ -0,0 +1,139 @@
+"""
+A local SMTP stand-in for tests and benchmarks.
+
+LocalSMTPServer speaks enough SMTP (EHLO/HELO, AUTH PLAIN, MAIL, RCPT, DATA,
+RSET, NOOP, QUIT) for smtplib and Django's SMTP backend. It runs in a
+background thread on 127.0.0.1 and records every accepted message and
+connection. Set fail_next to reject the next N messages with a 451, the
+transient error a busy relay returns. Set disconnect_next to answer the next
+N messages with 421 and hang up, as a relay does when it drops an idle
+session. Set disconnect_after_data_next to accept the next N messages and
+hang up before confirming them, so the client cannot tell they arrived.
+handshake_delay (seconds) holds back the greeting to model the
+TCP/TLS/AUTH round trips of a remote relay.
+"""
+import socketserver
+import threading
+import time
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server.smtp
+        with server.lock:
+            server.connections += 1
+
+        if server.handshake_delay:
+            time.sleep(server.handshake_delay)
+        self.reply("220 localhost ESMTP stand-in")
+        envelope = {'from': None, 'to': []}
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            command, _, argument = raw.decode('utf-8', 'replace').rstrip('\r\n').partition(' ')
+            command = command.upper()
+
+            if command == 'EHLO':
+                self.wfile.write(b"250-localhost\r\n250-AUTH PLAIN\r\n250 8BITMIME\r\n")
+            elif command == 'HELO':
+                self.reply("250 localhost")
+            elif command == 'AUTH':
+                self.reply("235 Authentication successful")
+            elif command == 'MAIL':
+                with server.lock:
+                    dropped = server.disconnect_next > 0
+                    if dropped:
+                        server.disconnect_next -= 1
+                    rejected = not dropped and server.fail_next > 0
+                    if rejected:
+                        server.fail_next -= 1
+                if dropped:
+                    self.reply("421 Closing connection")
+                    return
+                if rejected:
+                    self.reply("451 Try again later")
+                else:
+                    envelope = {'from': argument, 'to': []}
+                    self.reply("250 OK")
+            elif command == 'RCPT':
+                envelope['to'].append(argument)
+                self.reply("250 OK")
+            elif command == 'DATA':
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    line = self.rfile.readline()
+                    if not line or line in (b".\r\n", b".\n"):
+                        break
+                    lines.append(line)
+                with server.lock:
+                    server.messages.append({**envelope, 'data': b"".join(lines)})
+                    unconfirmed = server.disconnect_after_data_next > 0
+                    if unconfirmed:
+                        server.disconnect_after_data_next -= 1
+                if unconfirmed:
+                    return
+                self.reply("250 OK: queued")
+            elif command == 'RSET':
+                envelope = {'from': None, 'to': []}
+                self.reply("250 OK")
+            elif command == 'NOOP':
+                self.reply("250 OK")
+            elif command == 'QUIT':
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LocalSMTPServer:
+    """Context manager running the stand-in on a free port (see .port)."""
+
+    def __init__(self, host='127.0.0.1', port=0, handshake_delay=0):
+        self.lock = threading.Lock()
+        self.messages = []
+        self.connections = 0
+        self.fail_next = 0
+        self.disconnect_next = 0
+        self.disconnect_after_data_next = 0
+        self.handshake_delay = handshake_delay
+        self._server = _ThreadingTCPServer((host, port), _SMTPHandler)
+        self._server.smtp = self
+        self.host, self.port = self._server.server_address
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def email_settings(self, **overrides):
+        """Django settings pointing the SMTP backend at this server."""
+        return {
+            'EMAIL_BACKEND': 'django.core.mail.backends.smtp.EmailBackend',
+            'EMAIL_HOST': self.host,
+            'EMAIL_PORT': self.port,
+            'EMAIL_HOST_USER': '',
+            'EMAIL_HOST_PASSWORD': '',
+            'EMAIL_USE_TLS': False,
+            'EMAIL_USE_SSL': False,
+            **overrides,
+        }
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
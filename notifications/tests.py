@@ -1,3 +1,445 @@
-from django.test import TestCase
+import smtplib
+from datetime import date, time, timedelta
+from io import StringIO
+from types import SimpleNamespace
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core import mail
+from django.core.mail import send_mail
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.template.loader import render_to_string
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+from rest_framework.test import APIClient
+
+from account.models import UserProfile
+from admin.utils import route_created_email_to_admin
+from booking.emails import _send_html_email
+from booking.models import Booking, PassengerDetail, TransferInformation
+from fct.testing import QueryCountAssertions
+from routes.models import Route
+from .backends import close_pooled_connections
+from .digest import send_admin_digest
+from .models import AdminEvent, DriverNotification, OutboundEmail
+from .outbox import claim_due_emails, enqueue_email, get_retry_delay, send_due_emails
+from .rendering import (
+    batch_memo,
+    changes_list,
+    detail_html,
+    email_batch,
+    get_email_template,
+    link,
+    message_html,
+    queue_html_email,
+    render_email,
+)
+from .testing import LocalSMTPServer
+
+
+@override_settings(EMAIL_FROM="admin@example.com")
+class EmailOutboxTest(TestCase):
+    """Emails are queued with the change they announce and delivered by the worker."""
+
+    def setUp(self):
+        self.smtp = LocalSMTPServer().start()
+        self.addCleanup(self.smtp.stop)
+        settings_override = override_settings(**self.smtp.email_settings())
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _make_due(self):
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+
+    def test_html_email_is_queued_not_sent(self):
+        _send_html_email("Booking Assigned", "Hello", "Your driver", "Details", "passenger@example.com")
+
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.recipients, ["passenger@example.com"])
+        self.assertEqual(email.from_email, "admin@example.com")
+        self.assertIn("Your driver", email.html_body)
+        self.assertEqual(self.smtp.messages, [])
+
+    def test_rolled_back_change_queues_nothing(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                enqueue_email("Booking Updated", ["passenger@example.com"], html_body="<p>Hi</p>")
+                raise RuntimeError("booking update failed")
+
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_worker_delivers_over_smtp(self):
+        enqueue_email("First", ["one@example.com"], html_body="<p>One</p>")
+        enqueue_email("Second", ["two@example.com", "three@example.com"], body="Two")
+
+        call_command("send_outbox_emails", "--once", stdout=StringIO())
+
+        self.assertEqual(len(self.smtp.messages), 2)
+        self.assertIn(b"Subject: First", self.smtp.messages[0]["data"])
+        self.assertEqual(len(self.smtp.messages[1]["to"]), 2)
+        self.assertEqual(
+            set(OutboundEmail.objects.values_list("status", flat=True)),
+            {OutboundEmail.STATUS_SENT},
+        )
+        self.assertEqual(mail.outbox, [])
+
+    def test_transient_failure_is_retried_with_backoff(self):
+        email = enqueue_email("Retry me", ["passenger@example.com"], html_body="<p>Hi</p>")
+        self.smtp.fail_next = 1
+
+        self.assertEqual(send_due_emails(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboundEmail.STATUS_PENDING, 1))
+        self.assertIn("451", email.last_error)
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=get_retry_delay(1) - 5))
+
+        # Not due yet, so the worker leaves it alone.
+        self.assertEqual(send_due_emails(), (0, 0))
+
+        self._make_due()
+        self.assertEqual(send_due_emails(), (1, 0))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboundEmail.STATUS_SENT, 2))
+        self.assertEqual(len(self.smtp.messages), 1)
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_email_is_dead_after_max_attempts(self):
+        email = enqueue_email("Never arrives", ["passenger@example.com"], html_body="<p>Hi</p>")
+        self.smtp.fail_next = 5
+
+        send_due_emails()
+        self._make_due()
+        send_due_emails()
+
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboundEmail.STATUS_DEAD, 2))
+        self._make_due()
+        self.assertEqual(send_due_emails(), (0, 0))
+
+    def test_batch_shares_one_connection(self):
+        for i in range(5):
+            enqueue_email(f"Email {i}", ["passenger@example.com"], html_body="<p>Hi</p>")
+
+        self.assertEqual(send_due_emails(), (5, 0))
+        self.assertEqual(self.smtp.connections, 1)
+
+    @override_settings(EMAIL_BACKEND="notifications.backends.PooledSMTPEmailBackend")
+    def test_unconfirmed_delivery_is_retried_by_the_outbox_only(self):
+        self.addCleanup(close_pooled_connections)
+        unconfirmed = enqueue_email("Unconfirmed", ["one@example.com"], html_body="<p>One</p>")
+        enqueue_email("Next", ["two@example.com"], html_body="<p>Two</p>")
+        self.smtp.disconnect_after_data_next = 1
+
+        self.assertEqual(send_due_emails(), (1, 1))
+
+        # Sent once, never resent in the same batch; the outbox decides when to try again.
+        self.assertEqual(len(self.smtp.messages), 2)
+        unconfirmed.refresh_from_db()
+        self.assertEqual((unconfirmed.status, unconfirmed.attempts), (OutboundEmail.STATUS_PENDING, 1))
+        self.assertIn("SMTPServerDisconnected", unconfirmed.last_error)
+
+    def test_claimed_emails_are_leased(self):
+        enqueue_email("Once", ["passenger@example.com"], html_body="<p>Hi</p>")
+
+        self.assertEqual(len(claim_due_emails(10)), 1)
+        # A second worker polling before the first finishes gets nothing.
+        self.assertEqual(claim_due_emails(10), [])
+
+
+class PooledSMTPBackendTest(SimpleTestCase):
+    """The pooled backend reuses one SMTP session per thread and recovers when it drops."""
+
+    def setUp(self):
+        self.smtp = LocalSMTPServer().start()
+        self.addCleanup(self.smtp.stop)
+        settings_override = override_settings(
+            **self.smtp.email_settings(EMAIL_BACKEND="notifications.backends.PooledSMTPEmailBackend")
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(close_pooled_connections)
+
+    def _send(self, subject):
+        return send_mail(subject, "Body", "admin@example.com", ["passenger@example.com"])
+
+    def test_separate_send_mail_calls_share_a_connection(self):
+        for i in range(3):
+            self.assertEqual(self._send(f"Email {i}"), 1)
+
+        self.assertEqual(len(self.smtp.messages), 3)
+        self.assertEqual(self.smtp.connections, 1)
+
+    def test_reconnects_when_server_drops_the_session(self):
+        self._send("Before")
+        self.smtp.disconnect_next = 1
+
+        self.assertEqual(self._send("After"), 1)
+
+        self.assertEqual(len(self.smtp.messages), 2)
+        self.assertEqual(self.smtp.connections, 2)
+
+    def test_hangup_after_data_is_not_resent(self):
+        self._send("Before")
+        self.smtp.disconnect_after_data_next = 1
+
+        with self.assertRaises(smtplib.SMTPServerDisconnected):
+            self._send("Maybe delivered")
+
+        self.assertEqual(len(self.smtp.messages), 2)
+        self.assertEqual(self._send("After"), 1)
+        self.assertEqual(self.smtp.connections, 2)
+
+    @override_settings(EMAIL_POOL_CHECK_AFTER=0)
+    def test_idle_connection_is_checked_before_reuse(self):
+        self._send("First")
+        self._send("Second")
+
+        self.assertEqual(self.smtp.connections, 1)
+        self.assertEqual(len(self.smtp.messages), 2)
+
+    def test_delivery_errors_are_not_retried(self):
+        self.smtp.fail_next = 1
+
+        with self.assertRaises(smtplib.SMTPSenderRefused):
+            self._send("Refused")
+
+        self.assertEqual(self.smtp.messages, [])
+        self.assertEqual(self._send("Accepted"), 1)
+        self.assertEqual(self.smtp.connections, 1)
+
+
+@override_settings(EMAIL_FROM="admin@example.com")
+class EmailRenderingTest(TestCase):
+    """The compiled email template renders exactly like Django and content is escaped."""
+
+    def test_compiled_template_matches_django_render(self):
+        context = {
+            "title": "Booking <Updated>",
+            "greeting": "Hello O'Brien & Co",
+            "message": mark_safe("Line one<br><br>Line two"),
+            "detail": mark_safe("<strong>Booking ID:</strong> FCT123"),
+        }
+
+        self.assertIsNotNone(get_email_template().parts)
+        self.assertEqual(
+            render_email(context["title"], context["greeting"], context["message"], context["detail"]),
+            render_to_string("email.html", context),
+        )
+
+    def test_structured_content_is_escaped(self):
+        detail = detail_html(
+            [("Passenger", "Jane <b>Doe</b>"), ("Adults", 2)],
+            [],
+            [("Additional Info", "Child seat & booster")],
+        )
+        message = message_html("Updated.", changes_list(["Pickup <time>"]), link("https://example.com/?a=1&b=2"))
+
+        self.assertEqual(
+            detail,
+            "<strong>Passenger:</strong> Jane &lt;b&gt;Doe&lt;/b&gt;<br><strong>Adults:</strong> 2"
+            "<br><br><strong>Additional Info:</strong> Child seat &amp; booster",
+        )
+        self.assertEqual(
+            message,
+            "Updated.<br><br><strong>Changes made:</strong><br>• Pickup &lt;time&gt;"
+            "<br><br><a href='https://example.com/?a=1&amp;b=2'>https://example.com/?a=1&amp;b=2</a>",
+        )
+
+    def test_batch_renders_and_queues_in_one_pass(self):
+        calls = []
+
+        def summary():
+            calls.append(1)
+            return [("Booking ID", "FCT123")]
+
+        with CaptureQueriesContext(connection) as queries:
+            with email_batch():
+                for recipient in ("passenger@example.com", "driver@example.com", "admin@example.com"):
+                    rows = batch_memo(("booking-summary", 1), summary)
+                    _send_html_email("Assigned", "Hello", "Message", detail_html(rows), recipient)
+                self.assertFalse(OutboundEmail.objects.exists())
+
+        inserts = [query for query in queries.captured_queries if query["sql"].startswith("INSERT")]
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(
+            sorted(recipients[0] for recipients in OutboundEmail.objects.values_list("recipients", flat=True)),
+            ["admin@example.com", "driver@example.com", "passenger@example.com"],
+        )
+        self.assertIn("FCT123", OutboundEmail.objects.first().html_body)
+
+    def test_failed_batch_queues_nothing(self):
+        with self.assertRaises(RuntimeError):
+            with email_batch():
+                _send_html_email("Assigned", "Hello", "Message", "Detail", "passenger@example.com")
+                raise RuntimeError("assignment failed")
+
+        self.assertFalse(OutboundEmail.objects.exists())
+
+
+    def test_batched_and_single_emails_use_the_same_sender(self):
+        queue_html_email("Single", "Hello", "Message", "Detail", "one@example.com", from_email="ops@example.com")
+        with email_batch():
+            queue_html_email("Batched", "Hello", "Message", "Detail", "two@example.com", from_email="ops@example.com")
+            queue_html_email("Default", "Hello", "Message", "Detail", "three@example.com")
+
+        self.assertEqual(
+            dict(OutboundEmail.objects.values_list("subject", "from_email")),
+            {"Single": "ops@example.com", "Batched": "ops@example.com", "Default": "admin@example.com"},
+        )
+
+    def test_queue_failures_at_flush_do_not_fail_the_change(self):
+        with self.assertLogs("print", level="ERROR"):
+            with transaction.atomic():
+                with patch.object(OutboundEmail.objects, "bulk_create", side_effect=DatabaseError("outbox down")):
+                    with email_batch():
+                        _send_html_email("Assigned", "Hello", "Message", "Detail", "passenger@example.com")
+                # The caller's transaction is still usable.
+                event = AdminEvent.objects.create(event_type="reservation", subject="Still saved")
+
+        self.assertTrue(AdminEvent.objects.filter(pk=event.pk).exists())
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_render_failures_at_flush_skip_only_that_email(self):
+        class Unrenderable:
+            def __str__(self):
+                raise ValueError("no text")
+
+        with self.assertLogs("print", level="ERROR"):
+            with email_batch():
+                _send_html_email("Assigned", "Hello", "Message", "Detail", "passenger@example.com")
+                _send_html_email("Broken", "Hello", "Message", Unrenderable(), "driver@example.com")
+
+        self.assertEqual(list(OutboundEmail.objects.values_list("subject", flat=True)), ["Assigned"])
+
+
+@override_settings(EMAIL_FROM="admin@example.com", ADMIN_EMAIL_DIGEST=True, ADMIN_EMAIL_URGENT_EVENTS=['reservation'])
+class AdminDigestTest(TestCase):
+    """Admin emails are held for one digest per interval, except urgent and opted-out types."""
+
+    def setUp(self):
+        self.user = SimpleNamespace(full_name="Admin <Ops>")
+
+    def _route_created(self, to_location):
+        route_created_email_to_admin(self.user, SimpleNamespace(from_location="Larnaca", to_location=to_location))
+
+    @override_settings(ADMIN_EMAIL_DIGEST=False)
+    def test_events_are_sent_immediately_without_digest(self):
+        self._route_created("Limassol")
+
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+        self.assertFalse(AdminEvent.objects.exists())
+
+    def test_digest_rolls_pending_events_into_one_email(self):
+        self._route_created("Limassol")
+        self._route_created("Paphos")
+        self.assertFalse(OutboundEmail.objects.exists())
+        self.assertEqual(AdminEvent.objects.filter(event_type='route_created').count(), 2)
+
+        self.assertEqual(send_admin_digest(), 2)
+
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.recipients, ["admin@example.com"])
+        self.assertEqual(email.subject, "Admin Digest – 2 new events")
+        self.assertIn("<strong>Route Created:</strong> 2", email.html_body)
+        self.assertIn("Larnaca to Limassol Created on the Platform", email.html_body)
+        self.assertIn("Larnaca to Paphos Created on the Platform", email.html_body)
+        self.assertIn("Admin &lt;Ops&gt;", email.html_body)
+        self.assertFalse(AdminEvent.objects.filter(digested_at__isnull=True).exists())
+
+        self.assertEqual(send_admin_digest(), 0)
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+
+    def test_digest_respects_event_limit(self):
+        for to_location in ("Limassol", "Paphos", "Nicosia"):
+            self._route_created(to_location)
+
+        self.assertEqual(send_admin_digest(limit=2), 2)
+        self.assertEqual(send_admin_digest(limit=2), 1)
+        self.assertEqual(OutboundEmail.objects.count(), 2)
+
+    @override_settings(ADMIN_EMAIL_URGENT_EVENTS=['route_created'])
+    def test_urgent_events_bypass_digest(self):
+        self._route_created("Limassol")
+
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+        self.assertFalse(AdminEvent.objects.exists())
+
+    @override_settings(ADMIN_EMAIL_DISABLED_EVENTS=['route_created'])
+    def test_disabled_events_are_dropped(self):
+        self._route_created("Limassol")
+
+        self.assertFalse(OutboundEmail.objects.exists())
+        self.assertFalse(AdminEvent.objects.exists())
+
+    def test_command_sends_pending_digest(self):
+        self._route_created("Limassol")
+        out = StringIO()
+
+        call_command('send_admin_digest', '--once', stdout=out)
+
+        self.assertIn("Queued a digest of 1 event(s).", out.getvalue())
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+
+
+@override_settings(API_KEY="test-api-key")
+class DriverNotificationListQueryCountTest(QueryCountAssertions, TestCase):
+    """The notification list reads each booking ID through a join, not a query per row."""
+
+    def setUp(self):
+        self.driver = UserProfile.objects.create_user(
+            email="driver@example.com", password="password123", full_name="Driver", is_driver=True
+        )
+        self.route = Route.objects.create(
+            from_location="Larnaca Airport", to_location="Limassol", meta_title="Title",
+            meta_description="Description", hero_title="Hero", sub_headline="Sub", body="Body",
+            distance="70 km", time="50 mins", duration_minutes=50, sedan_price=70, van_price=100,
+            image="routes/test.jpg", book_cta_label="Book", book_cta_support="Support",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.driver)
+
+    def _create_notification(self, index):
+        booking = Booking.objects.create(
+            route=self.route,
+            vehicle_type="sedan",
+            payment_type="card",
+            trip_type="One Way",
+            pickup_date=date(2026, 6, 1) + timedelta(days=index),
+            pickup_time=time(10, 0),
+            time_period="Day Tariff",
+            driver=self.driver,
+            transfer_information=TransferInformation.objects.create(adults=1, luggage="Hand"),
+            passenger_information=PassengerDetail.objects.create(
+                full_name="Passenger", phone_number="+35700000000", email_address="passenger@example.com"
+            ),
+        )
+        DriverNotification.objects.create(
+            driver=self.driver,
+            notification_type="booking_assigned",
+            title="Booking Assigned",
+            message="A booking was assigned to you.",
+            booking=booking,
+        )
+
+    def test_driver_notifications(self):
+        self.assertListQueriesConstant(
+            reverse("driver-notifications"), self._create_notification, HTTP_API_KEY="test-api-key"
+        )
+
+    def test_detail_marks_read_with_pruned_instance(self):
+        self._create_notification(0)
+        notification = DriverNotification.objects.get()
+
+        response = self.client.get(
+            reverse("driver-notification-detail", kwargs={"id": notification.pk}), HTTP_API_KEY="test-api-key"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["bookingId"], notification.booking.booking_id)
+        notification.refresh_from_db()
+        self.assertTrue(notification.read)
+        self.assertEqual(notification.message, "A booking was assigned to you.")
@@ -3,6 +3,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from account.permissions import HasRoutesAPIKey
+from fct.query_plan import QueryPlanMixin
 
 from .models import DriverNotification
 from .serializers import (
@@ -12,7 +13,7 @@ from .serializers import (
 )
 
 
-class DriverNotificationListView(ListAPIView):
+class DriverNotificationListView(QueryPlanMixin, ListAPIView):
     """
     List all notifications for the authenticated driver.
     Supports filtering by read status via query param: ?read=true or ?read=false
@@ -35,7 +36,7 @@ class DriverNotificationListView(ListAPIView):
         return queryset
 
 
-class DriverNotificationDetailView(RetrieveAPIView):
+class DriverNotificationDetailView(QueryPlanMixin, RetrieveAPIView):
     """
     Get a single notification detail.
     Automatically marks the notification as read when viewed.
@@ -0,0 +1,67 @@
+"""
+The public route catalogue, rendered once and served from the cache.
+
+Each catalogue entry (the full list, the summary list, one route's detail)
+is cached as rendered JSON with its ETag under the current catalogue
+version. The route signals replace the version whenever a Route, one of its
+vehicle options or FAQs is saved or deleted, so every later read misses and
+rebuilds. A build that races a write stores its result under the old
+version, where nothing reads it again.
+
+The version lives in the default cache, which every web worker and
+management command shares (the booking.E001 check rejects per-process
+caches), so a write in any process is seen by all of them.
+"""
+import hashlib
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import parse_etags
+
+CATALOGUE_VERSION_KEY = "routes:catalogue:version"
+# Invalidation covers every write path; the timeout only evicts versions
+# nothing reads any more.
+CATALOGUE_CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def catalogue_cache_key(version, name, base_url):
+    # Image URLs are absolute, so each host gets its own copy. Slugs can be
+    # long, so the name is hashed along with the host.
+    entry = hashlib.md5(f"{name}\n{base_url}".encode()).hexdigest()
+    return f"routes:catalogue:{version}:{entry}"
+
+
+def get_catalogue_version():
+    version = cache.get(CATALOGUE_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOGUE_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(CATALOGUE_VERSION_KEY)
+    return version
+
+
+def invalidate_route_catalogue():
+    """Start a new catalogue version once the current transaction commits."""
+    transaction.on_commit(lambda: cache.set(CATALOGUE_VERSION_KEY, uuid.uuid4().hex, None))
+
+
+def get_route_catalogue(name, base_url, render):
+    """
+    Return (etag, body) for the named catalogue entry, calling render() for the body on a miss.
+
+    The version is read before render() queries the routes, so a write that
+    commits in between only ever leaves its rows under the old version.
+    """
+    key = catalogue_cache_key(get_catalogue_version(), name, base_url)
+    catalogue = cache.get(key)
+    if catalogue is None:
+        body = render()
+        catalogue = (f'"{hashlib.md5(body).hexdigest()}"', body)
+        cache.set(key, catalogue, CATALOGUE_CACHE_TIMEOUT)
+    return catalogue
+
+
+def etag_matches(if_none_match, etag):
+    """Weak If-None-Match comparison, as for GET and HEAD (RFC 9110 13.1.2)."""
+    etags = parse_etags(if_none_match)
+    return '*' in etags or etag in (candidate.removeprefix('W/') for candidate in etags)
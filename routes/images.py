@@ -0,0 +1,119 @@
+"""
+Resized WebP and JPEG derivatives of Route.image.
+
+Hero images are uploaded at whatever size the editor had. Each upload gets a
+derivative at every IMAGE_DERIVATIVE_WIDTHS width it is at least as wide as
+(or one at its own width if it is narrower than all of them), in each of
+IMAGE_DERIVATIVE_FORMATS. Derivative file names carry a hash of their bytes,
+so their URLs never change meaning and can be cached as immutable (see
+IMMUTABLE_CACHE_CONTROL).
+
+Route.image_derivatives records which upload the derivatives were made from:
+
+    {'source': 'Route Images/limassol.jpg',
+     'images': [{'format': 'webp', 'width': 480, 'name': 'routes/derivatives/limassol-480w.1a2b3c4d5e6f.webp'}, ...]}
+"""
+import hashlib
+import io
+import logging
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from PIL import ExifTags, Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger('print')
+
+IMAGE_DERIVATIVE_WIDTHS = (480, 960, 1600)
+# format name -> (Pillow format, save options)
+IMAGE_DERIVATIVE_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+IMAGE_DERIVATIVE_DIR = 'routes/derivatives'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# EXIF orientations that swap width and height.
+TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def derivative_widths(source_width):
+    return sorted({min(width, source_width) for width in IMAGE_DERIVATIVE_WIDTHS})
+
+
+def _encode(image, image_format):
+    pillow_format, options = IMAGE_DERIVATIVE_FORMATS[image_format]
+    if pillow_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, pillow_format, **options)
+    return buffer.getvalue()
+
+
+def _save_derivative(storage, stem, width, image_format, content):
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    extension = 'jpg' if image_format == 'jpeg' else image_format
+    name = f"{IMAGE_DERIVATIVE_DIR}/{stem}-{width}w.{digest}.{extension}"
+    # Same name, same bytes: an existing file is already this derivative.
+    if not storage.exists(name):
+        name = storage.save(name, ContentFile(content))
+    return name
+
+
+def generate_image_derivatives(field_file):
+    """
+    Write the derivatives of an uploaded image and return its image_derivatives value.
+
+    An upload Pillow cannot read gets no derivatives; the original is still
+    served as before.
+    """
+    derivatives = {'source': field_file.name, 'images': []}
+    try:
+        with field_file.open('rb') as source, Image.open(source) as uploaded:
+            # JPEGs can be decoded at 1/2, 1/4 or 1/8 scale; keep at least the widest derivative.
+            widest = max(IMAGE_DERIVATIVE_WIDTHS)
+            transposed = uploaded.getexif().get(ExifTags.Base.Orientation) in TRANSPOSED_ORIENTATIONS
+            uploaded.draft('RGB', (1, widest) if transposed else (widest, 1))
+            image = ImageOps.exif_transpose(uploaded)
+            image.load()
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as exc:
+        logger.warning(f"Could not make derivatives of {field_file.name}: {exc}")
+        return derivatives
+
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+
+    stem = PurePosixPath(field_file.name).stem
+    # Largest first, each resized from the one before, so every pass reads a smaller image.
+    resized = image
+    for width in reversed(derivative_widths(image.width)):
+        if width != resized.width:
+            resized = resized.resize(
+                (width, max(1, round(image.height * width / image.width))), Image.Resampling.LANCZOS
+            )
+        for image_format in IMAGE_DERIVATIVE_FORMATS:
+            name = _save_derivative(field_file.storage, stem, width, image_format, _encode(resized, image_format))
+            derivatives['images'].append({'format': image_format, 'width': width, 'name': name})
+
+    derivatives['images'].sort(key=lambda derivative: (derivative['format'], derivative['width']))
+    return derivatives
+
+
+def derivatives_are_current(route):
+    source = route.image.name if route.image else None
+    return (route.image_derivatives or {}).get('source') == source
+
+
+def refresh_image_derivatives(route):
+    """
+    Regenerate route.image_derivatives if its image changed; True if it did.
+
+    Called from Route.save() before the row is written. A new upload is
+    committed to storage here rather than by the save, so its final name is
+    known and the derivatives go out in the same INSERT or UPDATE.
+    """
+    if route.image and not route.image._committed:
+        route.image.save(route.image.name, route.image.file, save=False)
+    if derivatives_are_current(route):
+        return False
+
+    route.image_derivatives = generate_image_derivatives(route.image) if route.image else {}
+    return True
@@ -0,0 +1,52 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+
+from routes.catalogue import invalidate_route_catalogue
+from routes.images import derivatives_are_current, generate_image_derivatives
+from routes.models import Route
+
+
+class Command(BaseCommand):
+    help = "Generate resized WebP/JPEG copies of route images that do not have them yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Images processed at once (default: CPU count)")
+        parser.add_argument('--force', action='store_true', help="Regenerate derivatives that are already current.")
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError("--workers must be at least 1.")
+
+        routes = [
+            route
+            for route in Route.objects.exclude(image='').only('pk', 'route_id', 'image', 'image_derivatives')
+            if options['force'] or not derivatives_are_current(route)
+        ]
+        if not routes:
+            self.stdout.write("Every route image already has derivatives.")
+            return
+
+        # Pillow releases the GIL while decoding, resizing and encoding, so
+        # threads run in parallel. Rows are written from this thread only.
+        generated = failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = {executor.submit(generate_image_derivatives, route.image): route for route in routes}
+            for future in as_completed(futures):
+                route = futures[future]
+                derivatives = future.result()
+                Route.objects.filter(pk=route.pk, image=route.image.name).update(image_derivatives=derivatives)
+                if derivatives['images']:
+                    generated += 1
+                    self.stdout.write(f"{route.route_id}: {len(derivatives['images'])} derivative(s)")
+                else:
+                    failed += 1
+                    self.stderr.write(self.style.WARNING(f"{route.route_id}: could not read {route.image.name}"))
+
+        # update() skips the Route signals that refresh the cached catalogue.
+        invalidate_route_catalogue()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated derivatives for {generated} route image(s); {failed} could not be read."
+        ))
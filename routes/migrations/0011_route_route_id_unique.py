@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-17 17:52
+
+from django.db import migrations, models
+
+
+def blank_route_ids_to_null(apps, schema_editor):
+    # The unique constraint allows many NULLs but only one blank string.
+    Route = apps.get_model('routes', 'Route')
+    Route.objects.filter(route_id='').update(route_id=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('routes', '0010_route_cash_deposit_percent'),
+    ]
+
+    operations = [
+        migrations.RunPython(blank_route_ids_to_null, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='route',
+            constraint=models.UniqueConstraint(fields=('route_id',), name='route_route_id_uniq'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-17 20:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('routes', '0011_route_route_id_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='route',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
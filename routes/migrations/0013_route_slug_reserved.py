@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-17 21:45
+
+import routes.models
+from django.db import migrations, models
+
+
+def rename_reserved_slugs(apps, schema_editor):
+    Route = apps.get_model('routes', 'Route')
+    for route in Route.objects.filter(slug__in=routes.models.RESERVED_ROUTE_SLUGS):
+        route.slug = f"{route.slug}-route"
+        route.save(update_fields=['slug'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('routes', '0012_route_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_reserved_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='route',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=200, unique=True, validators=[routes.models.validate_route_slug]),
+        ),
+    ]
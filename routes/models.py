@@ -1,12 +1,23 @@
-import secrets
-import string
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.text import slugify
 
+from fct.utils import save_with_public_id
+from .images import refresh_image_derivatives
+
 
 User = get_user_model()
 
+# Paths routes/urls.py serves ahead of <slug:slug>/; a route with one of these
+# slugs could never be fetched by it.
+RESERVED_ROUTE_SLUGS = {'summary', 'search'}
+
+
+def validate_route_slug(value):
+    if value in RESERVED_ROUTE_SLUGS:
+        raise ValidationError(f"'{value}' is reserved for another endpoint; choose a different slug.")
+
 
 class Vehicle(models.Model):
     VEHICLE_TYPE = [
@@ -53,7 +64,7 @@ class Route(models.Model):
     added_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     route_id = models.CharField(max_length=100, blank=True, null=True)
 
-    slug = models.SlugField(max_length=200, unique=True, blank=True)
+    slug = models.SlugField(max_length=200, unique=True, blank=True, validators=[validate_route_slug])
     from_location = models.CharField(max_length=200, verbose_name='From')
     to_location = models.CharField(max_length=200, verbose_name='To')
 
@@ -86,24 +97,34 @@ class Route(models.Model):
     # faqs: accessed via reverse FK (RouteFAQ.route)
 
     image = models.ImageField(upload_to="Route Images")
+    # Resized copies of image, regenerated by save() when it changes (see routes.images).
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     book_cta_label = models.CharField(max_length=300)
     book_cta_support = models.CharField(max_length=200)
 
     class Meta:
         verbose_name = 'Route Detail'
         verbose_name_plural = 'Route Details'
+        constraints = [
+            models.UniqueConstraint(fields=['route_id'], name='route_route_id_uniq'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(f"{self.from_location}-{self.to_location}")
-            
-        generate_booking_id = not self.route_id
-        super().save(*args, **kwargs)
-
-        if generate_booking_id:
-            random_str = ''.join(secrets.choice(string.ascii_lowercase + string.digits) for _ in range(5))
-            self.route_id = f"fct{random_str}{self.pk}"
-            super().save(update_fields=['route_id'])
+            if self.slug in RESERVED_ROUTE_SLUGS:
+                self.slug = f"{self.slug}-route"
+        validate_route_slug(self.slug)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'image' in update_fields:
+            if refresh_image_derivatives(self) and update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'image_derivatives'}
+
+        if self.route_id:
+            super().save(*args, **kwargs)
+        else:
+            save_with_public_id(self, 'route_id', 'fct', super().save, *args, **kwargs)
 
     def __str__(self):
         return f"{self.from_location} → {self.to_location}"
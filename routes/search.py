@@ -0,0 +1,157 @@
+"""
+In-memory autocomplete over route origins, destinations and slugs.
+
+Each process keeps a RouteSearchIndex built from one query over the routes
+and one grouped count of their bookings. Words are kept in a sorted list for
+prefix lookups by bisection, and every searchable text is broken into
+trigrams so a fragment from the middle of a word ("naca") still finds its
+route without scanning.
+
+The index records the route catalogue version it was built from (see
+routes.catalogue). A route change made in this process drops the index at
+once (routes.signals). Other processes compare the shared version with
+their own at most every SEARCH_VERSION_CHECK_INTERVAL seconds, so a warm
+search never leaves the process. Booking counts drift without any route
+change, so an index is also rebuilt once it is SEARCH_INDEX_MAX_AGE old.
+"""
+import re
+import time
+import unicodedata
+import heapq
+from bisect import bisect_left
+from dataclasses import dataclass
+
+from django.db.models import Count
+
+from booking.models import Booking
+from .catalogue import get_catalogue_version
+from .models import Route
+
+SEARCH_INDEX_MAX_AGE = 10 * 60
+SEARCH_VERSION_CHECK_INTERVAL = 5
+SEARCH_RESULT_LIMIT = 10
+WORD = re.compile(r'\w+')
+
+
+def normalize_text(text):
+    """Casefold and drop accents, like MySQL's default _ai_ci collations."""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def trigrams(text):
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+
+@dataclass(frozen=True)
+class RouteSuggestion:
+    route_id: str
+    slug: str
+    from_location: str
+    to_location: str
+    bookings: int
+
+
+class RouteSearchIndex:
+    def __init__(self, suggestions, version=None):
+        self.version = version
+        self.built_at = self.checked_at = time.monotonic()
+        # Most booked first, so results only need a stable sort on match quality.
+        self.suggestions = sorted(
+            suggestions, key=lambda route: (-route.bookings, route.from_location, route.to_location)
+        )
+        self.texts = []
+        words = set()
+        self.trigrams = {}
+        for index, route in enumerate(self.suggestions):
+            text = normalize_text(f"{route.from_location} {route.to_location} {route.slug.replace('-', ' ')}")
+            self.texts.append(text)
+            words.update((word, index) for word in WORD.findall(text))
+            for trigram in trigrams(text):
+                self.trigrams.setdefault(trigram, set()).add(index)
+        self.words = sorted(words)
+
+    def prefixed(self, prefix):
+        """Indexes of routes with a word starting with prefix."""
+        start = bisect_left(self.words, (prefix,))
+        # Every word starting with prefix sorts before prefix + the largest code point.
+        end = bisect_left(self.words, (prefix + '\U0010ffff',), start)
+        return {index for _, index in self.words[start:end]}
+
+    def containing(self, fragment):
+        """Indexes of routes whose text contains fragment (three characters or more)."""
+        postings = sorted((self.trigrams.get(trigram, set()) for trigram in trigrams(fragment)), key=len)
+        candidates = set.intersection(*postings) if postings else set()
+        return {index for index in candidates if fragment in self.texts[index]}
+
+    def search(self, query, limit=SEARCH_RESULT_LIMIT):
+        """
+        Routes matching every word of query, best first.
+
+        A word matches the start of a route word, or for three characters or
+        more anywhere in the route's text. Routes matched on word starts
+        alone rank first; ties go to the most booked route.
+        """
+        terms = WORD.findall(normalize_text(query))
+        if not terms:
+            return []
+
+        prefix_matches = None
+        all_matches = None
+        for term in terms:
+            prefixed = self.prefixed(term)
+            matches = prefixed | self.containing(term) if len(term) >= 3 else prefixed
+            prefix_matches = prefixed if prefix_matches is None else prefix_matches & prefixed
+            all_matches = matches if all_matches is None else all_matches & matches
+            if not all_matches:
+                return []
+
+        ranked = heapq.nsmallest(limit, prefix_matches)
+        if len(ranked) < limit:
+            ranked += heapq.nsmallest(limit - len(ranked), all_matches - prefix_matches)
+        return [self.suggestions[index] for index in ranked]
+
+
+def build_route_search_index(version=None):
+    bookings = dict(Booking.objects.order_by().values('route').annotate(count=Count('pk')).values_list('route', 'count'))
+    routes = Route.objects.only('pk', 'route_id', 'slug', 'from_location', 'to_location')
+    return RouteSearchIndex(
+        [
+            RouteSuggestion(
+                route.route_id, route.slug, route.from_location, route.to_location, bookings.get(route.pk, 0)
+            )
+            for route in routes
+        ],
+        version,
+    )
+
+
+_index = None
+
+
+def get_route_search_index():
+    """This process's index, rebuilt if routes changed or it has aged out."""
+    global _index
+    index = _index
+    now = time.monotonic()
+    if index is not None and now - index.built_at <= SEARCH_INDEX_MAX_AGE:
+        if now - index.checked_at < SEARCH_VERSION_CHECK_INTERVAL:
+            return index
+        version = get_catalogue_version()
+        if index.version == version:
+            index.checked_at = now
+            return index
+    else:
+        version = get_catalogue_version()
+    index = _index = build_route_search_index(version)
+    return index
+
+
+def forget_route_search_index():
+    """Drop this process's index; the next search rebuilds it."""
+    global _index
+    _index = None
+
+
+def search_routes(query, limit=SEARCH_RESULT_LIMIT):
+    return get_route_search_index().search(query, limit)
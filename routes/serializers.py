@@ -2,6 +2,23 @@ from rest_framework import serializers
 
 from .models import Vehicle, RouteFAQ, Route
 
+class ImageDerivativesField(serializers.Field):
+    """Route.image_derivatives as {format: [{'width', 'url'}, ...]}, narrowest first."""
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        storage = Route._meta.get_field('image').storage
+        request = self.context.get('request')
+        derivatives = {}
+        for image in (value or {}).get('images', []):
+            url = storage.url(image['name'])
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            derivatives.setdefault(image['format'], []).append({'width': image['width'], 'url': url})
+        return derivatives
+
 class VehicleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Vehicle
@@ -12,9 +29,25 @@ class RouteFAQSerializer(serializers.ModelSerializer):
         model = RouteFAQ
         fields = ['question', 'answer']
 
+class RouteSummarySerializer(serializers.ModelSerializer):
+    """What the booking widget and route pickers need, without the page content."""
+    class Meta:
+        model = Route
+        fields = [
+            'route_id',
+            'slug',
+            'from_location',
+            'to_location',
+            'sedan_price',
+            'van_price',
+            'duration_minutes',
+            'time',
+        ]
+
 class RouteListSerializer(serializers.ModelSerializer):
     vehicle_options = serializers.SerializerMethodField()
     faq = serializers.SerializerMethodField()
+    image_derivatives = ImageDerivativesField()
 
     class Meta:
         model = Route
@@ -41,15 +74,16 @@ class RouteListSerializer(serializers.ModelSerializer):
             'vehicle_options',
             'faq',
             'image',
+            'image_derivatives',
             'book_cta_label',
             'book_cta_support',
         ]
         read_only_fields = ['route_id', 'slug']
+        # Read by the method fields below (see fct.query_plan).
+        prefetch_related = ['vehicle_options', 'faqs']
 
     def get_vehicle_options(self, obj):
-        options = Vehicle.objects.filter(route=obj)
-        return VehicleSerializer(options, many=True).data
+        return VehicleSerializer(obj.vehicle_options.all(), many=True).data
 
     def get_faq(self, obj):
-        faqs = RouteFAQ.objects.filter(route=obj)
-        return RouteFAQSerializer(faqs, many=True).data
\ No newline at end of file
+        return RouteFAQSerializer(obj.faqs.all(), many=True).data
\ No newline at end of file
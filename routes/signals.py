@@ -0,0 +1,18 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .catalogue import invalidate_route_catalogue
+from .models import Route, RouteFAQ, Vehicle
+from .search import forget_route_search_index
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_save, sender=Vehicle)
+@receiver(post_save, sender=RouteFAQ)
+@receiver(post_delete, sender=Route)
+@receiver(post_delete, sender=Vehicle)
+@receiver(post_delete, sender=RouteFAQ)
+def invalidate_route_catalogue_on_change(sender, **kwargs):
+    invalidate_route_catalogue()
+    transaction.on_commit(forget_route_search_index)
@@ -1,3 +1,614 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from datetime import date, time
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from booking.models import Booking, PassengerDetail, TransferInformation
+from fct.testing import IN_PROCESS_CACHES, QueryCountAssertions
+from . import search
+from .catalogue import CATALOGUE_VERSION_KEY, catalogue_cache_key
+from .models import RESERVED_ROUTE_SLUGS, Route, RouteFAQ, Vehicle
+from .search import RouteSearchIndex, RouteSuggestion, search_routes
+from .views import serve_image_derivative
+
+
+def create_route_with_options(index):
+    route = Route.objects.create(
+        from_location=f"Town {index}", to_location="Limassol", meta_title="Title", meta_description="Description",
+        hero_title="Hero", sub_headline="Sub", body="Body", distance="70 km", time="50 mins", duration_minutes=50,
+        sedan_price=70, van_price=100, image="routes/test.jpg", book_cta_label="Book", book_cta_support="Support",
+    )
+    Vehicle.objects.create(route=route, vehicle_type="sedan", max_passengers=3, ideal_for="Couples", fixed_price=70)
+    Vehicle.objects.create(route=route, vehicle_type="vclass", max_passengers=7, ideal_for="Families", fixed_price=100)
+    RouteFAQ.objects.create(route=route, question="Question?", answer="Answer.")
+    return route
+
+
+@override_settings(API_KEY="test-api-key")
+class RouteListQueryCountTest(QueryCountAssertions, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def create_route(self, index):
+        # Commit callbacks start a new catalogue version, so each GET rebuilds it.
+        with self.captureOnCommitCallbacks(execute=True):
+            create_route_with_options(index)
+
+    def test_route_list(self):
+        self.assertListQueriesConstant(reverse("route-list"), self.create_route, HTTP_API_KEY="test-api-key")
+
+    def test_route_list_includes_vehicle_options_and_faqs(self):
+        create_route_with_options(0)
+
+        route = self.client.get(reverse("route-list"), HTTP_API_KEY="test-api-key").json()[0]
+
+        self.assertEqual([option["vehicleType"] for option in route["vehicleOptions"]], ["sedan", "vclass"])
+        self.assertEqual(route["faq"], [{"question": "Question?", "answer": "Answer."}])
+
+
+@override_settings(API_KEY="test-api-key", CACHES=IN_PROCESS_CACHES)
+class RouteCatalogueCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.route = create_route_with_options(0)
+
+    def get_catalogue(self, **extra):
+        return self.client.get(reverse("route-list"), HTTP_API_KEY="test-api-key", **extra)
+
+    def test_repeat_requests_are_served_from_the_cache(self):
+        first = self.get_catalogue()
+
+        with self.assertNumQueries(0):
+            second = self.get_catalogue()
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second["Content-Type"], "application/json")
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_cached_body_matches_the_serializer(self):
+        self.get_catalogue()
+
+        routes = self.get_catalogue().json()
+
+        self.assertEqual(len(routes), 1)
+        self.assertEqual(routes[0]["routeId"], self.route.route_id)
+        self.assertTrue(routes[0]["image"].startswith("http://testserver/"))
+
+    def test_if_none_match_returns_not_modified(self):
+        etag = self.get_catalogue()["ETag"]
+
+        for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+            with self.subTest(header=header):
+                response = self.get_catalogue(HTTP_IF_NONE_MATCH=header)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b"")
+                self.assertEqual(response["ETag"], etag)
+
+        self.assertEqual(self.get_catalogue(HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+    def test_still_requires_the_api_key(self):
+        etag = self.get_catalogue()["ETag"]
+
+        response = self.client.get(reverse("route-list"), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertIn(response.status_code, (401, 403))
+
+    def test_each_origin_gets_its_own_image_urls(self):
+        self.get_catalogue()
+
+        routes = self.get_catalogue(secure=True).json()
+
+        self.assertTrue(routes[0]["image"].startswith("https://testserver/"))
+
+    def assertInvalidatedBy(self, change):
+        before = self.get_catalogue()
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+
+        after = self.get_catalogue(HTTP_IF_NONE_MATCH=before["ETag"])
+
+        self.assertEqual(after.status_code, 200)
+        self.assertNotEqual(after["ETag"], before["ETag"])
+        return after.json()
+
+    def test_route_save_invalidates(self):
+        self.route.hero_title = "New hero"
+        routes = self.assertInvalidatedBy(self.route.save)
+        self.assertEqual(routes[0]["heroTitle"], "New hero")
+
+    def test_route_create_and_delete_invalidate(self):
+        routes = self.assertInvalidatedBy(lambda: create_route_with_options(1))
+        self.assertEqual(len(routes), 2)
+
+        routes = self.assertInvalidatedBy(self.route.delete)
+        self.assertEqual([route["fromLocation"] for route in routes], ["Town 1"])
+
+    def test_vehicle_option_changes_invalidate(self):
+        option = self.route.vehicle_options.get(vehicle_type="sedan")
+        option.fixed_price = 80
+        routes = self.assertInvalidatedBy(option.save)
+        self.assertIn(80, [vehicle["fixedPrice"] for vehicle in routes[0]["vehicleOptions"]])
+
+        routes = self.assertInvalidatedBy(option.delete)
+        self.assertEqual([vehicle["vehicleType"] for vehicle in routes[0]["vehicleOptions"]], ["vclass"])
+
+    def test_faq_changes_invalidate(self):
+        routes = self.assertInvalidatedBy(
+            lambda: RouteFAQ.objects.create(route=self.route, question="Luggage?", answer="Two bags.")
+        )
+        self.assertEqual(len(routes[0]["faq"]), 2)
+
+        routes = self.assertInvalidatedBy(lambda: self.route.faqs.all().delete())
+        self.assertEqual(routes[0]["faq"], [])
+
+    def test_versions_started_by_other_processes_are_seen(self):
+        self.get_catalogue()
+        # What invalidate_route_catalogue() in a management command leaves in the shared cache.
+        cache.set(CATALOGUE_VERSION_KEY, "from-another-process", None)
+
+        # Rebuilt: the routes, their vehicle options and their FAQs.
+        with self.assertNumQueries(3):
+            self.get_catalogue()
+
+        self.assertIsNotNone(cache.get(catalogue_cache_key("from-another-process", "list", "http://testserver/")))
+
+    def test_uncommitted_changes_do_not_invalidate(self):
+        before = self.get_catalogue()
+        self.route.hero_title = "Rolled back"
+        self.route.save()
+
+        self.assertEqual(self.get_catalogue().content, before.content)
+
+
+@override_settings(API_KEY="test-api-key", CACHES=IN_PROCESS_CACHES)
+class RouteSummaryAndDetailTest(QueryCountAssertions, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.route = create_route_with_options(0)
+
+    def get(self, url, **extra):
+        return self.client.get(url, HTTP_API_KEY="test-api-key", **extra)
+
+    def create_route(self, index):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_route_with_options(index + 1)
+
+    def test_summary_lists_only_the_widget_fields(self):
+        routes = self.get(reverse("route-summary-list")).json()
+
+        self.assertEqual(routes, [{
+            "routeId": self.route.route_id,
+            "slug": self.route.slug,
+            "fromLocation": "Town 0",
+            "toLocation": "Limassol",
+            "sedanPrice": 70,
+            "vanPrice": 100,
+            "durationMinutes": 50,
+            "time": "50 mins",
+        }])
+
+    def test_summary_reads_only_its_columns(self):
+        self.assertListQueriesConstant(reverse("route-summary-list"), self.create_route, HTTP_API_KEY="test-api-key")
+
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.get(reverse("route-summary-list"))
+
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("body", queries[0]["sql"])
+
+    def test_detail_by_slug(self):
+        create_route_with_options(1)
+
+        response = self.get(reverse("route-detail", args=[self.route.slug]))
+
+        self.assertEqual(response.status_code, 200)
+        route = response.json()
+        self.assertEqual(route["routeId"], self.route.route_id)
+        self.assertEqual(route["body"], "Body")
+        self.assertEqual([option["vehicleType"] for option in route["vehicleOptions"]], ["sedan", "vclass"])
+        self.assertEqual(route["faq"], [{"question": "Question?", "answer": "Answer."}])
+
+    def test_detail_matches_the_list_entry(self):
+        listed = self.get(reverse("route-list")).json()[0]
+
+        self.assertEqual(self.get(reverse("route-detail", args=[self.route.slug])).json(), listed)
+
+    def test_unknown_slug_is_not_cached(self):
+        self.assertEqual(self.get(reverse("route-detail", args=["nowhere-limassol"])).status_code, 404)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Route.objects.filter(pk=self.route.pk).update(slug="nowhere-limassol")
+
+        self.assertEqual(self.get(reverse("route-detail", args=["nowhere-limassol"])).status_code, 200)
+
+    def test_entries_are_cached_and_revalidated_independently(self):
+        urls = [reverse("route-list"), reverse("route-summary-list"), reverse("route-detail", args=[self.route.slug])]
+        etags = [self.get(url)["ETag"] for url in urls]
+        self.assertEqual(len(set(etags)), 3)
+
+        for url, etag in zip(urls, etags):
+            with self.subTest(url=url), self.assertNumQueries(0):
+                self.assertEqual(self.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_detail_is_invalidated_by_its_faqs(self):
+        url = reverse("route-detail", args=[self.route.slug])
+        etag = self.get(url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            RouteFAQ.objects.create(route=self.route, question="Luggage?", answer="Two bags.")
+
+        response = self.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["faq"]), 2)
+
+
+@override_settings(API_KEY="test-api-key", CACHES=IN_PROCESS_CACHES)
+class RouteSlugTest(TestCase):
+    def test_generated_slugs_avoid_the_list_endpoints(self):
+        route = create_route_with_options(0)
+        route.slug, route.from_location, route.to_location = "", "Search", ""
+        route.save()
+
+        self.assertEqual(route.slug, "search-route")
+        response = self.client.get(reverse("route-detail", kwargs={"slug": route.slug}), HTTP_API_KEY="test-api-key")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["routeId"], route.route_id)
+
+    def test_reserved_slugs_are_rejected(self):
+        route = create_route_with_options(0)
+        for slug in RESERVED_ROUTE_SLUGS:
+            route.slug = slug
+            with self.subTest(slug=slug), self.assertRaises(ValidationError):
+                route.save()
+
+        self.assertEqual(Route.objects.get().slug, "town-0-limassol")
+
+
+class RouteSearchIndexTest(TestCase):
+    def setUp(self):
+        self.index = RouteSearchIndex([
+            RouteSuggestion("r1", "larnaca-airport-limassol", "Larnaca Airport", "Limassol", 5),
+            RouteSuggestion("r2", "paphos-airport-limassol", "Páphos Airport", "Limassol", 20),
+            RouteSuggestion("r3", "larnaca-airport-ayia-napa", "Larnaca Airport", "Ayia Napa", 1),
+            RouteSuggestion("r4", "nicosia-protaras", "Nicosia", "Protaras", 50),
+        ])
+
+    def route_ids(self, query, **kwargs):
+        return [route.route_id for route in self.index.search(query, **kwargs)]
+
+    def test_word_prefixes_rank_by_bookings(self):
+        self.assertEqual(self.route_ids("lim"), ["r2", "r1"])
+        self.assertEqual(self.route_ids("air"), ["r2", "r1", "r3"])
+        self.assertEqual(self.route_ids("Napa"), ["r3"])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.route_ids("larnaca lim"), ["r1"])
+        self.assertEqual(self.route_ids("larnaca protaras"), [])
+
+    def test_case_and_accents_are_ignored(self):
+        self.assertEqual(self.route_ids("PAPHOS"), ["r2"])
+        self.assertEqual(self.route_ids("páph"), ["r2"])
+
+    def test_fragments_match_inside_words_after_word_starts(self):
+        # "ras" starts no word; "aca" ends Larnaca.
+        self.assertEqual(self.route_ids("ras"), ["r4"])
+        self.assertEqual(self.route_ids("aca"), ["r1", "r3"])
+        # "pa" starts Paphos (r2); "pa" inside Napa (r3) is too short to count.
+        self.assertEqual(self.route_ids("pa"), ["r2"])
+
+    def test_word_start_matches_outrank_more_popular_fragment_matches(self):
+        index = RouteSearchIndex([
+            RouteSuggestion("popular", "nicosia-protaras", "Nicosia", "Protaras", 50),
+            RouteSuggestion("prefix", "rastro-limassol", "Rastro", "Limassol", 1),
+        ])
+
+        self.assertEqual([route.route_id for route in index.search("ras")], ["prefix", "popular"])
+
+    def test_short_fragments_only_match_word_starts(self):
+        self.assertEqual(self.route_ids("ap"), [])
+        self.assertEqual(self.route_ids("l"), ["r2", "r1", "r3"])
+
+    def test_empty_query_and_limit(self):
+        self.assertEqual(self.route_ids(""), [])
+        self.assertEqual(self.route_ids(" - "), [])
+        self.assertEqual(self.route_ids("a", limit=2), ["r2", "r1"])
+
+    def test_matches_a_substring_scan(self):
+        import random
+
+        rng = random.Random(24)
+        places = ["Larnaca", "Limassol", "Páphos", "Ayia Napa", "Protaras", "Nicosia", "Polis", "Paralimni"]
+        suggestions = []
+        for i in range(60):
+            origin, destination = rng.sample(places, 2)
+            suggestions.append(RouteSuggestion(f"r{i}", f"{origin}-{destination}-{i}".lower().replace(" ", "-"),
+                                               origin, destination, rng.randrange(100)))
+        index = RouteSearchIndex(suggestions)
+
+        for _ in range(200):
+            word = rng.choice(search.normalize_text(rng.choice(places)).split())
+            start = rng.randrange(len(word))
+            term = word[start:start + rng.randrange(1, 6)]
+            expected = {
+                route.route_id
+                for route, text in zip(index.suggestions, index.texts)
+                if any(word.startswith(term) for word in text.split()) or (len(term) >= 3 and term in text)
+            }
+            with self.subTest(term=term):
+                self.assertEqual({route.route_id for route in index.search(term, limit=100)}, expected)
+
+
+@override_settings(API_KEY="test-api-key", CACHES=IN_PROCESS_CACHES)
+class RouteSearchViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        search._index = None
+        self.client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.quiet = create_route_with_options(0)
+            self.busy = create_route_with_options(1)
+        transfer = TransferInformation.objects.create(adults=1, luggage="Hand")
+        passenger = PassengerDetail.objects.create(
+            full_name="Test Passenger", phone_number="+35700000000", email_address="passenger@example.com",
+        )
+        for _ in range(3):
+            Booking.objects.create(
+                route=self.busy, vehicle_type="sedan", payment_type="card", trip_type="One Way",
+                pickup_date=date(2026, 6, 1), pickup_time=time(10, 0), time_period="Day Tariff",
+                transfer_information=transfer, passenger_information=passenger,
+            )
+
+    def search(self, query):
+        response = self.client.get(reverse("route-search"), {"q": query}, HTTP_API_KEY="test-api-key")
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_ranks_by_booking_count(self):
+        results = self.search("lima")
+
+        self.assertEqual([route["routeId"] for route in results], [self.busy.route_id, self.quiet.route_id])
+        self.assertEqual(results[0], {
+            "routeId": self.busy.route_id,
+            "slug": self.busy.slug,
+            "fromLocation": "Town 1",
+            "toLocation": "Limassol",
+        })
+
+    def test_searches_use_the_built_index(self):
+        self.search("town")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.search("town 1")), 1)
+
+    def test_warm_searches_do_not_read_the_shared_version(self):
+        self.search("town")
+
+        with mock.patch.object(search, "get_catalogue_version", wraps=search.get_catalogue_version) as version:
+            self.search("town 1")
+            version.assert_not_called()
+
+            checked_at = search._index.checked_at
+            with mock.patch.object(
+                search.time, "monotonic", return_value=checked_at + search.SEARCH_VERSION_CHECK_INTERVAL
+            ):
+                self.search("town 1")
+            version.assert_called_once()
+
+    def test_route_changes_in_other_processes_are_seen_after_the_check_interval(self):
+        self.assertEqual(self.search("paphos"), [])
+        # Another process renames the route and starts a new catalogue version.
+        Route.objects.filter(pk=self.quiet.pk).update(to_location="Paphos")
+        cache.set(CATALOGUE_VERSION_KEY, "from-another-process", None)
+
+        self.assertEqual(self.search("paphos"), [])
+        checked_at = search._index.checked_at
+        with mock.patch.object(search.time, "monotonic", return_value=checked_at + search.SEARCH_VERSION_CHECK_INTERVAL):
+            self.assertEqual([route["routeId"] for route in self.search("paphos")], [self.quiet.route_id])
+
+    def test_route_changes_rebuild_the_index(self):
+        self.assertEqual(self.search("paphos"), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.quiet.to_location = "Paphos"
+            self.quiet.save()
+
+        self.assertEqual([route["routeId"] for route in self.search("paphos")], [self.quiet.route_id])
+
+    def test_aged_index_is_rebuilt_for_booking_counts(self):
+        self.search("lima")
+        Booking.objects.filter(route=self.busy).update(route=self.quiet)
+        self.assertEqual(self.search("lima")[0]["routeId"], self.busy.route_id)
+
+        built_at = search._index.built_at
+        with mock.patch.object(search.time, "monotonic", return_value=built_at + search.SEARCH_INDEX_MAX_AGE + 1):
+            self.assertEqual(self.search("lima")[0]["routeId"], self.quiet.route_id)
+
+    def test_missing_query_returns_nothing(self):
+        response = self.client.get(reverse("route-search"), HTTP_API_KEY="test-api-key")
+
+        self.assertEqual(response.json(), [])
+
+    def test_requires_the_api_key(self):
+        response = self.client.get(reverse("route-search"), {"q": "town"})
+
+        self.assertIn(response.status_code, (401, 403))
+
+    def test_module_function_matches_the_view(self):
+        self.assertEqual([route.route_id for route in search_routes("town")], [self.busy.route_id, self.quiet.route_id])
+
+
+def image_upload(name, width, height, mode="RGB", image_format="JPEG", **save_options):
+    buffer = io.BytesIO()
+    Image.new(mode, (width, height), "red" if mode == "RGB" else (255, 0, 0, 128)).save(
+        buffer, image_format, **save_options
+    )
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+class RouteImageDerivativesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root, API_KEY="test-api-key")
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.route = create_route_with_options(0)
+
+    def upload(self, upload):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.route.image = upload
+            self.route.save()
+        self.route.refresh_from_db()
+        return self.route.image_derivatives
+
+    def open_derivative(self, derivative):
+        storage = Route._meta.get_field("image").storage
+        with storage.open(derivative["name"]) as file:
+            image = Image.open(file)
+            image.load()
+        return image
+
+    def test_upload_makes_every_width_in_every_format(self):
+        derivatives = self.upload(image_upload("hero.jpg", 2000, 1000))
+
+        self.assertEqual(derivatives["source"], self.route.image.name)
+        self.assertEqual(
+            [(derivative["format"], derivative["width"]) for derivative in derivatives["images"]],
+            [("jpeg", 480), ("jpeg", 960), ("jpeg", 1600), ("webp", 480), ("webp", 960), ("webp", 1600)],
+        )
+        for derivative in derivatives["images"]:
+            with self.subTest(**derivative):
+                image = self.open_derivative(derivative)
+                self.assertEqual(image.format, derivative["format"].upper())
+                self.assertEqual(image.size, (derivative["width"], derivative["width"] // 2))
+                self.assertRegex(
+                    derivative["name"], rf"^routes/derivatives/hero-{derivative['width']}w\.[0-9a-f]{{12}}\.(jpg|webp)$"
+                )
+
+    def test_narrow_images_are_not_upscaled(self):
+        derivatives = self.upload(image_upload("narrow.jpg", 300, 200))
+
+        self.assertEqual({derivative["width"] for derivative in derivatives["images"]}, {300})
+
+    def test_transparency_is_kept_in_webp(self):
+        derivatives = self.upload(image_upload("logo.png", 600, 600, mode="RGBA", image_format="PNG"))
+
+        modes = {derivative["format"]: self.open_derivative(derivative).mode for derivative in derivatives["images"]}
+        self.assertEqual(modes, {"webp": "RGBA", "jpeg": "RGB"})
+
+    def test_exif_orientation_is_applied(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Rotated 90 degrees clockwise
+        derivatives = self.upload(image_upload("portrait.jpg", 1000, 500, exif=exif))
+
+        widest = max(derivatives["images"], key=lambda derivative: derivative["width"])
+        self.assertEqual(self.open_derivative(widest).size, (500, 1000))
+
+    def test_names_are_content_hashed(self):
+        first = self.upload(image_upload("hero.jpg", 1000, 500))
+        second = self.upload(image_upload("hero.jpg", 1000, 500))
+        third = self.upload(image_upload("hero.jpg", 1000, 400))
+
+        def digests(derivatives):
+            return [derivative["name"].rsplit(".", 2)[1] for derivative in derivatives["images"]]
+
+        self.assertNotEqual(first["source"], second["source"])
+        self.assertEqual(digests(first), digests(second))
+        self.assertTrue(set(digests(first)).isdisjoint(digests(third)))
+
+    def test_saves_that_keep_the_image_do_not_regenerate(self):
+        self.upload(image_upload("hero.jpg", 1000, 500))
+
+        with mock.patch("routes.images.generate_image_derivatives") as generate:
+            self.route.hero_title = "New hero"
+            self.route.save()
+            self.route.save(update_fields=["hero_title"])
+
+        generate.assert_not_called()
+
+    def test_derivatives_are_written_with_the_image(self):
+        self.route.image = image_upload("hero.jpg", 1000, 500)
+        with CaptureQueriesContext(connection) as queries:
+            self.route.save(update_fields=["image"])
+
+        route_writes = [
+            query["sql"] for query in queries.captured_queries if query["sql"].startswith('UPDATE "routes_route"')
+        ]
+        self.assertEqual(len(route_writes), 1)
+        self.assertIn('"image_derivatives"', route_writes[0])
+        self.route.refresh_from_db()
+        self.assertEqual(self.route.image_derivatives["source"], self.route.image.name)
+        self.assertEqual(len(self.route.image_derivatives["images"]), 6)
+
+    def test_unreadable_uploads_are_kept_without_derivatives(self):
+        derivatives = self.upload(SimpleUploadedFile("broken.jpg", b"not an image"))
+
+        self.assertEqual(derivatives, {"source": self.route.image.name, "images": []})
+
+    def test_serializer_lists_derivative_urls(self):
+        self.upload(image_upload("hero.jpg", 1000, 500))
+
+        route = APIClient().get(reverse("route-detail", args=[self.route.slug]), HTTP_API_KEY="test-api-key").json()
+
+        self.assertEqual(list(route["imageDerivatives"]), ["jpeg", "webp"])
+        self.assertEqual([image["width"] for image in route["imageDerivatives"]["webp"]], [480, 960, 1000])
+        self.assertRegex(
+            route["imageDerivatives"]["webp"][0]["url"], r"^http://testserver/media/routes/derivatives/hero-480w\.\w+\.webp$"
+        )
+
+    def test_derivatives_are_served_as_immutable(self):
+        derivatives = self.upload(image_upload("hero.jpg", 1000, 500))
+        name = derivatives["images"][0]["name"]
+
+        response = serve_image_derivative(RequestFactory().get(f"/media/{name}"), name)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "public, max-age=31536000, immutable")
+
+    def test_backfill_command(self):
+        self.upload(image_upload("hero.jpg", 1000, 500))
+        other = create_route_with_options(1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Route.objects.filter(pk__in=[self.route.pk, other.pk]).update(image_derivatives={})
+        catalogue_etag = APIClient().get(reverse("route-list"), HTTP_API_KEY="test-api-key")["ETag"]
+
+        out, err = io.StringIO(), io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("generate_route_image_derivatives", "--workers", "2", stdout=out, stderr=err)
+
+        self.route.refresh_from_db()
+        self.assertEqual(len(self.route.image_derivatives["images"]), 6)
+        self.assertIn("Generated derivatives for 1 route image(s); 1 could not be read.", out.getvalue())
+        self.assertIn(f"{other.route_id}: could not read", err.getvalue())
+        self.assertNotEqual(
+            APIClient().get(reverse("route-list"), HTTP_API_KEY="test-api-key")["ETag"], catalogue_etag
+        )
+
+        out = io.StringIO()
+        call_command("generate_route_image_derivatives", stdout=out)
+        self.assertIn("Every route image already has derivatives.", out.getvalue())
+
+    def test_backfill_rejects_no_workers(self):
+        with self.assertRaises(CommandError):
+            call_command("generate_route_image_derivatives", "--workers", "0")
@@ -1,6 +1,9 @@
 from django.urls import path
-from .views import RouteListView
+from .views import RouteDetailView, RouteListView, RouteSearchView, RouteSummaryListView
 
 urlpatterns = [
     path('', RouteListView.as_view(), name='route-list'),
+    path('summary/', RouteSummaryListView.as_view(), name='route-summary-list'),
+    path('search/', RouteSearchView.as_view(), name='route-search'),
+    path('<slug:slug>/', RouteDetailView.as_view(), name='route-detail'),
 ]
@@ -1,11 +1,90 @@
-from rest_framework.generics import ListAPIView
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.views.static import serve
+from rest_framework.generics import ListAPIView, RetrieveAPIView
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from account.permissions import HasRoutesAPIKey
+from fct.query_plan import QueryPlanMixin
+from .catalogue import etag_matches, get_route_catalogue
+from .images import IMMUTABLE_CACHE_CONTROL
 from .models import Route
-from .serializers import RouteListSerializer
+from .search import search_routes
+from .serializers import RouteListSerializer, RouteSummarySerializer
 
 
-class RouteListView(ListAPIView):
+class CatalogueCacheMixin:
+    """
+    Serve JSON GETs from the route catalogue cache (see routes.catalogue),
+    answering a matching If-None-Match with 304.
+    """
+    catalogue_name = None
+
+    def get_catalogue_name(self):
+        return self.catalogue_name
+
+    def get(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        get = super().get
+        if renderer.format != 'json':
+            return get(request, *args, **kwargs)
+
+        def render():
+            response = get(request, *args, **kwargs)
+            return renderer.render(response.data, renderer_context=self.get_renderer_context())
+
+        etag, body = get_route_catalogue(self.get_catalogue_name(), request.build_absolute_uri('/'), render)
+        if etag_matches(request.headers.get('If-None-Match', ''), etag):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type=renderer.media_type)
+        response['ETag'] = etag
+        return response
+
+
+class RouteListView(CatalogueCacheMixin, QueryPlanMixin, ListAPIView):
+    queryset = Route.objects.all()
+    serializer_class = RouteListSerializer
+    permission_classes = [HasRoutesAPIKey]
+    catalogue_name = 'list'
+
+
+class RouteSummaryListView(CatalogueCacheMixin, QueryPlanMixin, ListAPIView):
+    queryset = Route.objects.all()
+    serializer_class = RouteSummarySerializer
+    permission_classes = [HasRoutesAPIKey]
+    catalogue_name = 'summary'
+
+
+class RouteDetailView(CatalogueCacheMixin, QueryPlanMixin, RetrieveAPIView):
     queryset = Route.objects.all()
     serializer_class = RouteListSerializer
     permission_classes = [HasRoutesAPIKey]
+    lookup_field = 'slug'
+
+    def get_catalogue_name(self):
+        return f"detail:{self.kwargs['slug']}"
+
+
+class RouteSearchView(APIView):
+    """Autocomplete for ?q= over route origins, destinations and slugs (see routes.search)."""
+    permission_classes = [HasRoutesAPIKey]
+
+    def get(self, request):
+        return Response([
+            {
+                'route_id': route.route_id,
+                'slug': route.slug,
+                'from_location': route.from_location,
+                'to_location': route.to_location,
+            }
+            for route in search_routes(request.query_params.get('q', ''))
+        ])
+
+
+def serve_image_derivative(request, path):
+    """Development server for route image derivatives, with their long-lived cache header."""
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
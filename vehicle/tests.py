@@ -1,3 +1,27 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from account.models import UserProfile
+from fct.testing import QueryCountAssertions
+from .models import Vehicle
+
+
+@override_settings(API_KEY="test-api-key")
+class VehicleListQueryCountTest(QueryCountAssertions, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = UserProfile.objects.create_superuser(email="admin@example.com", password="password123")
+        self.client.force_authenticate(user=self.admin)
+
+    def _create_vehicle(self, index):
+        Vehicle.objects.create(
+            license_plate=f"CY{index:03}", make="Mercedes", model="E-Class", type="sedan", max_passengers=3,
+            added_by=self.admin,
+        )
+
+    def test_vehicle_list(self):
+        self.assertListQueriesConstant(reverse("vehicle-list"), self._create_vehicle, HTTP_API_KEY="test-api-key")
+
+    def test_available_vehicles(self):
+        self.assertListQueriesConstant(reverse("vehicle-available"), self._create_vehicle, HTTP_API_KEY="test-api-key")
@@ -1,5 +1,6 @@
 from rest_framework.generics import ListAPIView, ListCreateAPIView, RetrieveUpdateDestroyAPIView, CreateAPIView
 from account.permissions import HasVehiclePermission, HasRoutesAPIKey
+from fct.query_plan import QueryPlanMixin
 from .models import Vehicle
 from .serializers import VehicleSerializer, AvailableVehicleSerializer
 from django.db import transaction
@@ -9,7 +10,7 @@ from account.utils import log_user_activity
 from rest_framework.validators import ValidationError
 from .utils import vehicle_create_email_to_admin, vehicle_update_email_to_admin, vehicle_delete_email_to_admin
 
-class VehicleCreateCreateView(ListCreateAPIView):
+class VehicleCreateCreateView(QueryPlanMixin, ListCreateAPIView):
     queryset = Vehicle.objects.all()
     serializer_class = VehicleSerializer
     permission_classes = [HasRoutesAPIKey, HasVehiclePermission]
@@ -51,13 +52,13 @@ class VehicleCreateCreateView(ListCreateAPIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-class VehicleListCreateView(ListCreateAPIView):
+class VehicleListCreateView(QueryPlanMixin, ListCreateAPIView):
     queryset = Vehicle.objects.all()
     serializer_class = VehicleSerializer
     permission_classes = [HasRoutesAPIKey, HasVehiclePermission]
 
 
-class VehicleDetailView(RetrieveUpdateDestroyAPIView):
+class VehicleDetailView(QueryPlanMixin, RetrieveUpdateDestroyAPIView):
     queryset = Vehicle.objects.all()
     serializer_class = VehicleSerializer
     permission_classes = [HasRoutesAPIKey, HasVehiclePermission]
@@ -122,7 +123,7 @@ class VehicleDetailView(RetrieveUpdateDestroyAPIView):
 
 
 
-class AvailableVehicleListView(ListAPIView):
+class AvailableVehicleListView(QueryPlanMixin, ListAPIView):
     queryset = Vehicle.objects.filter()
     serializer_class = AvailableVehicleSerializer
     permission_classes = [HasRoutesAPIKey, HasVehiclePermission]